@@ -1,15 +1,92 @@
-from langchain_openai import ChatOpenAI
+import os
+import threading
+from typing import Any, Callable
 
-class ProjectConf:
-    '''
-    Defines configurations for agentic workflow
-    '''
-    agent_llm = ChatOpenAI(
+class _LazyAttribute:
+    '''A class attribute built on first access, so importing the config stays cheap'''
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner: type, name: str):
+        self._name = name
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        with self._lock:
+            value = owner.__dict__[self._name]
+            if value is self:
+                value = self._factory()
+                # later lookups find the plain value and never come back here
+                setattr(owner, self._name, value)
+            return value
+
+def _agent_llm():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
         name='openai-llm',
         model="gpt-4o",
         temperature=0,
         timeout=None,
         max_retries=2
-    )   # the LLM to be used throughout all agents
+    )
+
+class ProjectConf:
+    '''
+    Defines configurations for agentic workflow
+    '''
+    agent_llm = _LazyAttribute(_agent_llm)  # the LLM to be used throughout all agents
+
+    default_thread_id = "1"     # thread used when a caller does not supply one
+    state_snapshot_config = {"configurable": {"thread_id": default_thread_id}}
+
+    # upper bound on threads used to offload blocking I/O (Google clients, Elasticsearch) from
+    # the event loop; concurrent workflows are limited by this rather than by Starlette's pool
+    blocking_io_workers = 32
+
+    # persistent checkpoint store shared by all workers, plus its retention policy
+    checkpoint_db_path = os.getenv("HONEYCOMB_CHECKPOINT_DB", "checkpoints.sqlite")
+    checkpoint_max_per_thread = 500             # oldest checkpoints beyond this are dropped
+    checkpoint_thread_ttl_seconds = 7 * 24 * 3600   # threads idle for longer are deleted
+    checkpoint_max_threads = 1000               # least recently used threads beyond this are evicted
+    checkpoint_snapshot_every = 20              # full message snapshot interval, deltas in between
+
+    # how often a history stream re-checks the store without a local notification; this picks up
+    # checkpoints written by other workers and doubles as the keep-alive interval
+    history_stream_poll_seconds = 5.0
+
+    # parallel plan execution: how many steps of one run may execute at once, and per-agent caps
+    # shared by all runs in the process (agents not listed are only bound by the per-run limit)
+    plan_max_parallel_steps = 4
+    plan_agent_concurrency: dict[str, int] = {"GDriveAgent": 2, "GmailAgent": 2, "GCalendarAgent": 2}
+
+    # load the embedding model, memory store and graph in the background as soon as the API starts;
+    # the process accepts requests right away and GET /ready reports when everything is loaded
+    warm_up_on_startup = os.getenv("HONEYCOMB_WARMUP", "1") == "1"
+
+    # one Google authorization shared by the Drive, Gmail and Calendar tools; the token is refreshed
+    # in the background this long before it expires
+    google_client_secrets_file = os.getenv("GSUITE_CLIENT_SECRETS")
+    google_token_file = os.getenv("HONEYCOMB_GOOGLE_TOKEN", "google_token.pickle")
+    google_scopes = [
+        "https://www.googleapis.com/auth/drive",
+        "https://mail.google.com/",
+        "https://www.googleapis.com/auth/calendar",
+    ]
+    google_token_refresh_margin_seconds = 300
+    google_discovery_cache_dir = os.getenv("HONEYCOMB_GOOGLE_DISCOVERY_DIR", "google_discovery")
+
+    # downloaded Drive content, reused until the file changes; least recently used entries are
+    # dropped beyond the size limit
+    drive_cache_dir = os.getenv("HONEYCOMB_DRIVE_CACHE_DIR", "drive_cache")
+    drive_cache_max_bytes = 512 * 2**20
+
+    # local copy of the Drive file metadata that answers list_files; synced from the Changes API in
+    # the background at most this often, and bypassed for the live API when it falls further behind
+    drive_index_path = os.getenv("HONEYCOMB_DRIVE_INDEX", "drive_index.sqlite")
+    drive_index_sync_seconds = 60
+    drive_index_max_staleness_seconds = 15 * 60
 
-    state_snapshot_config = {"configurable": {"thread_id": "1"}}
+    @staticmethod
+    def thread_config(thread_id: str) -> dict[str, Any]:
+        '''Returns the graph config that scopes a run or history lookup to a single thread'''
+        return {"configurable": {"thread_id": thread_id}}
@@ -1,7 +1,11 @@
 from abc import ABC
+from typing import TYPE_CHECKING
+
 from pydantic import BaseModel
-from langgraph.graph.state import CompiledStateGraph
+
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
 
 class Agent(ABC, BaseModel):
-    def build(self) -> CompiledStateGraph:
+    def build(self) -> "CompiledStateGraph":
         pass
@@ -5,6 +5,8 @@ from src.agents.Agent import Agent
 class AgentRegistry:
     # Class-level mapping of all agent string representation to agent class
     _registry: list[Type[Agent]] = []
+    # Bumped on every change so cached graphs know when they are stale
+    _version: int = 0
 
     @classmethod
     def register(cls, agent_cls: Type['Agent']) -> Type['Agent']:
@@ -12,9 +14,23 @@ class AgentRegistry:
         if agent_cls in cls._registry:
             raise ValueError(f"{agent_cls.__name__} is already registered.")
         cls._registry.append(agent_cls)
+        cls._version += 1
         return agent_cls
 
+    @classmethod
+    def unregister(cls, agent_cls: Type['Agent']) -> None:
+        '''Removes a previously registered agent from the registry'''
+        if agent_cls not in cls._registry:
+            raise ValueError(f"{agent_cls.__name__} is not registered.")
+        cls._registry.remove(agent_cls)
+        cls._version += 1
+
     @classmethod
     def get_agents(cls) -> list[Agent]:
         '''Returns all agents for graph construction'''
         return cls._registry
+
+    @classmethod
+    def get_version(cls) -> int:
+        '''Returns a counter that changes whenever the set of registered agents changes'''
+        return cls._version
@@ -1,7 +1,5 @@
-import os
+from typing import TYPE_CHECKING
 
-from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import create_react_agent
 from langchain_core.tools import Tool
 
 from src.agents.Agent import Agent
@@ -10,6 +8,9 @@ from config import ProjectConf
 
 from src.tools.GCalendarTool import GCalendarTool
 
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
+
 @AgentRegistry.register
 class GCalendarAgent(Agent):
     """
@@ -23,13 +24,17 @@ class GCalendarAgent(Agent):
     
     Use this agent for tasks that involve reading, creating, or updating events in Google Calendar.
     """
-    def build(self) -> CompiledStateGraph:
-        calendar_tool_instance = GCalendarTool(
-            client_secrets_file = os.getenv("GSUITE_CLIENT_SECRETS")
-        )
+    def build(self) -> "CompiledStateGraph":
+        # langgraph is slow to import; only pay for it when the graph is built
+        from langgraph.prebuilt import create_react_agent
+
+        calendar_tool_instance = GCalendarTool()
         
         def calendar_tool_func(tool_input: str) -> str:
             return calendar_tool_instance._run(tool_input)
+
+        async def calendar_tool_coroutine(tool_input: str) -> str:
+            return await calendar_tool_instance._arun(tool_input)
         
         calendar_tool = Tool(
             name="GCalendarTool",
@@ -43,6 +48,7 @@ class GCalendarAgent(Agent):
                 "Format your input as shown."
             ),
             func=calendar_tool_func,
+            coroutine=calendar_tool_coroutine,
         )
         
         compiled_graph = create_react_agent(
@@ -1,7 +1,5 @@
-import os
+from typing import TYPE_CHECKING
 
-from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import create_react_agent
 from langchain_core.tools import Tool
 
 from src.agents.Agent import Agent
@@ -10,6 +8,9 @@ from config import ProjectConf
 
 from src.tools.GDriveTool import GoogleDriveTool
 
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
+
 @AgentRegistry.register
 class GDriveAgent(Agent):
     """
@@ -19,18 +20,22 @@ class GDriveAgent(Agent):
     files stored on Google Drive, including reading, updating, or sharing them.
     
     This agent supports multiple Google Drive operations:
-      - list_files:<optional query> to list files.
+      - list_files:<optional query> | <options> to list files, most recently modified first.
       - load_metadata:<file_id> to fetch metadata for a file.
-      - load_content:<file_id> to retrieve the content of a file.
+      - load_content:<file_id> | <options> to retrieve the content of a file, a bounded slice at a time.
       - update_sharing:<file_id>,<email>,<role> to update sharing permissions.
     """
-    def build(self) -> CompiledStateGraph:
-        drive_tool_instance = GoogleDriveTool(
-            client_secrets_file=os.getenv("GSUITE_CLIENT_SECRETS")
-        )
+    def build(self) -> "CompiledStateGraph":
+        # langgraph is slow to import; only pay for it when the graph is built
+        from langgraph.prebuilt import create_react_agent
+
+        drive_tool_instance = GoogleDriveTool()
         
         def drive_tool_func(tool_input: str) -> str:
             return drive_tool_instance._run(tool_input)
+
+        async def drive_tool_coroutine(tool_input: str) -> str:
+            return await drive_tool_instance._arun(tool_input)
         
         google_drive_tool = Tool(
             name="GDriveTool",
@@ -40,12 +45,18 @@ class GDriveAgent(Agent):
                 "Use this tool when you need to manage files stored in Google Drive."
                 "Supported operations include:\n"
                 "1. list_files:<optional query> to list files (e.g., 'list_files:' or 'list_files:name contains report').\n"
+                "   Results are capped; add options after the query separated by '|': max_results=<n> (default 25), "
+                "order_by=<e.g. name or modifiedTime desc>, modified_after=<YYYY-MM-DD>, folder=<folder_id>, "
+                "page_token=<token from a previous result> (e.g., 'list_files: | max_results=10 | modified_after=2024-01-01 | folder=FOLDER_ID').\n"
                 "2. load_metadata:<file_id> to fetch metadata for a file.\n"
-                "3. load_content:<file_id> to retrieve the content of a file.\n"
+                "3. load_content:<file_id> to retrieve the content of a file. Long files are truncated with a note on how to "
+                "read on; options: max_chars=<n> (default 20000), start=<byte offset>, end=<byte offset> "
+                "(e.g., 'load_content:FILE_ID | start=81234').\n"
                 "4. update_sharing:<file_id>,<email>,<role> to update a file's sharing permissions (e.g., 'update_sharing:FILE_ID,user@example.com,reader').\n"
                 "Format your input exactly as shown."
             ),
             func=drive_tool_func,
+            coroutine=drive_tool_coroutine,
         )
         
         compiled_graph = create_react_agent(
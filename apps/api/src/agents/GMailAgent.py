@@ -1,7 +1,5 @@
-import os
+from typing import TYPE_CHECKING
 
-from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import create_react_agent
 from langchain_core.tools import Tool
 
 from src.agents.Agent import Agent
@@ -10,6 +8,9 @@ from config import ProjectConf
 
 from src.tools.GMailTool import GMailTool
 
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
+
 @AgentRegistry.register
 class GMailAgent(Agent):
     """
@@ -19,17 +20,21 @@ class GMailAgent(Agent):
     retrieving, drafting, or sending messages.
     
     This agent supports the following email operations:
-      1. search_messages:<query> - Search for messages matching a query.
+      1. search_messages:<query> - Search for messages matching a query, with their sender, subject, date and snippet.
       2. create_draft:<sender>,<to>,<subject>,<body> - Create a draft email.
       3. send_message:<sender>,<to>,<subject>,<body> - Send an email.
     """
-    def build(self) -> CompiledStateGraph:
-        gmail_tool_instance = GMailTool(
-            client_secrets_file=os.getenv("GSUITE_CLIENT_SECRETS")
-        )
+    def build(self) -> "CompiledStateGraph":
+        # langgraph is slow to import; only pay for it when the graph is built
+        from langgraph.prebuilt import create_react_agent
+
+        gmail_tool_instance = GMailTool()
         
         def gmail_tool_func(tool_input: str) -> str:
             return gmail_tool_instance._run(tool_input)
+
+        async def gmail_tool_coroutine(tool_input: str) -> str:
+            return await gmail_tool_instance._arun(tool_input)
         
         gmail_tool = Tool(
             name="GMailTool",
@@ -38,13 +43,17 @@ class GMailAgent(Agent):
                 "for emails, create draft messages, and send emails. Use this tool for "
                 "any email-related operations, such as retrieving, drafting, or "
                 "sending messages. Supported operations:\n"
-                "1. search_messages:<query> - Search for messages by query.\n"
+                "1. search_messages:<query> - Search for messages by query (Gmail search syntax). Returns one table "
+                "with the ID, date, sender, recipients, subject and snippet of each message, newest first. "
+                "Options follow the query separated by '|': max_results=<n> (default 20, at most 100), "
+                "page_token=<token from a previous result> (e.g., 'search_messages:from:alice@example.com | max_results=1').\n"
                 "2. create_draft:<sender>,<to>,<subject>,<body> - Create a draft email.\n"
                 "3. send_message:<sender>,<to>,<subject>,<body> - Send an email.\n"
                 "Format your input accordingly. For example:\n"
                 "  send_message:your_email@gmail.com,recipient@example.com,Subject,Message body"
             ),
             func=gmail_tool_func,
+            coroutine=gmail_tool_coroutine,
         )
         
         compiled_graph = create_react_agent(
@@ -1,12 +1,14 @@
-from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import create_react_agent
+from typing import TYPE_CHECKING
 
 from langchain_core.tools import Tool
-from langchain_google_community import GoogleSearchAPIWrapper
 
 from config import ProjectConf
 from src.agents.Agent import Agent
 from src.agents.AgentRegistry import AgentRegistry
+from src.tools.GSearchTool import asearch, search
+
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
 
 @AgentRegistry.register
 class GSearchAgent(Agent):
@@ -16,15 +18,17 @@ class GSearchAgent(Agent):
     API to retrieve up-to-date web results. Use this agent when you need 
     to obtain recent, relevant information from across the web based on user queries.
     """
-    def build(self) -> CompiledStateGraph:
-        search = GoogleSearchAPIWrapper()
+    def build(self) -> "CompiledStateGraph":
+        # langgraph is slow to import; only pay for it when the graph is built
+        from langgraph.prebuilt import create_react_agent
 
         google_search_tool = Tool(
             name="GSearchTool",
             description="A tool that interfaces with Google's Search API to fetch the latest " 
                 "web results based on user queries. Use this tool when you need to retrieve "
                 "up-to-date and relevant information from the web.",
-            func=search.run,
+            func=search,
+            coroutine=asearch,
         )
 
         compiled_graph = create_react_agent(name='GSearchAgent', model=ProjectConf.agent_llm, tools=[google_search_tool])
@@ -1,5 +1,4 @@
-from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import create_react_agent
+from typing import TYPE_CHECKING
 
 from langchain_core.tools import Tool
 
@@ -8,25 +7,38 @@ from src.agents.Agent import Agent
 from src.agents.AgentRegistry import AgentRegistry
 
 from src.memory.service import get_knn
+from src.utils.concurrency import run_blocking
+
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
 
 def run_rag(query: str) -> str:
     results = get_knn(query, k=5)
     return str(results)
 
+async def arun_rag(query: str) -> str:
+    # embedding and the Elasticsearch round trip are blocking, keep them off the event loop
+    return await run_blocking(run_rag, query)
+
 
 @AgentRegistry.register
 class RAGAgent(Agent):
     """
-    An agent that runs RAG against our Elasticserarch VectorDB.
+    An agent that runs RAG against our Elasticserarch VectorDB, which holds the user's chat history
+    and the Google Drive documents imported into memory.
 
     The output will be a string of the text of the K nearest neighbours
     """
-    def build(self) -> CompiledStateGraph:
+    def build(self) -> "CompiledStateGraph":
+        # langgraph is slow to import; only pay for it when the graph is built
+        from langgraph.prebuilt import create_react_agent
+
         # Wrap it in a Tool
         rag_tool = Tool(
             name="k_nearest_neighbours",
-            description="Use this tool to search the user's chat history. The output will be a string of the plain text of the K nearest neighbours",
+            description="Use this tool to search the user's chat history and their imported Google Drive documents. The output will be a string of the plain text of the K nearest neighbours",
             func=run_rag,
+            coroutine=arun_rag,
         )
 
         # Create a ReAct-style agent with our search tool
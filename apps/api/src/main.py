@@ -1,13 +1,35 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from config import ProjectConf
+from src.memory import embeddings, store
 from src.memory.router import router as memory_router
 from src.runner import Runner
+from src.utils.concurrency import run_blocking
+from src.utils.warmup import Warmup
+from src.workflows.Graph import GraphBuilder
 from src.workflows.router import router as workflows_router
-from src.utils.extract_state_fields import parse_all_snapshots
-from src.workflows.History import WorkflowHistory
+from src.workflows.threads_router import router as threads_router
+from src.workflows.workflow_router import router as workflow_router
+
+# nothing heavy happens at import; these load on first use or during warm-up
+Warmup.register("embeddings", embeddings.warm_up, embeddings.is_loaded)
+Warmup.register("memory_store", store.get_store, store.is_connected)
+Warmup.register("graph", GraphBuilder.get_graph, GraphBuilder.is_built)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if ProjectConf.warm_up_on_startup:
+        # in the background, so the server starts listening immediately; keep a reference so it is not collected
+        app.state.warmup = asyncio.create_task(Warmup.run())
+    yield
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -16,6 +38,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Thread-Id"],
 )
 
 # Sample route
@@ -25,17 +48,44 @@ def read_root():
 
 app.include_router(memory_router, prefix='/memory')
 app.include_router(workflows_router, prefix='/history')
+app.include_router(threads_router, prefix='/threads')
+app.include_router(workflow_router, prefix='/workflows')
 
 @app.post("/run")
 async def run(request: Request):
     # Parse the JSON body for the user message
     data = await request.json()
     user_input = data.get("message", "Who was the 10th US president?")
+    thread_id = data.get("thread_id") or str(uuid.uuid4())
 
-    # Create a generator that yields output from TestRunner.run()
-    def event_generator():
-        runner = Runner()
-        for output in runner.run(user_input):
+    # Create an async generator that yields output from Runner.arun(). Only the (possibly slow)
+    # first graph build touches a thread; the workflow itself runs on the event loop.
+    async def event_generator():
+        runner = await run_blocking(Runner, thread_id=thread_id)
+        async for output in runner.arun(user_input):
             yield output
 
-    return StreamingResponse(event_generator(), media_type="text/plain")
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/plain",
+        headers={"X-Thread-Id": thread_id},
+    )
+
+@app.get("/ready")
+def ready():
+    # 503 until every component is loaded, for load balancer readiness probes
+    return JSONResponse(
+        status_code=200 if Warmup.is_ready() else 503,
+        content={"ready": Warmup.is_ready(), "components": Warmup.status()},
+    )
+
+@app.post("/warmup")
+async def warmup():
+    # loads whatever is still cold and returns once done
+    return await Warmup.run()
+
+@app.post("/graph/rebuild")
+async def rebuild_graph():
+    # Explicitly recompile the shared graph, e.g. after changing agents or config at runtime
+    await run_blocking(GraphBuilder.build)
+    return {"status": "rebuilt"}
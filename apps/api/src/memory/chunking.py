@@ -0,0 +1,83 @@
+"""
+Splits conversations and documents into chunks sized for the embedding model, before they are embedded and stored.
+"""
+import hashlib
+import time
+from typing import Optional
+
+from src.memory.embedding_cache import normalize_text
+from src.memory.embeddings import MAX_SEQ_TOKENS, tokenizer
+from src.memory.models import Chunk
+
+CHUNK_TOKENS = 200      # target chunk length in word pieces
+CHUNK_OVERLAP = 40      # word pieces repeated between consecutive chunks of one message
+MIN_CHUNK_TOKENS = 4    # shorter messages ("ok", "thanks") are folded into the previous chunk or dropped
+
+# a chunk may grow by a short tail, and must still fit the model after [CLS] and [SEP]
+assert CHUNK_TOKENS + MIN_CHUNK_TOKENS <= MAX_SEQ_TOKENS - 2
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def split_text(text: str, chunk_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP) -> list[str]:
+    '''Splits text into overlapping windows of at most `chunk_tokens` word pieces, keeping the original characters'''
+    offsets = tokenizer()(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    if len(offsets) <= chunk_tokens:
+        return [text.strip()] if offsets else []
+
+    pieces = []
+    step = chunk_tokens - overlap
+    start = 0
+    while start < len(offsets):
+        end = min(start + chunk_tokens, len(offsets))
+        # fold a short tail into this window instead of emitting a chunk that is mostly overlap
+        if len(offsets) - end < MIN_CHUNK_TOKENS:
+            end = len(offsets)
+        pieces.append(text[offsets[start][0]:offsets[end - 1][1]].strip())
+        if end == len(offsets):
+            break
+        start += step
+    return pieces
+
+def chunk_conversation(messages: list[str], conversation_id: str, timestamps: Optional[list[Optional[float]]] = None) -> list[Chunk]:
+    '''Turns a conversation's messages into model-sized chunks tagged with the conversation, position and time'''
+    now = time.time()
+    timestamps = timestamps or [None] * len(messages)
+    chunks: list[Chunk] = []
+
+    for message, timestamp in zip(messages, timestamps):
+        timestamp = timestamp if timestamp is not None else now
+        n_tokens = len(tokenizer()(message, add_special_tokens=False)["input_ids"])
+        if n_tokens == 0:
+            continue
+        if n_tokens < MIN_CHUNK_TOKENS:
+            previous = chunks[-1] if chunks else None
+            # an acknowledgement only means something next to what it acknowledges
+            if previous is not None and len(tokenizer()(previous.text, add_special_tokens=False)["input_ids"]) + n_tokens <= CHUNK_TOKENS:
+                previous.text = f"{previous.text}\n{message.strip()}"
+            continue
+
+        for piece in split_text(message):
+            chunks.append(Chunk(text=piece, conversation_id=conversation_id, position=len(chunks), timestamp=timestamp))
+
+    for chunk in chunks:
+        chunk.content_hash = content_hash(chunk.text)
+    return chunks
+
+def chunk_document(text: str, file_id: str, revision: str, timestamp: Optional[float] = None) -> list[Chunk]:
+    '''Splits a document into model-sized chunks tagged with the file, its revision and position'''
+    return [
+        Chunk(text=piece, file_id=file_id, revision=revision, position=position,
+              timestamp=timestamp, content_hash=content_hash(piece))
+        for position, piece in enumerate(split_text(text))
+    ]
+
+def deduplicate(chunks: list[Chunk], already_stored: set[str]) -> list[Chunk]:
+    '''Drops chunks whose text is already stored, or repeats an earlier chunk of this batch'''
+    seen = set(already_stored)
+    unique = []
+    for chunk in chunks:
+        if chunk.content_hash not in seen:
+            seen.add(chunk.content_hash)
+            unique.append(chunk)
+    return unique
@@ -1,52 +1,279 @@
 """
 Handles Elasticsearch indexing, storage, and k-NN search for text embeddings.
 """
-from elasticsearch import Elasticsearch
+import os
+import time
+import uuid
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+from elasticsearch import Elasticsearch, helpers
 
 from src.memory.embeddings import N_DIMENSIONS, embedding_of_text
 from src.memory.models import Document
+from src.memory.store import KNN_CANDIDATE_FACTOR
 
 # Connect to Elasticsearch
 es = Elasticsearch("http://localhost:9200")
 
-# Define the index mapping
-index_name = "vector_index_v0"
-mapping = {
-    "mappings": {
-        "properties": {
-            "text": {"type": "text"},
-            "embedding": {
-                "type": "dense_vector",
-                "dims": N_DIMENSIONS,   # Change based on your embedding model
-                "index": True,
-                "similarity": "cosine"  # Options: "l2_norm", "dot_product", "cosine"
+#### Index layout ####
+
+# Every read and write goes through this alias, so an index can be rebuilt in a new layout and swapped in
+# atomically (see scripts/migrate_vector_index.py)
+index_name = "vector_index"
+LEGACY_INDEX_NAME = "vector_index_v0"   # the original float32 index, served through the alias until migrated
+
+# dense_vector index_options type for each supported quantization; int8 needs Elasticsearch 8.12,
+# int4 8.15 and bbq 8.16. Quantized layouts keep the float vectors on disk for rescoring.
+QUANTIZATION_TYPES = {"none": "hnsw", "int8": "int8_hnsw", "int4": "int4_hnsw", "bbq": "bbq_hnsw"}
+VECTOR_QUANTIZATION = os.getenv("HONEYCOMB_VECTOR_QUANTIZATION", "int8")  # layout of newly created indices
+
+# quantized search fetches this many times more neighbours than asked for, then re-ranks them by the
+# exact float32 cosine similarity; 1 disables rescoring
+RESCORE_OVERSAMPLE = float(os.getenv("HONEYCOMB_RESCORE_OVERSAMPLE", "3"))
+
+# chunk metadata written by the ingestion pipeline, filterable with exact matches
+METADATA_PROPERTIES = {
+    "conversation_id": {"type": "keyword"},
+    "position": {"type": "integer"},
+    "timestamp": {"type": "double"},        # seconds since the epoch
+    "content_hash": {"type": "keyword"},
+    "file_id": {"type": "keyword"},
+    "revision": {"type": "keyword"},
+}
+
+def index_mapping(quantization: str = VECTOR_QUANTIZATION) -> dict:
+    if quantization not in QUANTIZATION_TYPES:
+        raise ValueError(f"Unknown quantization {quantization}, expected one of {', '.join(QUANTIZATION_TYPES)}.")
+    return {
+        "mappings": {
+            "properties": {
+                "text": {"type": "text"},
+                "embedding": {
+                    "type": "dense_vector",
+                    "dims": N_DIMENSIONS,   # Change based on your embedding model
+                    "index": True,
+                    "similarity": "cosine", # Options: "l2_norm", "dot_product", "cosine"
+                    "index_options": {"type": QUANTIZATION_TYPES[quantization]},
+                },
+                **METADATA_PROPERTIES,
             }
         }
     }
-}
 
-# Create the index
-if not es.indices.exists(index=index_name):
-    es.indices.create(index=index_name, body=mapping)
+def index_quantization(index: str = index_name) -> str:
+    '''Returns the quantization of the index (or the index behind the alias)'''
+    for body in es.indices.get_mapping(index=index).values():
+        options = body["mappings"]["properties"]["embedding"].get("index_options", {})
+        for quantization, index_type in QUANTIZATION_TYPES.items():
+            if options.get("type") == index_type:
+                return quantization
+    return "none"
+
+def ensure_index() -> None:
+    '''Creates the index, or puts the alias in front of the legacy one'''
+    if not es.indices.exists_alias(name=index_name):
+        if es.indices.exists(index=LEGACY_INDEX_NAME):
+            es.indices.put_alias(index=LEGACY_INDEX_NAME, name=index_name)
+        else:
+            es.indices.create(index=f"{index_name}_v1", body=index_mapping(), aliases={index_name: {}})
+    # indices created before the metadata existed only need the new fields added
+    es.indices.put_mapping(index=index_name, properties=METADATA_PROPERTIES)
+
+# the alias may be swapped by a migration while we run, so the layout is re-read now and then
+_layout = {"quantization": None, "checked_at": 0.0}
+LAYOUT_RECHECK_SECONDS = 60
+
+def _quantized() -> bool:
+    now = time.monotonic()
+    if _layout["quantization"] is None or now - _layout["checked_at"] > LAYOUT_RECHECK_SECONDS:
+        _layout["quantization"] = index_quantization()
+        _layout["checked_at"] = now
+    return _layout["quantization"] != "none"
 
 def write(document: Document):
     es.index(index=index_name, body=document.__dict__)
 
-def knn(query: str, k: int):
-    query_embedding = embedding_of_text(query)
+def write_many(documents: Iterable[Document], refresh: bool = False, chunk_size: int = 500) -> tuple[list[str], list[dict[str, Any]]]:
+    """
+    Indexes documents with the bulk API, `chunk_size` per request. Failures are reported per
+    document instead of aborting the batch. Returns the ids of the indexed documents, in input
+    order, and the errors with the input position of each failed document.
+    """
+    # retried documents come back after the rest of their chunk, so results are matched to their
+    # input by _id rather than by arrival order; the ids are ours, which also makes a retry idempotent
+    positions: dict[str, int] = {}
+    def actions():
+        for position, document in enumerate(documents):
+            doc_id = uuid.uuid4().hex
+            positions[doc_id] = position
+            yield {"_index": index_name, "_id": doc_id, "_source": document.__dict__}
 
-    # Search for similar documents
-    knn_query = {
-        "size": k,                              # Number of results to return
-        "knn": {                                # k-NN search block
-            "field": "embedding",               # Name of the dense_vector field
-            "query_vector": query_embedding,    # Query embedding
-            "k": 3,                             # Number of nearest neighbors to retrieve
-            "num_candidates": 10                # More candidates = better recall, but slower
+    indexed, failed = [], []
+    for ok, item in helpers.streaming_bulk(es, actions(), chunk_size=chunk_size, max_retries=3,
+                                           raise_on_error=False, raise_on_exception=False):
+        result = item.get("index", {})
+        position = positions[result["_id"]]
+        if ok:
+            indexed.append((position, result["_id"]))
+        else:
+            failed.append({"position": position, "error": result.get("error", str(result))})
+
+    # make the new documents searchable now instead of at the next periodic refresh
+    if refresh:
+        es.indices.refresh(index=index_name)
+    return [doc_id for _, doc_id in sorted(indexed)], sorted(failed, key=lambda error: error["position"])
+
+def existing_hashes(hashes: list[str], filters: Optional[dict[str, Any]] = None) -> set[str]:
+    '''Returns which of the content hashes are already indexed in documents matching the filters'''
+    found = set()
+    for start in range(0, len(hashes), 1000):
+        batch = hashes[start:start + 1000]
+        response = es.search(index=index_name, body={
+            "size": len(batch),
+            "query": {"bool": {"filter": [{"terms": {"content_hash": batch}}, *_filter_clauses(filters)]}},
+            "_source": ["content_hash"],
+        })
+        found.update(hit["_source"]["content_hash"] for hit in response["hits"]["hits"])
+    return found
+
+def delete(filters: dict[str, Any], refresh: bool = True) -> int:
+    '''Deletes every document matching the filters, returning how many were deleted'''
+    response = es.delete_by_query(
+        index=index_name, query={"bool": {"filter": _filter_clauses(filters)}}, refresh=refresh, conflicts="proceed"
+    )
+    return response["deleted"]
+
+def scan(page_size: int = 1000, keep_alive: str = "5m") -> Iterator[tuple[list[str], list[str], np.ndarray]]:
+    '''Pages through every stored document with a point-in-time, yielding ids, texts and a float32 matrix of embeddings'''
+    pit_id = es.open_point_in_time(index=index_name, keep_alive=keep_alive)["id"]
+    search_after = None
+    try:
+        while True:
+            body = {
+                "size": page_size,
+                "pit": {"id": pit_id, "keep_alive": keep_alive},
+                "sort": [{"_shard_doc": "asc"}],    # cheapest stable order for a full pass
+                "_source": ["text", "embedding"],
+            }
+            if search_after is not None:
+                body["search_after"] = search_after
+            response = es.search(body=body)
+            hits = response["hits"]["hits"]
+            if not hits:
+                return
+            pit_id = response.get("pit_id", pit_id)
+            search_after = hits[-1]["sort"]
+            yield ([hit["_id"] for hit in hits],
+                   [hit["_source"]["text"] for hit in hits],
+                   np.asarray([hit["_source"]["embedding"] for hit in hits], dtype=np.float32))
+    finally:
+        es.close_point_in_time(id=pit_id)
+
+#### Search ####
+
+MAX_NUM_CANDIDATES = 10_000     # Elasticsearch rejects anything larger
+RRF_RANK_CONSTANT = 60          # the usual RRF constant; larger values flatten the contribution of top ranks
+RRF_WINDOW_SIZE = 100           # how deep into each result list fusion looks
+
+def _num_candidates(k: int, num_candidates: Optional[int]) -> int:
+    return min(max(num_candidates or k * KNN_CANDIDATE_FACTOR, k), MAX_NUM_CANDIDATES)
+
+def _filter_clauses(filters: Optional[dict[str, Any]]) -> list[dict]:
+    # a list value matches any of its entries, anything else must match exactly
+    return [
+        {"terms": {field: value}} if isinstance(value, list) else {"term": {field: value}}
+        for field, value in (filters or {}).items()
+    ]
+
+def _knn_clause(query_embedding: list[float], k: int, num_candidates: int, similarity: Optional[float],
+                filters: Optional[dict[str, Any]]) -> dict:
+    clause = {
+        "field": "embedding",               # Name of the dense_vector field
+        "query_vector": query_embedding,
+        "k": k,                             # Number of nearest neighbors to retrieve
+        "num_candidates": num_candidates,   # More candidates = better recall, but slower
+    }
+    if similarity is not None:
+        clause["similarity"] = similarity   # minimum cosine similarity, not the (1 + cos) / 2 score
+    if filters:
+        clause["filter"] = _filter_clauses(filters)    # applied during the graph search, not after it
+    return clause
+
+
+def _rescore(query_embedding: list[float], window: int) -> dict:
+    # re-rank the quantized neighbours by exact cosine similarity against the stored float vectors
+    return {
+        "window_size": window,
+        "query": {
+            "rescore_query": {
+                "script_score": {
+                    "query": {"match_all": {}},
+                    "script": {
+                        "source": "(cosineSimilarity(params.query_vector, 'embedding') + 1.0) / 2.0",  # same scale as the knn score
+                        "params": {"query_vector": query_embedding},
+                    },
+                }
+            },
+            "query_weight": 0,
+            "rescore_query_weight": 1,
         },
+    }
+
+def vector_search_body(query_embedding: list[float], k: int, num_candidates: Optional[int] = None, similarity: Optional[float] = None,
+                       filters: Optional[dict[str, Any]] = None, quantized: Optional[bool] = None,
+                       oversample: float = RESCORE_OVERSAMPLE) -> dict:
+    '''Builds a kNN search request; quantized indices (by default, whatever the alias points at) get oversampled and rescored'''
+    if quantized is None:
+        quantized = _quantized()
+    num_candidates = _num_candidates(k, num_candidates)
+    window = max(k, int(k * oversample)) if quantized else k
+    body = {
+        "size": k,                              # Number of results to return
+        "knn": _knn_clause(query_embedding, window, max(num_candidates, window), similarity, filters),
         "_source": ["text"]                     # Only retrieve the "text" field
     }
+    if window > k:
+        body["rescore"] = _rescore(query_embedding, window)
+    return body
 
+def knn(query: str, k: int, num_candidates: Optional[int] = None, similarity: Optional[float] = None,
+        filters: Optional[dict[str, Any]] = None) -> list[dict]:
+    """
+    Returns the hits of a vector search for `query`. `similarity` drops neighbours below that cosine
+    similarity and `filters` restricts the search to documents whose fields match exactly.
+    """
+    knn_query = vector_search_body(embedding_of_text(query), k, num_candidates, similarity, filters)
     response = es.search(index=index_name, body=knn_query)
-    return response
+    return response["hits"]["hits"]
+
+def hybrid(query: str, k: int, num_candidates: Optional[int] = None, similarity: Optional[float] = None,
+           filters: Optional[dict[str, Any]] = None) -> list[dict]:
+    """
+    Runs a BM25 match on `text` and a vector search in one multi-search request and merges the two
+    rankings with reciprocal rank fusion. The `_score` of each returned hit is its fused score.
+    """
+    num_candidates = _num_candidates(k, num_candidates)
+    window = max(k, min(num_candidates, RRF_WINDOW_SIZE))
+
+    bm25_query = {"match": {"text": query}}
+    if filters:
+        bm25_query = {"bool": {"must": bm25_query, "filter": _filter_clauses(filters)}}
+
+    searches = [
+        {"index": index_name},
+        {"size": window, "query": bm25_query, "_source": ["text"]},
+        {"index": index_name},
+        vector_search_body(embedding_of_text(query), window, num_candidates, similarity, filters),
+    ]
+    responses = es.msearch(searches=searches)["responses"]
+
+    fused: dict[str, dict] = {}
+    for response in responses:
+        if "error" in response:
+            raise RuntimeError(f"Hybrid search failed: {response['error']}")
+        for rank, hit in enumerate(response["hits"]["hits"], start=1):
+            entry = fused.setdefault(hit["_id"], {**hit, "_score": 0.0})
+            entry["_score"] += 1.0 / (RRF_RANK_CONSTANT + rank)
 
+    return sorted(fused.values(), key=lambda hit: hit["_score"], reverse=True)[:k]
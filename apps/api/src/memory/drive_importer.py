@@ -0,0 +1,161 @@
+"""
+Imports Google Drive documents into the memory store, so questions about them are answered with one
+vector query instead of listing and reading files through the Drive tool.
+
+Files are downloaded (exported, for Google formats) on a bounded pool of threads while the ones that
+arrived are chunked, embedded and written in batches. The revision indexed for each file is recorded
+in a state file, so a later run only downloads files that changed since: their old chunks are deleted
+and the new revision is written.
+"""
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Optional
+
+from src.memory.chunking import chunk_document
+from src.memory.embeddings import EMBEDDING_BATCH_SIZE
+from src.memory.models import Chunk
+from src.memory.service import remember_chunks
+from src.memory.store import get_store
+
+DRIVE_IMPORT_QUERY = "trashed = false"     # every file in Drive
+DRIVE_IMPORT_STATE = os.getenv("HONEYCOMB_DRIVE_IMPORT_STATE", "drive_import_state.json")
+DRIVE_IMPORT_WORKERS = 8            # concurrent downloads
+DRIVE_IMPORT_BATCH_CHUNKS = 512     # chunks embedded and written per batch; state is saved after each
+DRIVE_IMPORT_MAX_BYTES = 10 * 2**20     # text read per file, the most Drive exports anyway
+DRIVE_IMPORT_FIELDS = "id, name, mimeType, size, md5Checksum, modifiedTime"
+
+# Google formats export to text; uploaded files are only read when they are text already
+TEXT_MIME_TYPES = {
+    "application/vnd.google-apps.document",
+    "application/vnd.google-apps.spreadsheet",
+    "application/vnd.google-apps.presentation",
+    "application/json",
+    "application/xml",
+    "application/x-yaml",
+}
+
+def is_text(mime_type: str) -> bool:
+    return mime_type.startswith("text/") or mime_type in TEXT_MIME_TYPES
+
+#### State ####
+
+def _load_state(state_path: str) -> dict[str, Any]:
+    if not os.path.exists(state_path):
+        return {"files": {}}
+    with open(state_path) as f:
+        return json.load(f)
+
+def _save_state(state_path: str, state: dict[str, Any]) -> None:
+    # write then rename, so a crash never leaves a half-written state file
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+def import_drive(query: str = DRIVE_IMPORT_QUERY, folder_id: Optional[str] = None, modified_after: Optional[str] = None,
+                 state_path: str = DRIVE_IMPORT_STATE, workers: int = DRIVE_IMPORT_WORKERS,
+                 batch_chunks: int = DRIVE_IMPORT_BATCH_CHUNKS, batch_size: int = EMBEDDING_BATCH_SIZE,
+                 limit: Optional[int] = None, prune: bool = False) -> dict[str, int]:
+    '''
+    Indexes the text files matching the Drive query whose current revision is not indexed yet.
+    With `prune`, files indexed before that are no longer in Drive (trashed or deleted) are removed
+    from memory; pruning needs the full listing, so it cannot be combined with a narrower selection.
+    '''
+    # a narrowed listing leaves out files that still exist, and pruning would delete their chunks
+    if prune and (query != DRIVE_IMPORT_QUERY or folder_id or modified_after or limit is not None):
+        raise ValueError("prune needs the full listing; it cannot be combined with query, folder_id, "
+                         "modified_after or limit")
+
+    # the Google client stack is only needed here, not by the rest of the memory package
+    from src.tools.GDriveTool import GoogleDriveTool, file_revision
+
+    tool = GoogleDriveTool()
+    store = get_store()
+    state = _load_state(state_path)
+    indexed: dict[str, str] = state["files"]     # file id -> revision in memory
+    stats = {"listed": 0, "unchanged": 0, "skipped": 0, "files": 0, "chunks": 0,
+             "indexed": 0, "duplicates": 0, "errors": 0, "removed": 0}
+    seen: set[str] = set()
+
+    def changed_files():
+        listing = tool.list_files(
+            query=query, max_results=limit if limit is not None else 2**31, order_by=None,
+            modified_after=modified_after, folder_id=folder_id, fields=DRIVE_IMPORT_FIELDS,
+        )
+        for metadata in listing:
+            stats["listed"] += 1
+            seen.add(metadata["id"])
+            if not is_text(metadata.get("mimeType", "")):
+                stats["skipped"] += 1
+            elif indexed.get(metadata["id"]) == file_revision(metadata):
+                stats["unchanged"] += 1
+            else:
+                yield metadata
+
+    pending: list[Chunk] = []
+    pending_files: dict[str, str] = {}
+
+    def flush():
+        nonlocal pending, pending_files
+        if pending:
+            # duplicates are only dropped within a file: a passage two files share must survive
+            # either one being deleted. Refresh so the next batch's check sees this one
+            response = remember_chunks(pending, batch_size=batch_size, refresh=True, dedup_scope="file_id")
+            stats["chunks"] += response.chunks
+            stats["indexed"] += len(response.indexed)
+            stats["duplicates"] += response.duplicates
+            stats["errors"] += len(response.errors)
+        # a file counts as indexed only once all of its chunks are written
+        indexed.update(pending_files)
+        _save_state(state_path, state)
+        print(f"{stats['files']} files read, {stats['unchanged']} unchanged, {stats['indexed']} chunks indexed, "
+              f"{stats['errors']} errors")
+        pending, pending_files = [], {}
+
+    files = changed_files()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drive-import") as pool:
+        in_flight = {}
+
+        def submit_next() -> bool:
+            metadata = next(files, None)
+            if metadata is not None:
+                # a bulk import would flush the interactive content cache, so it reads around it
+                in_flight[pool.submit(tool.read_text, metadata, DRIVE_IMPORT_MAX_BYTES, use_cache=False)] = metadata
+            return metadata is not None
+
+        # a bounded window of downloads, so memory does not grow with the size of the Drive
+        for _ in range(2 * workers):
+            if not submit_next():
+                break
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                metadata = in_flight.pop(future)
+                submit_next()
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"Reading {metadata.get('name')} ({metadata['id']}) failed: {e}")
+                    stats["errors"] += 1
+                    continue
+
+                # the previous revision's chunks go first, so unchanged passages are not skipped as duplicates
+                if metadata["id"] in indexed:
+                    store.delete({"file_id": metadata["id"]})
+                modified = datetime.fromisoformat(metadata["modifiedTime"]).timestamp() if metadata.get("modifiedTime") else None
+                pending.extend(chunk_document(text, metadata["id"], file_revision(metadata), modified))
+                pending_files[metadata["id"]] = file_revision(metadata)
+                stats["files"] += 1
+                if len(pending) >= batch_chunks:
+                    flush()
+    flush()
+
+    if prune:
+        for file_id in [file_id for file_id in indexed if file_id not in seen]:
+            store.delete({"file_id": file_id})
+            del indexed[file_id]
+            stats["removed"] += 1
+        _save_state(state_path, state)
+    return stats
@@ -0,0 +1,86 @@
+"""
+Collects concurrent encode requests into micro-batches and runs them on a dedicated model thread.
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+import numpy as np
+
+class EmbeddingBatcher:
+    """
+    Callers submit texts from any thread or coroutine; a single worker thread owns the model and
+    encodes whatever has queued up, waiting at most `max_wait_ms` after the first request for
+    others to join, up to `max_batch_size` texts. One forward pass over many short queries is
+    much cheaper than one per query, and only one thread ever touches the model.
+    """
+    def __init__(self, encode: Callable[[list[str]], np.ndarray], max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self._encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._requests: queue.Queue[tuple[list[str], Future]] = queue.Queue()
+        self._worker: threading.Thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, texts: list[str]) -> Future:
+        '''Queues texts for encoding; the future resolves to a float32 array with one row per text'''
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.empty((0, 0), dtype=np.float32))
+            return future
+        self._ensure_worker()
+        self._requests.put((texts, future))
+        return future
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        return self.submit(texts).result()
+
+    async def aencode(self, texts: list[str]) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._loop, name="embedding-batcher", daemon=True)
+                    self._worker.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._requests.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+
+            # keep collecting until the batch is full or the oldest request has waited long enough
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request[0])
+
+            self._run(batch)
+
+    def _run(self, batch: list[tuple[list[str], Future]]) -> None:
+        # drop requests whose callers gave up while queued
+        batch = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            vectors = np.asarray(self._encode([text for texts, _ in batch for text in texts]), dtype=np.float32)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        start = 0
+        for texts, future in batch:
+            future.set_result(vectors[start:start + len(texts)])
+            start += len(texts)
@@ -0,0 +1,160 @@
+"""
+Content-addressed cache for text embeddings, with an in-process LRU tier and an optional on-disk tier.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+def normalize_text(text: str) -> str:
+    # whitespace and unicode form do not change what the model sees, so they should not change the key
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+class EmbeddingCache:
+    """
+    Maps (model name, model version, truncate_dim, normalized text) to an embedding. The model version
+    is resolved on the first lookup, so building the cache does not load the model. Recent vectors
+    are kept in memory; when `directory` is given, every vector is also appended to a float32 block
+    file that is memory-mapped for reads, with an SQLite index from key to row. The disk tier is
+    shared by every process pointing at the same directory.
+    """
+    def __init__(self, model_name: str, model_version: Callable[[], str], dims: int, capacity: int = 10_000,
+                 directory: Optional[str] = None):
+        self.dims = dims
+        self.capacity = capacity
+        self._model_name = model_name
+        self._model_version = model_version
+        self._namespace: Optional[str] = None
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._vectors_path = None
+        self._vectors: Optional[np.memmap] = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            # one block file per dimensionality, so a truncate_dim change never misreads rows
+            self._vectors_path = os.path.join(directory, f"vectors-{dims}.f32")
+            self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+            self._conn.commit()
+
+    def key(self, text: str) -> str:
+        if self._namespace is None:
+            self._namespace = f"{self._model_name}|{self._model_version()}|{self.dims}|"
+        return hashlib.sha256((self._namespace + normalize_text(text)).encode("utf-8")).hexdigest()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+            }
+
+    def get_many(self, keys: list[str]) -> list[Optional[np.ndarray]]:
+        '''Returns the cached vector for each key, or None where it has to be computed'''
+        with self._lock:
+            found: list[Optional[np.ndarray]] = []
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                found.append(vector)
+
+            missing = [i for i, vector in enumerate(found) if vector is None]
+            if missing and self._conn is not None:
+                for i, vector in zip(missing, self._read_disk_locked([keys[i] for i in missing])):
+                    if vector is not None:
+                        found[i] = vector
+                        self._remember_locked(keys[i], vector)
+                        self.disk_hits += 1
+
+            misses = sum(vector is None for vector in found)
+            self.misses += misses
+            self.hits += len(found) - misses
+            return found
+
+    def put_many(self, keys: list[str], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(keys), self.dims)
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember_locked(key, vector)
+            if self._conn is not None:
+                self._write_disk_locked(keys, vectors)
+
+    def _remember_locked(self, key: str, vector: np.ndarray) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    #### On-disk tier ####
+
+    def _rows_locked(self, keys: list[str]) -> dict[str, int]:
+        rows: dict[str, int] = {}
+        # stay well under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.update(self._conn.execute(
+                f"SELECT key, row FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall())
+        return rows
+
+    def _read_disk_locked(self, keys: list[str]) -> list[Optional[np.ndarray]]:
+        rows = self._rows_locked(keys)
+        if not rows:
+            return [None] * len(keys)
+
+        vectors = self._mapped_locked(max(rows.values()) + 1)
+        # copy out of the map so cached vectors do not pin the file
+        return [np.array(vectors[rows[key]]) if key in rows else None for key in keys]
+
+    def _mapped_locked(self, min_rows: int) -> np.memmap:
+        # remap only when another writer (or we) grew the file past the current view
+        if self._vectors is None or len(self._vectors) < min_rows:
+            n_rows = os.path.getsize(self._vectors_path) // (4 * self.dims)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(n_rows, self.dims))
+        return self._vectors
+
+    def _write_disk_locked(self, keys: list[str], vectors: np.ndarray) -> None:
+        conn = self._conn
+        # BEGIN IMMEDIATE takes SQLite's write lock, which also serializes appends from other processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            known = set(self._rows_locked(keys))
+            new_keys, new_vectors = [], []
+            for key, vector in zip(keys, vectors):
+                if key not in known:
+                    known.add(key)
+                    new_keys.append(key)
+                    new_vectors.append(vector)
+            if new_keys:
+                row_bytes = 4 * self.dims
+                with open(self._vectors_path, "ab") as f:
+                    first_row, torn = divmod(f.tell(), row_bytes)
+                    if torn:
+                        # drop a partial row left by a crashed writer so rows stay aligned
+                        f.truncate(first_row * row_bytes)
+                    f.write(np.stack(new_vectors).tobytes())
+                conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, row) VALUES (?, ?)",
+                    [(key, first_row + i) for i, key in enumerate(new_keys)],
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
@@ -0,0 +1,27 @@
+"""
+Standalone embedding service. Run it as a single process and point the API workers at it with
+HONEYCOMB_EMBEDDING_URL; concurrent requests from every worker are micro-batched onto one model.
+"""
+from fastapi import FastAPI, Response
+
+from src.memory.embeddings import EMBEDDING_SERVICE_URL, MODEL_NAME, N_DIMENSIONS, aencode, model_version, warm_up
+from src.memory.models import EncodeRequest
+
+if EMBEDDING_SERVICE_URL:
+    raise RuntimeError("HONEYCOMB_EMBEDDING_URL must not be set for the embedding server itself.")
+
+# this process exists to serve the model, so load it before accepting requests
+warm_up()
+
+app = FastAPI()
+
+@app.get("/health")
+def health():
+    # model_version keys the API workers' embedding caches
+    return {"model": MODEL_NAME, "model_version": model_version(), "dims": N_DIMENSIONS}
+
+@app.post("/encode")
+async def encode(request: EncodeRequest):
+    # raw little-endian float32 rows; much smaller and faster to parse than JSON lists of floats
+    vectors = await aencode(request.texts)
+    return Response(content=vectors.astype("<f4").tobytes(), media_type="application/octet-stream")
@@ -1,12 +1,169 @@
 """
 Generates 384-dimensional text embeddings using the all-MiniLM-L6-v2 model from SentenceTransformers.
+
+Encoding goes through a micro-batcher that owns the model on one thread. The model is loaded on first
+use. When HONEYCOMB_EMBEDDING_URL is set the model is not loaded here at all: requests are batched and
+sent to the embedding server (src/memory/embedding_server.py), so every API worker shares one copy.
 """
-from sentence_transformers import SentenceTransformer
+import os
+import threading
+from importlib.metadata import PackageNotFoundError, version
+
+import httpx
+import numpy as np
+
+from src.memory.embedding_batcher import EmbeddingBatcher
+from src.memory.embedding_cache import EmbeddingCache
 
+MODEL_NAME = "all-MiniLM-L6-v2"
+# pin a hub revision to make upgrades explicit; it is part of the cache key, so changing it invalidates cached vectors
+MODEL_REVISION = os.getenv("HONEYCOMB_EMBEDDING_REVISION")
 N_DIMENSIONS = 384
+MAX_SEQ_TOKENS = 256        # word pieces the model reads, including [CLS] and [SEP]; the rest is silently cut off
+EMBEDDING_BATCH_SIZE = 64   # texts per forward pass when encoding in bulk
+EMBEDDING_MAX_WAIT_MS = 5.0 # how long a request may wait for others to share its forward pass
+
+EMBEDDING_CACHE_SIZE = 10_000   # vectors kept in memory, ~1.5 KiB each at 384 dimensions
+EMBEDDING_CACHE_DIR = os.getenv("HONEYCOMB_EMBEDDING_CACHE_DIR")    # unset keeps the cache in memory only
+
+EMBEDDING_SERVICE_URL = os.getenv("HONEYCOMB_EMBEDDING_URL")    # e.g. http://localhost:8001
+
+# The model (and torch with it) is loaded on first use or by warm_up(), never at import
+_model = None
+_tokenizer = None
+_model_version = None
+_load_lock = threading.Lock()
+
+def get_model():
+    '''Returns the local embedding model, loading it on first use'''
+    global _model
+    if EMBEDDING_SERVICE_URL:
+        raise RuntimeError("The embedding model runs in the embedding server when HONEYCOMB_EMBEDDING_URL is set.")
+    if _model is None:
+        with _load_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(MODEL_NAME, truncate_dim=N_DIMENSIONS, revision=MODEL_REVISION)
+    return _model
+
+def tokenizer():
+    '''Returns the model's tokenizer, loading just the tokenizer when the model runs elsewhere'''
+    global _tokenizer
+    if not EMBEDDING_SERVICE_URL:
+        return get_model().tokenizer
+    if _tokenizer is None:
+        with _load_lock:
+            if _tokenizer is None:
+                from transformers import AutoTokenizer
+                _tokenizer = AutoTokenizer.from_pretrained(f"sentence-transformers/{MODEL_NAME}", revision=MODEL_REVISION)
+    return _tokenizer
+
+def _model_commit() -> str:
+    # the hub cache keeps each download under snapshots/<commit>/, so this resolves "main" (or a
+    # pinned branch) to the weights actually loaded, without a network call
+    from huggingface_hub import try_to_load_from_cache
+    path = try_to_load_from_cache(f"sentence-transformers/{MODEL_NAME}", "config.json", revision=MODEL_REVISION)
+    if isinstance(path, str):
+        snapshot = os.path.dirname(path)
+        if os.path.basename(os.path.dirname(snapshot)) == "snapshots":
+            return os.path.basename(snapshot)
+    return MODEL_REVISION or "main"
+
+def _library_version() -> str:
+    # read from package metadata, importing sentence_transformers would pull in torch
+    try:
+        return version("sentence-transformers")
+    except PackageNotFoundError:
+        return "unknown"
+
+def model_version() -> str:
+    '''
+    Identifies the weights behind the embeddings, for the cache key: the hub commit the model was
+    loaded from and the library version. With a remote model the embedding server reports its own,
+    so the API workers need neither the model nor sentence-transformers installed.
+    '''
+    global _model_version
+    if _model_version is None:
+        if EMBEDDING_SERVICE_URL:
+            response = _client.get("/health")
+            response.raise_for_status()
+            _model_version = response.json()["model_version"]
+        else:
+            get_model()
+            _model_version = f"{_model_commit()}/sentence-transformers-{_library_version()}"
+    return _model_version
+
+def is_loaded() -> bool:
+    return (_tokenizer if EMBEDDING_SERVICE_URL else _model) is not None
 
-# Load embedding model
-model = SentenceTransformer("all-MiniLM-L6-v2", truncate_dim=N_DIMENSIONS)
+def warm_up() -> None:
+    '''Loads the model (or just the tokenizer, with a remote model) so the first request does not pay for it'''
+    tokenizer()
+
+if EMBEDDING_SERVICE_URL:
+    _client = httpx.Client(base_url=EMBEDDING_SERVICE_URL, timeout=60)
+
+    def _encode(texts: list[str]) -> np.ndarray:
+        response = _client.post("/encode", json={"texts": texts})
+        response.raise_for_status()
+        return np.frombuffer(response.content, dtype=np.float32).reshape(len(texts), N_DIMENSIONS)
+else:
+    def _encode(texts: list[str]) -> np.ndarray:
+        return get_model().encode(texts, batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True)
+
+batcher = EmbeddingBatcher(_encode, max_batch_size=EMBEDDING_BATCH_SIZE, max_wait_ms=EMBEDDING_MAX_WAIT_MS)
+
+cache = EmbeddingCache(
+    model_name=MODEL_NAME,
+    model_version=model_version,
+    dims=N_DIMENSIONS,
+    capacity=EMBEDDING_CACHE_SIZE,
+    directory=EMBEDDING_CACHE_DIR,
+)
+
+def _lookup(texts: list[str], batch_size: int) -> tuple[list[str], list, list[list[str]]]:
+    keys = [cache.key(text) for text in texts]
+    vectors = cache.get_many(keys)
+
+    # encode each distinct uncached text once, even if it repeats within the batch
+    pending: dict[str, str] = {}
+    for key, text, vector in zip(keys, texts, vectors):
+        if vector is None and key not in pending:
+            pending[key] = text
+
+    # large inputs go in as several requests so they interleave with other callers' queries
+    pending_keys = list(pending)
+    chunks = [pending_keys[start:start + batch_size] for start in range(0, len(pending_keys), batch_size)]
+    return keys, vectors, [[pending[key] for key in chunk] for chunk in chunks]
+
+def _fill(keys: list[str], vectors: list, chunks: list[list[str]], encoded: list[np.ndarray]) -> np.ndarray:
+    fresh = {}
+    for chunk, chunk_vectors in zip(chunks, encoded):
+        chunk_keys = [cache.key(text) for text in chunk]
+        cache.put_many(chunk_keys, chunk_vectors)
+        fresh.update(zip(chunk_keys, chunk_vectors))
+    return np.stack([vector if vector is not None else fresh[key] for key, vector in zip(keys, vectors)])
+
+def encode(texts: list[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    '''Returns a float32 array with one embedding per text, using the cache where possible'''
+    if not texts:
+        return np.empty((0, N_DIMENSIONS), dtype=np.float32)
+    keys, vectors, chunks = _lookup(texts, batch_size)
+    futures = [batcher.submit(chunk) for chunk in chunks]
+    return _fill(keys, vectors, chunks, [future.result() for future in futures])
+
+async def aencode(texts: list[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    if not texts:
+        return np.empty((0, N_DIMENSIONS), dtype=np.float32)
+    keys, vectors, chunks = _lookup(texts, batch_size)
+    encoded = [await batcher.aencode(chunk) for chunk in chunks]
+    return _fill(keys, vectors, chunks, encoded)
 
 def embedding_of_text(text: str):
-    return model.encode(text).tolist()
+    return encode([text])[0].tolist()
+
+async def aembedding_of_text(text: str) -> list[float]:
+    return (await aencode([text]))[0].tolist()
+
+def embeddings_of_texts(texts: list[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> list[list[float]]:
+    return encode(texts, batch_size).tolist()
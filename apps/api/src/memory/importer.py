@@ -0,0 +1,130 @@
+"""
+Imports a ChatGPT data export (conversations.json) into the memory store.
+
+The export is one large JSON array; it is read one conversation at a time so memory stays bounded
+by the largest single conversation plus one write batch, whatever the size of the file. Progress is
+checkpointed after every batch, so an interrupted import resumes after the last written batch.
+"""
+import json
+import os
+from typing import Any, Iterator, Optional
+
+from src.memory.chunking import chunk_conversation
+from src.memory.embeddings import EMBEDDING_BATCH_SIZE
+from src.memory.models import Chunk
+from src.memory.service import remember_chunks
+
+READ_SIZE = 1 << 20             # bytes read from the export at a time
+IMPORT_BATCH_CHUNKS = 512       # chunks embedded and written per batch; progress is saved after each
+
+def iter_json_array(path: str) -> Iterator[Any]:
+    '''Yields the elements of a top-level JSON array without loading the whole file'''
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer, pos, eof = "", 0, False
+        started = False
+
+        while True:
+            # skip the separators between elements
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,[]":
+                if buffer[pos] == "[":
+                    started = True
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    return
+                buffer, pos = f.read(READ_SIZE), 0
+                eof = not buffer
+                continue
+            if not started:
+                raise ValueError(f"{path} does not contain a JSON array.")
+
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # the element continues past the buffer; read more, doubling so huge elements stay linear
+                more = f.read(max(READ_SIZE, len(buffer) - pos))
+                eof = not more
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield element
+            buffer, pos = buffer[end:], 0
+
+def conversation_messages(conversation: dict[str, Any]) -> tuple[list[str], list[Optional[float]]]:
+    '''Returns the text parts of a conversation and their creation times, oldest first'''
+    messages = []
+    for node in conversation.get("mapping", {}).values():
+        message = node.get("message")
+        if message is None or message["content"].get("content_type") != "text":
+            continue
+        for part in message["content"].get("parts") or []:
+            if isinstance(part, str) and part.strip():
+                messages.append((message.get("create_time") or conversation.get("create_time"), part))
+
+    messages.sort(key=lambda message: message[0] or 0)
+    return [text for _, text in messages], [timestamp for timestamp, _ in messages]
+
+#### Progress ####
+
+def _load_progress(checkpoint_path: str, export_path: str) -> dict[str, Any]:
+    fresh = {"export": os.path.abspath(export_path), "size": os.path.getsize(export_path),
+             "conversations": 0, "chunks": 0, "indexed": 0, "duplicates": 0, "errors": 0}
+    if not os.path.exists(checkpoint_path):
+        return fresh
+    with open(checkpoint_path) as f:
+        progress = json.load(f)
+    # a different or changed export cannot be resumed by position
+    if progress.get("export") != fresh["export"] or progress.get("size") != fresh["size"]:
+        print(f"{checkpoint_path} belongs to another export, starting over")
+        return fresh
+    return progress
+
+def _save_progress(checkpoint_path: str, progress: dict[str, Any]) -> None:
+    # write then rename, so a crash never leaves a half-written checkpoint
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, checkpoint_path)
+
+def import_export(export_path: str, checkpoint_path: Optional[str] = None, batch_chunks: int = IMPORT_BATCH_CHUNKS,
+                  batch_size: int = EMBEDDING_BATCH_SIZE, limit: Optional[int] = None) -> dict[str, Any]:
+    '''Imports every conversation of the export, resuming from `checkpoint_path` if it exists'''
+    checkpoint_path = checkpoint_path or f"{export_path}.progress.json"
+    progress = _load_progress(checkpoint_path, export_path)
+    done = progress["conversations"]
+    if done:
+        print(f"Resuming after {done} conversations")
+
+    pending: list[Chunk] = []
+    pending_conversations = 0
+
+    def flush():
+        nonlocal pending, pending_conversations
+        if pending:
+            # refresh so the next batch's duplicate check sees this one
+            response = remember_chunks(pending, batch_size=batch_size, refresh=True)
+            progress["chunks"] += response.chunks
+            progress["indexed"] += len(response.indexed)
+            progress["duplicates"] += response.duplicates
+            progress["errors"] += len(response.errors)
+        progress["conversations"] += pending_conversations
+        _save_progress(checkpoint_path, progress)
+        print(f"{progress['conversations']} conversations, {progress['indexed']} chunks indexed, "
+              f"{progress['duplicates']} duplicates, {progress['errors']} errors")
+        pending, pending_conversations = [], 0
+
+    for index, conversation in enumerate(iter_json_array(export_path)):
+        if index < done:
+            continue
+        if limit is not None and index >= limit:
+            break
+        texts, timestamps = conversation_messages(conversation)
+        conversation_id = conversation.get("conversation_id") or conversation.get("id") or f"{os.path.basename(export_path)}:{index}"
+        pending.extend(chunk_conversation(texts, conversation_id, timestamps))
+        pending_conversations += 1
+        if len(pending) >= batch_chunks:
+            flush()
+    flush()
+    return progress
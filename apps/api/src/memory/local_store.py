@@ -0,0 +1,264 @@
+"""
+Embedded vector store for small deployments, development and tests: no Elasticsearch needed.
+
+Embeddings live in an append-only float32 file that is memory-mapped for search, documents in an
+append-only JSON-lines log; row i of the matrix belongs to line i of the log. Deleted rows are
+recorded in a tombstone file and skipped. Queries are exact blocked dot products, or probe an IVF
+partitioning once the store is large. The store is owned by a single process.
+"""
+import json
+import os
+import threading
+import uuid
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+
+from src.memory.embeddings import N_DIMENSIONS, embedding_of_text
+from src.memory.models import Document, KNNResult
+from src.memory.store import KNN_CANDIDATE_FACTOR, VectorStore
+
+MEMORY_DIR = os.getenv("HONEYCOMB_MEMORY_DIR", "memory_store")
+SCAN_BLOCK_ROWS = 65_536    # rows per matrix product, bounds the temporary score buffer
+IVF_MIN_ROWS = 50_000       # below this an exact scan is fast enough
+IVF_REBUILD_GROWTH = 0.2    # retrain the partitions once this fraction of rows was added since
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    # unit vectors turn cosine similarity into a plain dot product
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def _top_k(scores: np.ndarray, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    if len(scores) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+        scores, rows = scores[best], rows[best]
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], rows[order]
+
+class _IVFIndex:
+    '''Spherical k-means partitions over the first `n_rows` rows; later rows are always scanned'''
+    def __init__(self, matrix: np.ndarray, iterations: int = 10, seed: int = 0):
+        self.n_rows = len(matrix)
+        n_lists = max(1, int(np.sqrt(self.n_rows)))
+        rng = np.random.default_rng(seed)
+
+        sample = matrix[rng.choice(self.n_rows, size=min(self.n_rows, n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for i in range(n_lists):
+                members = sample[assignment == i]
+                if len(members):
+                    centroids[i] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+        self.centroids = centroids.astype(np.float32)
+
+        assignment = np.concatenate([
+            np.argmax(matrix[start:start + SCAN_BLOCK_ROWS] @ self.centroids.T, axis=1)
+            for start in range(0, self.n_rows, SCAN_BLOCK_ROWS)
+        ])
+        # rows grouped by partition, with offsets[i]:offsets[i + 1] being partition i
+        self.rows = np.argsort(assignment, kind="stable")
+        self.offsets = np.searchsorted(assignment[self.rows], np.arange(n_lists + 1))
+
+    def candidates(self, query: np.ndarray, num_candidates: int, n: int) -> np.ndarray:
+        # probe the closest partitions until they hold enough candidates
+        probed, total = [], 0
+        for i in np.argsort(-(self.centroids @ query)):
+            probed.append(self.rows[self.offsets[i]:self.offsets[i + 1]])
+            total += len(probed[-1])
+            if total >= num_candidates:
+                break
+        probed.append(np.arange(self.n_rows, n))
+        return np.concatenate(probed)
+
+class LocalVectorStore(VectorStore):
+    def __init__(self, directory: str = MEMORY_DIR, dims: int = N_DIMENSIONS):
+        self.dims = dims
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._log_path = os.path.join(directory, "documents.jsonl")
+        self._deleted_path = os.path.join(directory, "deleted.txt")
+        self._lock = threading.Lock()
+        self._documents: list[dict[str, Any]] = []     # id plus every document field except the embedding
+        self._vectors: Optional[np.memmap] = None
+        self._ivf: Optional[_IVFIndex] = None
+        self._hashes: dict[str, list[int]] = {}     # content hash -> rows holding it
+        self._deleted: set[int] = set()     # rows removed by delete()
+        self._load()
+
+    #### Persistence ####
+
+    def _load(self) -> None:
+        documents, ends = [], [0]
+        if os.path.exists(self._log_path):
+            with open(self._log_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break       # torn write from a crash
+                    documents.append(json.loads(line))
+                    ends.append(ends[-1] + len(line))
+
+        row_bytes = 4 * self.dims
+        n_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+
+        # a crash can leave one file ahead of the other; cut both back to the rows they agree on
+        n = min(len(documents), n_rows)
+        with open(self._log_path, "ab") as f:
+            f.truncate(ends[n])
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(n * row_bytes)
+        self._documents = documents[:n]
+
+        if os.path.exists(self._deleted_path):
+            with open(self._deleted_path, "rb") as f:
+                self._deleted = {int(line) for line in f if line.endswith(b"\n") and int(line) < n}
+        self._update_hashes()
+
+    def _update_hashes(self) -> None:
+        self._hashes = {}
+        for row, document in enumerate(self._documents):
+            if document.get("content_hash") and row not in self._deleted:
+                self._hashes.setdefault(document["content_hash"], []).append(row)
+
+    def _alive(self, n: int) -> Optional[np.ndarray]:
+        # mask of the first n rows that were not deleted, None while nothing was
+        if not self._deleted:
+            return None
+        alive = np.ones(n, dtype=bool)
+        alive[[row for row in self._deleted if row < n]] = False
+        return alive
+
+    def _matrix(self, n: int) -> np.ndarray:
+        if n == 0:
+            return np.empty((0, self.dims), dtype=np.float32)
+        # remap only when writes grew the file past the current view
+        if self._vectors is None or len(self._vectors) < n:
+            n_rows = os.path.getsize(self._vectors_path) // (4 * self.dims)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(n_rows, self.dims))
+        return self._vectors[:n]
+
+    def write_many(self, documents: Iterable[Document], refresh: bool = False) -> tuple[list[str], list[dict[str, Any]]]:
+        # writes are visible as soon as they return, so `refresh` has nothing to do here
+        ids, errors, rows, vectors = [], [], [], []
+        for position, document in enumerate(documents):
+            fields = document.__dict__.copy()
+            embedding = np.asarray(fields.pop("embedding"), dtype=np.float32)
+            if embedding.shape != (self.dims,):
+                errors.append({"position": position, "error": f"expected {self.dims} dimensions, got {embedding.shape}"})
+                continue
+            rows.append({"id": uuid.uuid4().hex, **fields})
+            vectors.append(embedding)
+        if not rows:
+            return ids, errors
+
+        with self._lock:
+            # vectors first: a crash before the log line is written only leaves a row that _load drops
+            with open(self._vectors_path, "ab") as f:
+                f.write(_normalize(np.stack(vectors)).astype(np.float32).tobytes())
+            with open(self._log_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(row) + "\n" for row in rows))
+            for position, row in enumerate(rows, start=len(self._documents)):
+                if row.get("content_hash"):
+                    self._hashes.setdefault(row["content_hash"], []).append(position)
+            self._documents.extend(rows)
+        return [row["id"] for row in rows], errors
+
+    def existing_hashes(self, hashes: list[str], filters: Optional[dict[str, Any]] = None) -> set[str]:
+        with self._lock:
+            if not filters:
+                return {h for h in hashes if h in self._hashes}
+            # only the rows holding each hash are checked against the filters, not the whole store
+            return {
+                h for h in hashes
+                if len(self._filter_rows([self._documents[row] for row in self._hashes.get(h, [])], filters))
+            }
+
+    def delete(self, filters: dict[str, Any]) -> int:
+        with self._lock:
+            rows = [int(row) for row in self._filter_rows(self._documents, filters) if row not in self._deleted]
+            if rows:
+                with open(self._deleted_path, "a") as f:
+                    f.write("".join(f"{row}\n" for row in rows))
+                self._deleted.update(rows)
+                self._update_hashes()
+        return len(rows)
+
+    def scan(self, page_size: int = 1000) -> Iterator[tuple[list[str], list[str], np.ndarray]]:
+        with self._lock:
+            n = len(self._documents)
+            documents = self._documents[:n]
+            matrix = self._matrix(n)
+            alive = self._alive(n)
+        for start in range(0, n, page_size):
+            rows = np.arange(start, min(start + page_size, n))
+            if alive is not None:
+                rows = rows[alive[rows]]
+            if len(rows) == 0:
+                continue
+            yield ([documents[row]["id"] for row in rows],
+                   [documents[row]["text"] for row in rows],
+                   np.array(matrix[rows]))
+
+    #### Search ####
+
+    def _filter_rows(self, documents: list[dict[str, Any]], filters: dict[str, Any]) -> np.ndarray:
+        # same semantics as the Elasticsearch term/terms filters: a list matches any of its values
+        accepted = {
+            field: {str(v) for v in value} if isinstance(value, list) else {str(value)}
+            for field, value in filters.items()
+        }
+        return np.fromiter(
+            (i for i, document in enumerate(documents)
+             if all(str(document.get(field)) in values for field, values in accepted.items())),
+            dtype=np.int64,
+        )
+
+    def _ivf_locked(self, matrix: np.ndarray) -> Optional[_IVFIndex]:
+        n = len(matrix)
+        if n < IVF_MIN_ROWS:
+            return None
+        if self._ivf is None or n > self._ivf.n_rows * (1 + IVF_REBUILD_GROWTH):
+            self._ivf = _IVFIndex(np.asarray(matrix))
+        return self._ivf
+
+    def knn(self, query: str, k: int, num_candidates: Optional[int] = None, similarity: Optional[float] = None,
+            filters: Optional[dict[str, Any]] = None) -> list[KNNResult]:
+        query_vector = _normalize(np.asarray(embedding_of_text(query), dtype=np.float32))
+        with self._lock:
+            n = len(self._documents)
+            documents = self._documents[:n]
+            matrix = self._matrix(n)
+            # filtered searches scan the matching rows exactly, so they always find k if there are k
+            ivf = None if filters else self._ivf_locked(matrix)
+            alive = self._alive(n)
+
+        if filters:
+            candidates = self._filter_rows(documents, filters)
+        elif ivf is not None:
+            candidates = ivf.candidates(query_vector, max(num_candidates or k * KNN_CANDIDATE_FACTOR, k), n)
+        else:
+            candidates = None
+
+        best_scores, best_rows = np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        total = n if candidates is None else len(candidates)
+        for start in range(0, total, SCAN_BLOCK_ROWS):
+            if candidates is None:
+                rows = np.arange(start, min(start + SCAN_BLOCK_ROWS, n))
+                scores = matrix[start:start + SCAN_BLOCK_ROWS] @ query_vector
+            else:
+                rows = np.sort(candidates[start:start + SCAN_BLOCK_ROWS])
+                scores = matrix[rows] @ query_vector
+            if alive is not None:
+                keep = alive[rows]
+                rows, scores = rows[keep], scores[keep]
+            if similarity is not None:
+                keep = scores >= similarity
+                rows, scores = rows[keep], scores[keep]
+            best_scores, best_rows = _top_k(np.concatenate([best_scores, scores]), np.concatenate([best_rows, rows]), k)
+
+        # report the same (1 + cos) / 2 score Elasticsearch gives for cosine similarity
+        return [
+            KNNResult(text=documents[row]["text"], score=float((1 + score) / 2))
+            for score, row in zip(best_scores, best_rows)
+        ]
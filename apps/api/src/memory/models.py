@@ -1,10 +1,20 @@
 """
 Defines the Document data model for storing text and embeddings in Elasticsearch.
 """
+from typing import Optional
+
 from pydantic import BaseModel
 
-class Document(BaseModel):
-    text : str 
+class Chunk(BaseModel):
+    text : str
+    conversation_id : Optional[str] = None
+    position : Optional[int] = None         # order of the chunk within its conversation
+    timestamp : Optional[float] = None      # when the source message was written, seconds since the epoch
+    content_hash : Optional[str] = None     # hash of the normalized text, for deduplication
+    file_id : Optional[str] = None          # Drive file the chunk was read from
+    revision : Optional[str] = None         # revision of that file, to re-index it only when it changes
+
+class Document(Chunk):
     embedding : list[float]
 
 # Pydantic response model for KNN queries
@@ -20,3 +30,13 @@ class KNNResponse(BaseModel):
 
     def __str__(self):
         return "\n\n".join(str(result) for result in sorted(self.results, key=lambda result: result.score, reverse=True))
+
+class IngestResponse(BaseModel):
+    indexed: list[str]          # ids of the documents written, in input order
+    errors: list[dict]          # per-document failures, with their position in the input
+    conversation_id: Optional[str] = None
+    chunks: int = 0             # chunks produced from the conversation
+    duplicates: int = 0         # chunks skipped because identical text is already stored
+
+class EncodeRequest(BaseModel):
+    texts: list[str]
@@ -1,18 +1,41 @@
 """
 Defines API routes for managing client memory, including storing and retrieving text embeddings.
 """
-from fastapi import APIRouter, Query
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
 
 import src.memory.service as service
-from src.memory.models import KNNResponse 
+from src.memory.embeddings import EMBEDDING_BATCH_SIZE, cache
+from src.memory.models import IngestResponse, KNNResponse 
 
 router = APIRouter()
 
-@router.post("/conversation")
-def remember_conversation(conversation: list[str] = Query(..., description="The conversation history to write to the user memory")):
-    return service.remember_conversation(conversation)
+@router.post("/conversation", response_model=IngestResponse)
+def remember_conversation(conversation: list[str] = Query(..., description="The conversation history to write to the user memory"),
+                          batch_size: int = Query(EMBEDDING_BATCH_SIZE, ge=1, description="Number of texts to embed per forward pass"),
+                          refresh: bool = Query(False, description="Make the new documents searchable before returning"),
+                          conversation_id: Optional[str] = Query(None, description="Id to tag the chunks with; generated if omitted")):
+    return service.remember_conversation(conversation, batch_size, refresh, conversation_id)
 
 @router.get("/knn", response_model=KNNResponse)
 def get_knn(query: str = Query(..., description="Query text for which to find nearest neighbours"),
-            k: int = Query(..., description="Number of nearest neighbours to retrieve")):
-    return service.knn(query, k)
+            k: int = Query(..., ge=1, le=1000, description="Number of nearest neighbours to retrieve"),
+            num_candidates: Optional[int] = Query(None, ge=1, le=10_000, description="Candidates to consider per shard; more is slower but finds more"),
+            similarity: Optional[float] = Query(None, ge=-1, le=1, description="Minimum cosine similarity of a neighbour"),
+            filter: list[str] = Query([], description="Exact-match filters written as field:value, repeatable"),
+            mode: service.SearchMode = Query("knn", description="knn for vector search only, hybrid to fuse it with a BM25 text match")):
+    filters: dict[str, list[str]] = {}
+    for clause in filter:
+        field, sep, value = clause.partition(":")
+        if not sep or not field:
+            raise HTTPException(status_code=422, detail=f"Filter {clause!r} is not of the form field:value.")
+        filters.setdefault(field, []).append(value)
+    try:
+        return service.get_knn(query, k, num_candidates, similarity, filters, mode)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/embeddings/cache")
+def get_embedding_cache_stats():
+    return cache.stats()
@@ -1,21 +1,61 @@
-from src.memory.db import knn, write
-from src.memory.models import KNNResult, KNNResponse, Document
-from src.memory.embeddings import embedding_of_text
+import uuid
+from collections import defaultdict
+from typing import Any, Iterator, Literal, Optional
 
-# TODO: there's probably some things to do around associating conversations with users, 
-# access control, maybe giving an ID to conversations to tie chunks together. We will probably
-# save conversation histories wit this DB, so some work will need to go into doing that.
+from src.memory.chunking import chunk_conversation, deduplicate
+from src.memory.store import get_store
+from src.memory.models import Chunk, KNNResult, KNNResponse, Document, IngestResponse
+from src.memory.embeddings import EMBEDDING_BATCH_SIZE, embeddings_of_texts
 
-def remember_conversation(conversation: list[str]):
-    for chunk in conversation:
-        document = Document(text=chunk, embedding=embedding_of_text(chunk))
-        write(document)
+# TODO: there's probably some things to do around associating conversations with users and
+# access control.
 
-def get_knn(query: str, k: int) -> KNNResponse:
-    knn_results : list[KNNResponse] = []
+def _embedded_documents(chunks: list[Chunk], batch_size: int) -> Iterator[Document]:
+    # encode lazily, one batch at a time, so bulk indexing overlaps with the next forward pass
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        for chunk, embedding in zip(batch, embeddings_of_texts([chunk.text for chunk in batch], batch_size)):
+            yield Document(**chunk.model_dump(), embedding=embedding)
 
-    base_result = knn(query, k)
-    for hit in base_result["hits"]["hits"]:
-        knn_results.append(KNNResult(text=hit['_source']['text'], score=hit['_score']))
+def _unique_chunks(chunks: list[Chunk], dedup_scope: Optional[str]) -> list[Chunk]:
+    store = get_store()
+    if dedup_scope is None:
+        return deduplicate(chunks, store.existing_hashes([chunk.content_hash for chunk in chunks]))
+    groups: dict[Any, list[Chunk]] = defaultdict(list)
+    for chunk in chunks:
+        groups[getattr(chunk, dedup_scope)].append(chunk)
+    unique = []
+    for value, group in groups.items():
+        stored = store.existing_hashes([chunk.content_hash for chunk in group], filters={dedup_scope: value})
+        unique.extend(deduplicate(group, stored))
+    return unique
+
+def remember_chunks(chunks: list[Chunk], batch_size: int = EMBEDDING_BATCH_SIZE, refresh: bool = False,
+                    dedup_scope: Optional[str] = None) -> IngestResponse:
+    '''
+    Skips chunks whose text is already stored, then embeds and stores the rest. With `dedup_scope`
+    (a chunk field such as "file_id"), a chunk only counts as stored when a document with the same
+    value of that field holds its text, so passages shared by two sources are kept for each.
+    '''
+    store = get_store()
+    unique = _unique_chunks(chunks, dedup_scope)
+    ids, errors = store.write_many(_embedded_documents(unique, batch_size), refresh=refresh)
+    return IngestResponse(indexed=ids, errors=errors, chunks=len(chunks), duplicates=len(chunks) - len(unique))
+
+def remember_conversation(conversation: list[str], batch_size: int = EMBEDDING_BATCH_SIZE, refresh: bool = False,
+                          conversation_id: Optional[str] = None, timestamps: Optional[list[Optional[float]]] = None) -> IngestResponse:
+    '''Chunks a conversation to the model's input size and stores the chunks not seen before'''
+    conversation_id = conversation_id or str(uuid.uuid4())
+    response = remember_chunks(chunk_conversation(conversation, conversation_id, timestamps), batch_size, refresh)
+    response.conversation_id = conversation_id
+    return response
+
+SearchMode = Literal["knn", "hybrid"]
+
+def get_knn(query: str, k: int, num_candidates: Optional[int] = None, similarity: Optional[float] = None,
+            filters: Optional[dict[str, Any]] = None, mode: SearchMode = "knn") -> KNNResponse:
+    store = get_store()
+    search = store.hybrid if mode == "hybrid" else store.knn
+    knn_results : list[KNNResult] = search(query, k, num_candidates=num_candidates, similarity=similarity, filters=filters)
 
     return KNNResponse(results=knn_results)
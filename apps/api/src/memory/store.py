@@ -0,0 +1,94 @@
+"""
+Storage interface for the memory subsystem, with a backend chosen by HONEYCOMB_MEMORY_BACKEND:
+"elasticsearch" (default) or "local" for the embedded NumPy store in src/memory/local_store.py.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+
+from src.memory.models import Document, KNNResult
+
+MEMORY_BACKEND = os.getenv("HONEYCOMB_MEMORY_BACKEND", "elasticsearch")
+
+# Recall versus latency: approximate search visits `k * KNN_CANDIDATE_FACTOR` candidates unless the caller
+# asks for a specific number. Raise it if relevant memories go missing, lower it if search is slow.
+KNN_CANDIDATE_FACTOR = int(os.getenv("HONEYCOMB_KNN_CANDIDATE_FACTOR", "10"))
+
+class VectorStore(ABC):
+    @abstractmethod
+    def write_many(self, documents: Iterable[Document], refresh: bool = False) -> tuple[list[str], list[dict[str, Any]]]:
+        '''Stores documents, returning the ids of those written and per-document errors'''
+
+    @abstractmethod
+    def existing_hashes(self, hashes: list[str], filters: Optional[dict[str, Any]] = None) -> set[str]:
+        '''Returns which of the content hashes belong to documents already stored (and matching the filters)'''
+
+    @abstractmethod
+    def delete(self, filters: dict[str, Any]) -> int:
+        '''Deletes every document matching the filters (same semantics as search filters), returning how many'''
+
+    @abstractmethod
+    def scan(self, page_size: int = 1000) -> Iterator[tuple[list[str], list[str], np.ndarray]]:
+        '''Pages through every stored document, yielding ids, texts and a float32 matrix of their embeddings'''
+
+    @abstractmethod
+    def knn(self, query: str, k: int, num_candidates: Optional[int] = None, similarity: Optional[float] = None,
+            filters: Optional[dict[str, Any]] = None) -> list[KNNResult]:
+        '''Returns the k nearest documents to the query text, best first'''
+
+    def hybrid(self, query: str, k: int, num_candidates: Optional[int] = None, similarity: Optional[float] = None,
+               filters: Optional[dict[str, Any]] = None) -> list[KNNResult]:
+        '''Fuses a keyword match with the vector search; backends without full-text search do not support it'''
+        raise NotImplementedError(f"{type(self).__name__} does not support hybrid search.")
+
+class ElasticsearchStore(VectorStore):
+    def __init__(self):
+        from src.memory import db
+        self._db = db
+        db.ensure_index()
+
+    def write_many(self, documents, refresh=False):
+        return self._db.write_many(documents, refresh=refresh)
+
+    def existing_hashes(self, hashes, filters=None):
+        return self._db.existing_hashes(hashes, filters)
+
+    def delete(self, filters):
+        return self._db.delete(filters)
+
+    def scan(self, page_size=1000):
+        return self._db.scan(page_size)
+
+    def knn(self, query, k, num_candidates=None, similarity=None, filters=None):
+        return self._results(self._db.knn(query, k, num_candidates, similarity, filters))
+
+    def hybrid(self, query, k, num_candidates=None, similarity=None, filters=None):
+        return self._results(self._db.hybrid(query, k, num_candidates, similarity, filters))
+
+    @staticmethod
+    def _results(hits: list[dict]) -> list[KNNResult]:
+        return [KNNResult(text=hit["_source"]["text"], score=hit["_score"]) for hit in hits]
+
+_store: VectorStore = None
+_store_lock = threading.Lock()
+
+def is_connected() -> bool:
+    return _store is not None
+
+def get_store() -> VectorStore:
+    '''Returns the process-wide store, connecting to (or loading) it on first use'''
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if MEMORY_BACKEND == "elasticsearch":
+                    _store = ElasticsearchStore()
+                elif MEMORY_BACKEND == "local":
+                    from src.memory.local_store import LocalVectorStore
+                    _store = LocalVectorStore()
+                else:
+                    raise ValueError(f"Unknown memory backend {MEMORY_BACKEND}, expected elasticsearch or local.")
+    return _store
@@ -0,0 +1,126 @@
+"""
+Tests for the embedded vector store. Texts are embedded with fixed random vectors instead of the model,
+so the tests only exercise the store: memmap growth, tombstones, recovery from a torn log and IVF recall.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from src.memory import local_store
+from src.memory.local_store import LocalVectorStore
+from src.memory.models import Document
+
+DIMS = 16
+
+@pytest.fixture
+def vectors(monkeypatch):
+    '''Text -> embedding table consulted by knn in place of the embedding model'''
+    table: dict[str, np.ndarray] = {}
+    monkeypatch.setattr(local_store, "embedding_of_text", lambda text: table[text])
+    return table
+
+def _write(store: LocalVectorStore, vectors: dict[str, np.ndarray], texts: list[str], **fields) -> list[str]:
+    rng = np.random.default_rng(len(vectors))
+    documents = []
+    for text in texts:
+        vectors.setdefault(text, rng.standard_normal(DIMS).astype(np.float32))
+        documents.append(Document(text=text, embedding=vectors[text].tolist(), content_hash=f"h-{text}", **fields))
+    ids, errors = store.write_many(documents)
+    assert errors == []
+    return ids
+
+def _texts(store: LocalVectorStore) -> list[str]:
+    return [text for _, texts, _ in store.scan() for text in texts]
+
+def test_writes_after_a_search_are_found(tmp_path, vectors):
+    store = LocalVectorStore(str(tmp_path), dims=DIMS)
+    _write(store, vectors, [f"a{i}" for i in range(10)])
+    assert store.knn("a3", 1)[0].text == "a3"
+
+    # the memmap opened by the first search is shorter than the file now
+    _write(store, vectors, [f"b{i}" for i in range(10)])
+    assert store.knn("b7", 1)[0].text == "b7"
+    assert len(store._vectors) == 20
+    assert len(_texts(store)) == 20
+
+def test_wrong_dimensions_are_rejected(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dims=DIMS)
+    ids, errors = store.write_many([Document(text="short", embedding=[1.0, 0.0])])
+    assert ids == [] and errors[0]["position"] == 0
+    assert _texts(store) == []
+
+def test_deleted_documents_stay_deleted(tmp_path, vectors):
+    store = LocalVectorStore(str(tmp_path), dims=DIMS)
+    _write(store, vectors, ["keep1", "keep2"], file_id="keep")
+    _write(store, vectors, ["gone1", "gone2"], file_id="gone")
+
+    assert store.delete({"file_id": "gone"}) == 2
+    assert store.delete({"file_id": "gone"}) == 0
+    assert store.knn("gone1", 1)[0].text != "gone1"
+    assert store.knn("gone1", 1, filters={"file_id": "gone"}) == []
+    assert store.existing_hashes(["h-gone1", "h-keep1"]) == {"h-keep1"}
+    assert sorted(_texts(store)) == ["keep1", "keep2"]
+
+    # tombstones are persisted and still apply after a reload
+    reloaded = LocalVectorStore(str(tmp_path), dims=DIMS)
+    assert sorted(_texts(reloaded)) == ["keep1", "keep2"]
+    assert reloaded.existing_hashes(["h-gone1", "h-keep1"]) == {"h-keep1"}
+
+def test_existing_hashes_are_scoped_by_filters(tmp_path, vectors):
+    store = LocalVectorStore(str(tmp_path), dims=DIMS)
+    _write(store, vectors, ["shared"], file_id="one")
+    assert store.existing_hashes(["h-shared"]) == {"h-shared"}
+    assert store.existing_hashes(["h-shared"], filters={"file_id": "one"}) == {"h-shared"}
+    assert store.existing_hashes(["h-shared"], filters={"file_id": "two"}) == set()
+
+def test_torn_log_is_cut_back_on_load(tmp_path, vectors):
+    store = LocalVectorStore(str(tmp_path), dims=DIMS)
+    _write(store, vectors, ["x0", "x1", "x2"])
+
+    # a crash mid-write: the vector reached the matrix, but only part of its log line was written
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(np.ones(DIMS, dtype=np.float32).tobytes())
+    with open(tmp_path / "documents.jsonl", "a") as f:
+        f.write('{"id": "torn", "text": "tor')
+
+    reloaded = LocalVectorStore(str(tmp_path), dims=DIMS)
+    assert _texts(reloaded) == ["x0", "x1", "x2"]
+    assert os.path.getsize(tmp_path / "vectors.f32") == 3 * DIMS * 4
+
+    # later rows line up with their vectors again
+    _write(reloaded, vectors, ["x3"])
+    assert reloaded.knn("x3", 1)[0].text == "x3"
+    assert _texts(LocalVectorStore(str(tmp_path), dims=DIMS)) == ["x0", "x1", "x2", "x3"]
+
+def test_vectors_ahead_of_the_log_are_dropped(tmp_path, vectors):
+    store = LocalVectorStore(str(tmp_path), dims=DIMS)
+    _write(store, vectors, ["y0", "y1"])
+    # a crash after the vectors were written but before their log lines
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(np.ones((2, DIMS), dtype=np.float32).tobytes())
+
+    reloaded = LocalVectorStore(str(tmp_path), dims=DIMS)
+    assert _texts(reloaded) == ["y0", "y1"]
+    assert os.path.getsize(tmp_path / "vectors.f32") == 2 * DIMS * 4
+
+def test_ivf_recall_matches_brute_force(tmp_path, vectors, monkeypatch):
+    monkeypatch.setattr(local_store, "IVF_MIN_ROWS", 1000)
+    rng = np.random.default_rng(0)
+    # clustered data, as real embeddings are; uniform noise has no partitions worth finding
+    centers = rng.standard_normal((40, DIMS)).astype(np.float32)
+    matrix = centers[rng.integers(0, 40, size=4000)] + 0.3 * rng.standard_normal((4000, DIMS)).astype(np.float32)
+    texts = [f"v{i}" for i in range(len(matrix))]
+    vectors.update(zip(texts, matrix))
+    store = LocalVectorStore(str(tmp_path), dims=DIMS)
+    _write(store, vectors, texts)
+
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    k, recalls = 10, []
+    for i in rng.choice(len(matrix), size=50, replace=False):
+        exact = {texts[j] for j in np.argsort(-(normalized @ normalized[i]))[:k]}
+        found = {result.text for result in store.knn(texts[i], k, num_candidates=400)}
+        recalls.append(len(exact & found) / k)
+
+    assert store._ivf is not None
+    assert np.mean(recalls) >= 0.9
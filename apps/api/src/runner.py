@@ -1,15 +1,22 @@
+import uuid
+
 from config import ProjectConf
 from src.workflows.Graph import GraphBuilder
 
-from typing import Any
+from typing import Any, Optional
 
 class Runner:
     """
-    A production-ready runner that streams output from graph_builder.
+    A production-ready runner that streams output from the shared supervisor graph.
+
+    The compiled graph is owned by GraphBuilder and reused across runners, so constructing a
+    Runner is cheap. Each runner is scoped to a single thread_id; when none is given a fresh
+    one is generated so concurrent requests never share checkpoints.
     """
-    def __init__(self, config: dict[str, Any] = ProjectConf.state_snapshot_config):
-        self.config = config
-        self.graph = GraphBuilder.build()
+    def __init__(self, thread_id: Optional[str] = None):
+        self.thread_id = thread_id or str(uuid.uuid4())
+        self.config: dict[str, Any] = ProjectConf.thread_config(self.thread_id)
+        self.graph = GraphBuilder.get_graph()
 
     def run(self, user_message: str):
         print("[INFO] Running production runner with message:", user_message)
@@ -19,3 +26,21 @@ class Runner:
             {"messages": [("user", user_message)]}, subgraphs=True, config=self.config
         ):
             yield f"{chunk}\n----\n"
+
+    async def arun(self, user_message: str):
+        """
+        Async counterpart of run. Streams through graph.astream so a workflow holds no thread
+        while it waits on the LLM or tools; blocking tool calls are offloaded by the tools.
+        """
+        print("[INFO] Running async production runner with message:", user_message)
+
+        async for output in self.astream({"messages": [("user", user_message)]}):
+            yield output
+
+    async def astream(self, graph_input: Any, config: Optional[dict[str, Any]] = None):
+        """
+        Streams an arbitrary graph input, formatted the same way as run. Passing a config that
+        addresses a past checkpoint branches the thread from that checkpoint.
+        """
+        async for chunk in self.graph.astream(graph_input, subgraphs=True, config=config or self.config):
+            yield f"{chunk}\n----\n"
@@ -0,0 +1,34 @@
+"""
+Import-time check for the API: nothing heavy (model loads, network connections, OAuth flows, graph
+construction) may run or be imported when `src.main` is imported. scripts/check_import_time.py lists
+the slowest imports when this fails.
+"""
+import json
+import os
+import subprocess
+import sys
+
+# must only load on first use
+FORBIDDEN_MODULES = ["torch", "sentence_transformers", "transformers", "langgraph.graph", "langgraph.prebuilt"]
+# ~0.9s locally; the budget only has to catch a model load or an eager langgraph import (seconds), not jitter
+BUDGET_SECONDS = 3.0
+
+def _import_main() -> dict:
+    # warm-up on startup would not run at import anyway, but make sure nothing triggers it
+    env = {**os.environ, "HONEYCOMB_WARMUP": "0"}
+    probe = (
+        "import json, sys, time; start = time.perf_counter(); "
+        "import src.main; elapsed = time.perf_counter() - start; "
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {FORBIDDEN_MODULES!r} if m in sys.modules]}}))"
+    )
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # first run fills the bytecode and OS file caches so the measurement is not of a cold disk
+    subprocess.run([sys.executable, "-c", probe], env=env, cwd=cwd, capture_output=True)
+    result = subprocess.run([sys.executable, "-c", probe], env=env, cwd=cwd, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_import_is_light():
+    measured = _import_main()
+    assert measured["loaded"] == []
+    assert measured["elapsed"] < BUDGET_SECONDS
@@ -0,0 +1,68 @@
+import os
+import hashlib
+import threading
+from typing import Optional
+
+from config import ProjectConf
+
+class DriveContentCache:
+    '''
+    Downloaded Drive content on disk, keyed by file id, revision and export format, so an unchanged
+    file is only downloaded once. An entry holds either the whole file or the prefix that was read;
+    a prefix serves any later read that ends within it. Old revisions are never looked up again and
+    age out with the least recently used entries once the cache outgrows its size limit.
+    '''
+    def __init__(self, directory: str = ProjectConf.drive_cache_dir, max_bytes: int = ProjectConf.drive_cache_max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, file_id: str, revision: str, export_format: Optional[str], complete: bool) -> str:
+        digest = hashlib.sha256(f"{file_id}\0{revision}\0{export_format or ''}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.{'complete' if complete else 'part'}")
+
+    def get(self, file_id: str, revision: str, export_format: Optional[str], stop: int) -> Optional[tuple[bytes, bool]]:
+        '''Returns the cached bytes from the start of the file and whether they are the whole file, if they reach `stop`'''
+        for complete in (True, False):
+            path = self._path(file_id, revision, export_format, complete)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            if complete or len(data) >= stop:
+                os.utime(path)      # mark as recently used
+                return data, complete
+        return None
+
+    def put(self, file_id: str, revision: str, export_format: Optional[str], data: bytes, complete: bool) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(file_id, revision, export_format, complete)
+        # write then rename, so a concurrent reader never sees a partial entry
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        if complete:
+            try:
+                os.remove(self._path(file_id, revision, export_format, False))
+            except FileNotFoundError:
+                pass
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith((".complete", ".part")):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
@@ -0,0 +1,320 @@
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from config import ProjectConf
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    mime_type TEXT,
+    owners TEXT NOT NULL DEFAULT '',     -- owner emails, each wrapped in commas: ",a@x.com,b@y.com,"
+    parents TEXT NOT NULL DEFAULT '',    -- parent ids, wrapped the same way
+    modified_time TEXT,
+    trashed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS files_modified ON files (modified_time);
+CREATE INDEX IF NOT EXISTS files_name ON files (name_lower);
+
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+FILE_FIELDS = "id, name, mimeType, owners(emailAddress), parents, modifiedTime, trashed"
+SYNC_PAGE_SIZE = 1000
+INDEX_TOKEN_PREFIX = "index:"      # marks continuation tokens handed out by the index
+
+# one clause of a Drive query the index can answer; anything else (or a clause whose translation
+# returns None) goes to the live API
+_CLAUSES: list[tuple[re.Pattern, Callable[[re.Match], Optional[tuple[str, list[Any]]]]]] = [
+    (re.compile(r"name\s+contains\s+'((?:[^'\\]|\\.)*)'", re.I),
+     # Drive matches name terms by prefix: 'rep' finds "Report 2024" and "Q1 report"
+     lambda m: ("(name_lower LIKE ? ESCAPE '\\' OR name_lower LIKE ? ESCAPE '\\')",
+                [f"{_like(m.group(1))}%", f"% {_like(m.group(1))}%"])),
+    (re.compile(r"name\s*(=|!=)\s*'((?:[^'\\]|\\.)*)'", re.I),
+     lambda m: (f"name {m.group(1)} ?", [_unescape(m.group(2))])),
+    (re.compile(r"mimeType\s*(=|!=)\s*'((?:[^'\\]|\\.)*)'", re.I),
+     lambda m: (f"mime_type {m.group(1)} ?", [_unescape(m.group(2))])),
+    (re.compile(r"mimeType\s+contains\s+'((?:[^'\\]|\\.)*)'", re.I),
+     lambda m: ("mime_type LIKE ? ESCAPE '\\'", [f"%{_like(m.group(1))}%"])),
+    (re.compile(r"modifiedTime\s*(<=|>=|<|>|=)\s*'([0-9T:.\-+Z]+)'", re.I),
+     lambda m: (f"modified_time {m.group(1)} ?", [_utc(m.group(2))]) if _utc(m.group(2)) else None),
+    (re.compile(r"'((?:[^'\\]|\\.)*)'\s+in\s+owners", re.I),
+     lambda m: ("owners LIKE ? ESCAPE '\\'", [f"%,{_like(m.group(1))},%"])),
+    (re.compile(r"'((?:[^'\\]|\\.)*)'\s+in\s+parents", re.I),
+     lambda m: ("parents LIKE ? ESCAPE '\\'", [f"%,{_like(m.group(1))},%"])),
+    (re.compile(r"trashed\s*=\s*(true|false)", re.I),
+     lambda m: ("trashed = ?", [int(m.group(1).lower() == "true")])),
+]
+_ORDER_COLUMNS = {"name": "name_lower", "modifiedTime": "modified_time"}
+
+# aliases Drive resolves for the caller, mapped to the state key holding their value
+_ALIASES = [
+    (re.compile(r"'me'(\s+in\s+owners)", re.I), "user_email"),
+    (re.compile(r"'root'(\s+in\s+parents)", re.I), "root_id"),
+]
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value)
+
+def _escape(value: str) -> str:
+    return re.sub(r"(['\\])", r"\\\1", value)
+
+def _like(value: str) -> str:
+    return re.sub(r"([%_\\])", r"\\\1", _unescape(value).lower() if value else "")
+
+def _utc(value: Optional[str]) -> Optional[str]:
+    '''
+    Rewrites an RFC 3339 time in the form Drive returns (UTC, milliseconds, "Z"), so stored and
+    queried times compare as strings. Drive reads times without an offset as UTC.
+    '''
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    parsed = parsed.astimezone(timezone.utc)
+    return f"{parsed:%Y-%m-%dT%H:%M:%S}.{parsed.microsecond // 1000:03d}Z"
+
+class DriveIndex:
+    '''
+    Local SQLite copy of the Drive file metadata, so common listing queries (name, mime type, owner,
+    folder, modified time) are answered without a Drive round trip. The index is seeded with one full
+    listing and then kept current from the Changes API, starting at the page token saved with it.
+
+    Syncing happens on a background thread; queries never wait for it. While the index is older than
+    `max_staleness_seconds` (or not seeded yet), or when a query uses syntax it cannot evaluate, callers
+    get None and go to the live API instead.
+    '''
+    def __init__(
+        self,
+        path: str = ProjectConf.drive_index_path,
+        sync_interval_seconds: float = ProjectConf.drive_index_sync_seconds,
+        max_staleness_seconds: float = ProjectConf.drive_index_max_staleness_seconds,
+    ):
+        self.path = path
+        self.sync_interval_seconds = sync_interval_seconds
+        self.max_staleness_seconds = max_staleness_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._syncing = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # opened on first use, so importing the tool stays cheap
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    #### State ####
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    def age(self) -> Optional[float]:
+        '''Seconds since the index was last in sync with Drive, or None if it was never seeded'''
+        with self._lock:
+            synced_at = self._get_state("synced_at")
+        return None if synced_at is None else time.time() - float(synced_at)
+
+    #### Sync ####
+
+    def _upsert(self, files: list[dict[str, Any]]) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO files (id, name, name_lower, mime_type, owners, parents, modified_time, trashed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    f["id"], f.get("name", ""), f.get("name", "").lower(), f.get("mimeType"),
+                    f",{','.join(owner.get('emailAddress', '') for owner in f.get('owners', []))},",
+                    f",{','.join(f.get('parents', []))},",
+                    _utc(f.get("modifiedTime")), int(bool(f.get("trashed"))),
+                )
+                for f in files
+            ],
+        )
+
+    def _resolve_aliases(self, service: Any) -> None:
+        # queries for 'me' in owners and 'root' in parents need the values Drive substitutes for them
+        user_email = service.about().get(fields="user(emailAddress)").execute()["user"]["emailAddress"]
+        root_id = service.files().get(fileId="root", fields="id").execute()["id"]
+        with self._lock, self.conn:
+            self._set_state("user_email", user_email)
+            self._set_state("root_id", root_id)
+
+    def seed(self, service: Any) -> None:
+        '''Replaces the index with a full listing of Drive'''
+        self._resolve_aliases(service)
+        # take the change token first, so changes made while listing are replayed by the next sync
+        start_page_token = service.changes().getStartPageToken().execute()["startPageToken"]
+        files, page_token = [], None
+        while True:
+            # trashed files too: Drive lists them for every query that does not exclude them
+            response = service.files().list(
+                pageSize=SYNC_PAGE_SIZE, pageToken=page_token,
+                fields=f"nextPageToken, files({FILE_FIELDS})",
+            ).execute()
+            files.extend(response.get("files", []))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM files")
+            self._upsert(files)
+            self._set_state("page_token", start_page_token)
+            self._set_state("synced_at", str(time.time()))
+            self._set_state("includes_trashed", "1")
+        print(f"Seeded the Drive index with {len(files)} files")
+
+    def sync(self, service: Any) -> int:
+        '''Applies the changes made since the last sync, returning how many there were'''
+        with self._lock:
+            page_token = self._get_state("page_token")
+            resolved = self._get_state("user_email") is not None
+            # indexes seeded before trashed files were listed lack the ones trashed before seeding
+            complete = self._get_state("includes_trashed") is not None
+        if page_token is None or not complete:
+            self.seed(service)
+            return 0
+        if not resolved:
+            # seeded before aliases were resolved
+            self._resolve_aliases(service)
+
+        n_changes = 0
+        while True:
+            response = service.changes().list(
+                pageToken=page_token, pageSize=SYNC_PAGE_SIZE, includeRemoved=True, spaces="drive",
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_FIELDS}))",
+            ).execute()
+            # shared drive changes carry no file id; only file changes matter here
+            changes = [c for c in response.get("changes", []) if "fileId" in c]
+            removed = [(c["fileId"],) for c in changes if c.get("removed") or "file" not in c]
+            updated = [c["file"] for c in changes if not c.get("removed") and "file" in c]
+            page_token = response.get("nextPageToken") or response["newStartPageToken"]
+            # each page is committed with the token that follows it, so an interrupted sync resumes there
+            with self._lock, self.conn:
+                self.conn.executemany("DELETE FROM files WHERE id = ?", removed)
+                self._upsert(updated)
+                self._set_state("page_token", page_token)
+                if "newStartPageToken" in response:
+                    self._set_state("synced_at", str(time.time()))
+            n_changes += len(changes)
+            if "newStartPageToken" in response:
+                return n_changes
+
+    def sync_in_background(self, service_factory: Callable[[], Any]) -> None:
+        '''Starts a sync on its own thread unless one is already running'''
+        if not self._syncing.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.sync(service_factory())
+            except Exception as e:
+                print(f"Syncing the Drive index failed: {e}")
+            finally:
+                self._syncing.release()
+
+        threading.Thread(target=run, name="drive-index-sync", daemon=True).start()
+
+    #### Queries ####
+
+    def list_files(
+        self,
+        service_factory: Callable[[], Any],
+        clauses: list[str],
+        max_results: int,
+        order_by: Optional[str],
+        page_token: Optional[str],
+    ) -> Optional[tuple[list[dict[str, Any]], Optional[str]]]:
+        '''
+        Answers a files.list request from the index, returning the files and the continuation token,
+        or None if the caller should ask the live API. A listing the index started is always continued
+        from the index, even once it is stale, because the live API cannot resume its tokens.
+        '''
+        resuming = page_token is not None and page_token.startswith(INDEX_TOKEN_PREFIX)
+        age = self.age()
+        if age is None or age > self.sync_interval_seconds:
+            self.sync_in_background(service_factory)
+        if not resuming and (age is None or age > self.max_staleness_seconds):
+            return None
+        # continuation tokens from the live API can only be resumed there
+        if page_token is not None and not resuming:
+            return None
+
+        where, params = self._where(clauses)
+        order = self._order(order_by)
+        if where is None or order is None:
+            if resuming:
+                raise ValueError(f"page_token {page_token} does not belong to this listing; start it again without a page_token")
+            return None
+        offset = int(page_token[len(INDEX_TOKEN_PREFIX):]) if page_token else 0
+
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, name, mime_type, modified_time FROM files WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                [*params, max_results + 1, offset],
+            ).fetchall()
+        files = [{"id": r[0], "name": r[1], "mimeType": r[2], "modifiedTime": r[3]} for r in rows[:max_results]]
+        next_page_token = f"{INDEX_TOKEN_PREFIX}{offset + max_results}" if len(rows) > max_results else None
+        return files, next_page_token
+
+    def _where(self, clauses: list[str]) -> tuple[Optional[str], list[Any]]:
+        # only conjunctions of known clauses are translated; `or`, `not` and full-text search are not
+        terms = []
+        for clause in clauses:
+            # split on `and` outside quoted values, so 'salt and pepper' stays one value
+            terms.extend(re.split(r"\s+and\s+(?=(?:[^']*'[^']*')*[^']*$)", clause.strip().strip("()"), flags=re.I))
+
+        conditions, params = ["1"], []
+        for term in terms:
+            term = term.strip().strip("()").strip()
+            if not term:
+                continue
+            for pattern, key in _ALIASES:
+                match = pattern.fullmatch(term)
+                if match:
+                    with self._lock:
+                        value = self._get_state(key)
+                    if value is None:
+                        return None, []
+                    term = f"'{_escape(value)}'{match.group(1)}"
+            for pattern, translate in _CLAUSES:
+                match = pattern.fullmatch(term)
+                if match:
+                    translated = translate(match)
+                    if translated is None:
+                        return None, []
+                    conditions.append(translated[0])
+                    params.extend(translated[1])
+                    break
+            else:
+                return None, []
+        # like Drive, trashed files match unless the query excludes them with trashed = false
+        return " AND ".join(conditions), params
+
+    def _order(self, order_by: Optional[str]) -> Optional[str]:
+        if not order_by:
+            return "modified_time DESC"
+        keys = []
+        for key in order_by.split(","):
+            field, *direction = key.split()
+            if field not in _ORDER_COLUMNS or direction not in ([], ["desc"], ["asc"]):
+                return None
+            keys.append(f"{_ORDER_COLUMNS[field]} {'DESC' if direction == ['desc'] else 'ASC'}")
+        return ", ".join(keys + ["id"])
@@ -1,46 +1,11 @@
-import os
-import pickle
 import json
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, List
 from datetime import datetime, timedelta
 
-from pydantic import PrivateAttr
 from langchain.tools import BaseTool
 
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-
-# Scopes required by this application.
-SCOPES = ["https://www.googleapis.com/auth/calendar"]
-
-def create_calendar_service(
-    client_secrets_file: str,
-    token_file: str = "calendar_token.pickle",
-    scopes: Optional[List[str]] = None
-):
-    """
-    Creates a Google Calendar API service using OAuth with a fixed port (8080).
-    """
-    if scopes is None:
-        scopes = SCOPES
-
-    creds = None
-    if os.path.exists(token_file):
-        with open(token_file, "rb") as token:
-            creds = pickle.load(token)
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(client_secrets_file, scopes)
-            creds = flow.run_local_server(port=8080)
-        with open(token_file, "wb") as token:
-            pickle.dump(creds, token)
-    
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+from src.tools.GoogleServices import GoogleServices
+from src.utils.concurrency import run_blocking
 
 class GCalendarTool(BaseTool):
     name: str = "GCalendarTool"
@@ -54,25 +19,15 @@ class GCalendarTool(BaseTool):
         "3. update_event:<event_id>,<summary>,<start_time>,<end_time> - Update an existing event's summary and times.\n\n"
         "Separate fields with commas."
     )
-    _calendar_service: Any = PrivateAttr()
-    
-    def __init__(self, client_secrets_file: str, token_file: str = "calendar_token.pickle", **kwargs: Any):
-        super().__init__(**kwargs)
-        self._calendar_service = create_calendar_service(client_secrets_file, token_file)
-        # Debug: Print the calendar list to confirm access.
-        try:
-            calendars = self._calendar_service.calendarList().list().execute()
-            primary = next((cal for cal in calendars.get("items", []) if cal.get("primary")), None)
-            if primary:
-                print("Access granted to primary calendar:", primary.get("summary"))
-            else:
-                print("No primary calendar found.")
-        except Exception as e:
-            print("Failed to access calendars:", e)
+
+    @property
+    def calendar_service(self) -> Any:
+        # credentials are shared with the other Google tools; the client belongs to the calling thread
+        return GoogleServices.service("calendar", "v3")
     
     def list_events(self, max_results: int = 10) -> List[Dict[str, Any]]:
         now = datetime.utcnow().isoformat() + "Z"  # 'Z' indicates UTC time
-        events_result = self._calendar_service.events().list(
+        events_result = self.calendar_service.events().list(
             calendarId="primary", timeMin=now, maxResults=max_results, singleEvents=True,
             orderBy="startTime"
         ).execute()
@@ -85,15 +40,15 @@ class GCalendarTool(BaseTool):
             "start": {"dateTime": start_time},
             "end": {"dateTime": end_time},
         }
-        created_event = self._calendar_service.events().insert(calendarId="primary", body=event).execute()
+        created_event = self.calendar_service.events().insert(calendarId="primary", body=event).execute()
         return created_event
 
     def update_event(self, event_id: str, summary: str, start_time: str, end_time: str) -> Dict[str, Any]:
-        event = self._calendar_service.events().get(calendarId="primary", eventId=event_id).execute()
+        event = self.calendar_service.events().get(calendarId="primary", eventId=event_id).execute()
         event["summary"] = summary
         event["start"] = {"dateTime": start_time}
         event["end"] = {"dateTime": end_time}
-        updated_event = self._calendar_service.events().update(calendarId="primary", eventId=event_id, body=event).execute()
+        updated_event = self.calendar_service.events().update(calendarId="primary", eventId=event_id, body=event).execute()
         return updated_event
 
     def _run(self, tool_input: str, **kwargs: Any) -> str:
@@ -133,11 +88,11 @@ class GCalendarTool(BaseTool):
             return f"An error occurred: {str(e)}"
     
     async def _arun(self, tool_input: str, **kwargs: Any) -> str:
-        return self._run(tool_input, **kwargs)
+        # the Google client is blocking, so run it on the bounded I/O pool instead of the event loop
+        return await run_blocking(self._run, tool_input, **kwargs)
 
 if __name__ == "__main__":
-    CLIENT_SECRETS_FILE = os.getenv("GSUITE_CLIENT_SECRETS")
-    calendar_tool = GCalendarTool(client_secrets_file=CLIENT_SECRETS_FILE)
+    calendar_tool = GCalendarTool()
     
     # Test list_events operation.
     print("Testing list_events operation...")
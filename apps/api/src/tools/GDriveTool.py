@@ -1,114 +1,249 @@
-import os
 import io
-import pickle
 import json
-from typing import Any, Dict, Optional, List
+import codecs
+from datetime import datetime
+from typing import Any, Dict, Generator, Optional
 
-from pydantic import PrivateAttr
 from langchain.tools import BaseTool
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-
-# Scopes required by this application.
-SCOPES = ['https://www.googleapis.com/auth/drive']
-
-def create_drive_service(
-    client_secrets_file: str,
-    token_file: str = "token.pickle",
-    scopes: Optional[List[str]] = None
-):
-    if scopes is None:
-        scopes = SCOPES
-
-    creds = None
-    if os.path.exists(token_file):
-        with open(token_file, "rb") as token:
-            creds = pickle.load(token)
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(client_secrets_file, scopes)
-            creds = flow.run_local_server(port=8080)  # Force port 8080 bc idk how to deal w dynamic uri's w/ google apis
-        with open(token_file, "wb") as token:
-            pickle.dump(creds, token)
-    
-    service = build('drive', 'v3', credentials=creds)
-    return service
 
+from src.tools.DriveContentCache import DriveContentCache
+from src.tools.DriveIndex import INDEX_TOKEN_PREFIX, DriveIndex
+from src.tools.GoogleServices import GoogleServices
+from src.utils.concurrency import run_blocking
+from src.utils.tool_input import parse_options
+
+# list_files returns a bounded page of results; the agent asks for more with the continuation token
+LIST_MAX_RESULTS = 25           # files listed when the caller gives no max_results
+LIST_MAX_RESULTS_CAP = 200      # most files one tool call may return, so the result fits the context
+LIST_PAGE_SIZE_MAX = 1000       # largest page the Drive API serves
+LIST_ORDER_BY = "modifiedTime desc"
+LIST_FIELDS = "id, name, mimeType, modifiedTime"
+
+# load_content returns a bounded slice of the file; the agent reads on from the byte offset it is given
+LOAD_MAX_CHARS = 20_000         # characters returned when the caller gives no max_chars
+LOAD_MAX_CHARS_CAP = 100_000
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+CONTENT_METADATA_FIELDS = "id, mimeType, size, md5Checksum, modifiedTime"
+
+# export formats that keep headings, lists and tables; other Google formats fall back to plain text
+EXPORT_FORMATS = {
+    "application/vnd.google-apps.document": "text/markdown",
+    "application/vnd.google-apps.spreadsheet": "text/csv",
+    "application/vnd.google-apps.presentation": "text/plain",
+}
+DEFAULT_EXPORT_FORMAT = "text/plain"
+
+content_cache = DriveContentCache()
+drive_index = DriveIndex()
+
+def _quote(value: str) -> str:
+    # a value inside a single-quoted Drive query string
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def file_revision(metadata: Dict[str, Any]) -> str:
+    # Google formats have no checksum, but every edit moves their modifiedTime
+    return metadata.get("md5Checksum") or metadata.get("modifiedTime")
 
 class GoogleDriveTool(BaseTool):
     name: str = "GDriveTool"
     description: str = (
         "A tool to interact with Google Drive. It can list files, load metadata, "
         "load file content, and update file sharing permissions. "
-        "Operations: list_files, load_metadata, load_content, update_sharing."
+        "Operations: list_files, load_metadata, load_content, update_sharing. list_files takes an optional "
+        "query followed by options separated by '|': max_results, order_by, modified_after, folder and page_token. "
+        "load_content takes max_chars, start and end (byte offsets) the same way."
     )
-    # need to use a private attribute to hold the drive service, cause pydantic
-    _drive_service: Any = PrivateAttr()
-    
-    def __init__(self, client_secrets_file: str, token_file: str = "token.pickle", **kwargs: Any):
-        super().__init__(**kwargs)
-        self._drive_service = create_drive_service(client_secrets_file, token_file)
-        # Debug: print logged-in user info using the 'about' endpoint.
-        try:
-            about_info = self._drive_service.about().get(fields="user").execute()
-            user_email = about_info.get("user", {}).get("emailAddress")
-            print("Logged in as:", user_email)
-        except Exception as e:
-            print("Failed to get logged-in user info:", e)
+
+    @property
+    def drive_service(self) -> Any:
+        # credentials are shared with the other Google tools; the client belongs to the calling thread
+        return GoogleServices.service("drive", "v3")
     
-    def list_files(self, query: str = "trashed = false", page_size: int = 100) -> List[Dict[str, Any]]:
-        results = []
-        page_token = None
+    def list_files(
+        self,
+        query: str = "trashed = false",
+        max_results: int = LIST_MAX_RESULTS,
+        order_by: Optional[str] = LIST_ORDER_BY,
+        modified_after: Optional[str] = None,
+        folder_id: Optional[str] = None,
+        page_token: Optional[str] = None,
+        fields: str = LIST_FIELDS,
+    ) -> Generator[Dict[str, Any], None, Optional[str]]:
+        '''
+        Yields at most `max_results` files matching the query and returns the token that continues
+        the listing, or None once everything was listed. Pages are sized to what is still wanted, so
+        nothing past the cap is fetched and the token resumes exactly after the last yielded file.
 
-        #print("Listing files with query:", query)
-        
-        while True:
-            response = self._drive_service.files().list(
-                q=query,
-                pageSize=page_size,
-                fields="nextPageToken, files(id, name, mimeType)",
-                pageToken=page_token
-            ).execute()
+        Queries the local Drive index can evaluate are answered from it without calling the API.
+        '''
+        clauses = [query] if query else []
+        if modified_after:
+            try:
+                datetime.fromisoformat(modified_after)
+            except ValueError:
+                raise ValueError(f"modified_after must be a date (YYYY-MM-DD) or an RFC 3339 timestamp, not {modified_after!r}")
+            # Drive wants a full RFC 3339 timestamp; a bare date means midnight UTC
+            timestamp = modified_after if "T" in modified_after else f"{modified_after}T00:00:00"
+            clauses.append(f"modifiedTime > {_quote(timestamp)}")
+        if folder_id:
+            clauses.append(f"{_quote(folder_id)} in parents")
 
-            #print("Raw API response:", json.dumps(response, indent=2))
-            
-            results.extend(response.get('files', []))
-            page_token = response.get('nextPageToken', None)
+        if fields == LIST_FIELDS:
+            indexed = drive_index.list_files(
+                lambda: GoogleServices.service("drive", "v3"), clauses, max_results, order_by, page_token
+            )
+            if indexed is not None:
+                files, next_page_token = indexed
+                yield from files
+                return next_page_token
+        if page_token and page_token.startswith(INDEX_TOKEN_PREFIX):
+            # only the index can resume its own listings
+            raise ValueError(f"page_token {page_token} cannot be used with these fields; start the listing again without it")
+
+        remaining = max_results
+        while remaining > 0:
+            response = self.drive_service.files().list(
+                q=" and ".join(f"({clause})" for clause in clauses) or None,
+                pageSize=min(remaining, LIST_PAGE_SIZE_MAX),
+                orderBy=order_by,
+                fields=f"nextPageToken, files({fields})",
+                pageToken=page_token,
+            ).execute()
+            for file in response.get("files", []):
+                yield file
+                remaining -= 1
+            page_token = response.get("nextPageToken")
             if not page_token:
                 break
-        
-        return results
+        return page_token
+
+    def _list_files_summary(self, tool_input: str) -> str:
+        # list_files:<query> | max_results=N | order_by=... | modified_after=... | folder=<id> | page_token=...
+        query, params = parse_options(tool_input)
+        max_results = min(int(params.get("max_results", LIST_MAX_RESULTS)), LIST_MAX_RESULTS_CAP)
+        # Drive cannot sort full-text searches; those come back by relevance
+        order_by = params.get("order_by", None if "fullText" in query else LIST_ORDER_BY)
+
+        files = []
+        listing = self.list_files(
+            query=query or "trashed = false",
+            max_results=max_results,
+            order_by=order_by,
+            modified_after=params.get("modified_after"),
+            folder_id=params.get("folder"),
+            page_token=params.get("page_token"),
+        )
+        while True:
+            try:
+                files.append(next(listing))
+            except StopIteration as stop:
+                next_page_token = stop.value
+                break
+
+        lines = [f"{f['name']} (ID: {f['id']}, {f.get('mimeType')}, modified {f.get('modifiedTime')})" for f in files]
+        summary = f"Showing {len(files)} files ordered by {order_by or 'relevance'}:\n" + "\n".join(lines)
+        if next_page_token:
+            summary += (
+                f"\nMore files match. To see them, repeat the same list_files input with "
+                f"'| page_token={next_page_token}' (replacing any earlier page_token)"
+            )
+        return summary
     
     def load_metadata(self, file_id: str) -> Dict[str, Any]:
-        metadata = self._drive_service.files().get(
+        metadata = self.drive_service.files().get(
             fileId=file_id, fields="*"
         ).execute()
         return metadata
     
-    def load_content(self, file_id: str) -> str:
-        metadata = self.load_metadata(file_id)
-        mime_type = metadata.get("mimeType", "")
-        if mime_type.startswith("application/vnd.google-app"):
-            request = self._drive_service.files().export_media(
-                fileId=file_id,
-                mimeType="text/plain"
+    def load_content(self, file_id: str, max_chars: int = LOAD_MAX_CHARS, start: int = 0, end: Optional[int] = None) -> str:
+        '''
+        Returns up to `max_chars` characters of the file from byte `start` (up to byte `end`), exporting
+        Google formats to a structured text format. Only the bytes needed are downloaded, and unchanged
+        files are served from the content cache after one metadata request.
+        '''
+        metadata = self.drive_service.files().get(fileId=file_id, fields=CONTENT_METADATA_FIELDS).execute()
+        # utf-8 needs at most 4 bytes per character
+        stop = start + 4 * max_chars if end is None else min(end, start + 4 * max_chars)
+        data, at_end = self._read_bytes(metadata, start, stop)
+
+        # invalid bytes decode to one surrogate each, so the text maps back to exactly the bytes read
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="surrogateescape")
+        text = decoder.decode(data, final=at_end)
+        # a character cut off at the end of the slice stays buffered and is read again next time
+        consumed = len(data) - len(decoder.getstate()[0])
+        truncated = not at_end and (end is None or start + len(data) < end)
+        if len(text) > max_chars:
+            text, truncated = text[:max_chars], True
+            consumed = len(text.encode("utf-8", errors="surrogateescape"))
+        content = text.encode("utf-8", errors="surrogateescape").decode("utf-8", errors="replace")
+        if truncated:
+            next_start = start + consumed
+            content += (
+                f"\n\n[Truncated after {len(content)} characters. To read on, use "
+                f"load_content:{file_id} | start={next_start}]"
             )
-        else:
-            request = self._drive_service.files().get_media(fileId=file_id)
-        
+        return content
+
+    def read_text(self, metadata: Dict[str, Any], max_bytes: int, use_cache: bool = True) -> str:
+        '''
+        Returns the first `max_bytes` of the file as text, for callers that already have its metadata.
+        Without `use_cache`, the content cache is neither read nor filled.
+        '''
+        data, at_end = self._read_bytes(metadata, 0, max_bytes, use_cache)
+        return codecs.getincrementaldecoder("utf-8")(errors="replace").decode(data, final=at_end)
+
+    def _read_bytes(self, metadata: Dict[str, Any], start: int, stop: int, use_cache: bool = True) -> tuple[bytes, bool]:
+        '''Returns bytes [start, stop) of the file, or of its export for Google formats, and whether they reach its end'''
+        file_id = metadata["id"]
+        mime_type = metadata.get("mimeType", "")
+        export_format = EXPORT_FORMATS.get(mime_type, DEFAULT_EXPORT_FORMAT) if mime_type.startswith("application/vnd.google-apps") else None
+        revision = file_revision(metadata)
+
+        if export_format is not None:
+            # exports cannot be read by range; download (or reuse) the prefix that covers the request
+            cached = content_cache.get(file_id, revision, export_format, stop) if use_cache else None
+            if cached is None:
+                cached = self._download_export(file_id, export_format, stop)
+                if use_cache:
+                    content_cache.put(file_id, revision, export_format, *cached)
+            prefix, complete = cached
+            return prefix[start:stop], complete and stop >= len(prefix)
+
+        size = int(metadata.get("size", 0))
+        start, stop = min(start, size), min(stop, size)
+        cached = content_cache.get(file_id, revision, None, stop) if use_cache else None
+        if cached is not None:
+            return cached[0][start:stop], stop >= size
+        if start > 0:
+            # reads from the middle of a file are not cached, only prefixes are
+            return self._download_range(file_id, start, stop), stop >= size
+        data = self._download_range(file_id, 0, stop)
+        if use_cache:
+            content_cache.put(file_id, revision, None, data, stop >= size)
+        return data, stop >= size
+
+    def _download_range(self, file_id: str, start: int, stop: int) -> bytes:
+        chunks, offset = [], start
+        while offset < stop:
+            request = self.drive_service.files().get_media(fileId=file_id)
+            request.headers["Range"] = f"bytes={offset}-{min(offset + DOWNLOAD_CHUNK_BYTES, stop) - 1}"
+            chunk = request.execute()
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+        return b"".join(chunks)[:stop - start]
+
+    def _download_export(self, file_id: str, export_format: str, stop: int) -> tuple[bytes, bool]:
+        '''Streams the export until `stop` bytes arrived, returning them and whether the export is complete'''
+        from googleapiclient.http import MediaIoBaseDownload
+        request = self.drive_service.files().export_media(fileId=file_id, mimeType=export_format)
         fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
+        downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_BYTES)
         done = False
-        while not done:
-            status, done = downloader.next_chunk()
-        
-        content = fh.getvalue().decode("utf-8", errors="replace")
-        return content
+        while not done and fh.tell() < stop:
+            _, done = downloader.next_chunk()
+        return fh.getvalue(), done
     
     def update_sharing(self, file_id: str, email: str, role: str = "reader") -> Dict[str, Any]:
         permission_body = {
@@ -117,7 +252,7 @@ class GoogleDriveTool(BaseTool):
             'emailAddress': email
         }
         
-        permission = self._drive_service.permissions().create(
+        permission = self.drive_service.permissions().create(
             fileId=file_id,
             body=permission_body,
             fields='id'
@@ -128,10 +263,7 @@ class GoogleDriveTool(BaseTool):
     def _run(self, tool_input: str, **kwargs: Any) -> str:
         try:
             if tool_input.startswith("list_files"):
-                parts = tool_input.split(":", 1)
-                query = parts[1].strip() if len(parts) > 1 and parts[1].strip() else "trashed = false"
-                files = self.list_files(query=query)
-                return f"Found {len(files)} files:\n" + "\n".join([f"{f['name']} (ID: {f['id']})" for f in files])
+                return self._list_files_summary(tool_input)
             
             elif tool_input.startswith("load_metadata:"):
                 file_id = tool_input.split(":", 1)[1].strip()
@@ -139,8 +271,14 @@ class GoogleDriveTool(BaseTool):
                 return json.dumps(metadata, indent=2)
             
             elif tool_input.startswith("load_content:"):
-                file_id = tool_input.split(":", 1)[1].strip()
-                content = self.load_content(file_id)
+                # load_content:<file_id> | max_chars=N | start=<byte> | end=<byte>
+                file_id, params = parse_options(tool_input)
+                content = self.load_content(
+                    file_id,
+                    max_chars=min(int(params.get("max_chars", LOAD_MAX_CHARS)), LOAD_MAX_CHARS_CAP),
+                    start=int(params.get("start", 0)),
+                    end=int(params["end"]) if "end" in params else None,
+                )
                 return content
             
             elif tool_input.startswith("update_sharing:"):
@@ -160,13 +298,12 @@ class GoogleDriveTool(BaseTool):
             return f"An error occurred: {str(e)}"
     
     async def _arun(self, tool_input: str, **kwargs: Any) -> str:
-        return self._run(tool_input, **kwargs)
+        # the Google client is blocking, so run it on the bounded I/O pool instead of the event loop
+        return await run_blocking(self._run, tool_input, **kwargs)
 
 
 if __name__ == "__main__":
-    CLIENT_SECRETS_FILE = os.getenv("GSUITE_CLIENT_SECRETS")
-    
-    drive_tool = GoogleDriveTool(client_secrets_file=CLIENT_SECRETS_FILE)
+    drive_tool = GoogleDriveTool()
     
     # Test list_files operation.
     print("Testing list_files operation...")
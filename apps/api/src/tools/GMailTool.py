@@ -1,48 +1,24 @@
-import os
-import io
-import pickle
 import json
+import time
 import base64
 from typing import Any, Dict, Optional, List
 from email.mime.text import MIMEText
 
-from pydantic import PrivateAttr
 from langchain.tools import BaseTool
 
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+from src.tools.GoogleServices import GoogleServices
+from src.utils.concurrency import run_blocking
+from src.utils.tool_input import parse_options
 
-# Scopes required by this application.
-SCOPES = ["https://mail.google.com/"]
-
-def create_gmail_service_fixed(
-    client_secrets_file: str,
-    token_file: str = "token.json",
-    scopes: Optional[List[str]] = None
-):
-    """
-    Creates a Gmail API service using OAuth with a fixed port (8080).
-    """
-    if scopes is None:
-        scopes = SCOPES
-
-    creds = None
-    if os.path.exists(token_file):
-        with open(token_file, "rb") as token:
-            creds = pickle.load(token)
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(client_secrets_file, scopes)
-            creds = flow.run_local_server(port=8080)
-        with open(token_file, "wb") as token:
-            pickle.dump(creds, token)
-    
-    service = build('gmail', 'v1', credentials=creds)
-    return service
+# search returns one page of messages with their headers; the agent asks for more with the page token
+SEARCH_MAX_RESULTS = 20         # messages returned when the caller gives no max_results
+SEARCH_MAX_RESULTS_CAP = 100    # most messages per call: one messages.list page
+# Gmail starts rejecting a batch's requests with 429 above ~50 of them, so larger pages are split,
+# and requests that were still rate-limited are sent once more after a pause
+SEARCH_BATCH_SIZE = 50
+SEARCH_RETRY_SECONDS = 1.0
+SEARCH_HEADERS = ["From", "To", "Subject", "Date"]
+SNIPPET_CHARS = 100
 
 def create_message(sender: str, to: str, subject: str, message_text: str) -> str:
     """
@@ -55,54 +31,120 @@ def create_message(sender: str, to: str, subject: str, message_text: str) -> str
     raw = base64.urlsafe_b64encode(message.as_bytes())
     return raw.decode()
 
+def _cell(value: str, width: int) -> str:
+    value = " ".join(value.split()).replace("|", "/")
+    return value if len(value) <= width else value[:width - 1] + "…"
+
+def format_messages(messages: List[Dict[str, Any]], next_page_token: Optional[str] = None) -> str:
+    """
+    Render search results as a compact table, one message per row.
+    """
+    rows = [f"Found {len(messages)} messages, newest first:", "| ID | Date | From | To | Subject | Snippet |", "|---|---|---|---|---|---|"]
+    for message in messages:
+        if "error" in message:
+            rows.append(f"| {message['id']} | could not be read: {_cell(message['error'], 80)} | | | | |")
+            continue
+        rows.append(
+            f"| {message['id']} | {_cell(message['date'], 32)} | {_cell(message['from'], 40)} | "
+            f"{_cell(message['to'], 40)} | {_cell(message['subject'], 60)} | {_cell(message['snippet'], SNIPPET_CHARS)} |"
+        )
+    if next_page_token:
+        rows.append(f"More messages match. To see them, repeat the same search_messages input with '| page_token={next_page_token}'")
+    return "\n".join(rows)
+
 class GMailTool(BaseTool):
     name: str = "GMailTool"
     description: str = (
         "A tool designed to interact with the Gmail API. It allows you to search for emails,"
         "create draft messages, and send emails. Use this tool for any email-related"
         "operations, such as retrieving, drafting, or sending messages. It supports three operations:\n"
-        "1. search_messages:<query> - Search for messages matching the query.\n"
+        "1. search_messages:<query> - Search for messages matching the query, returning a table of their "
+        "sender, recipients, subject, date and snippet. Options follow the query separated by '|': "
+        "max_results=<n> (default 20, at most 100) and page_token=<token from a previous result>.\n"
         "2. create_draft:<sender>,<to>,<subject>,<body> - Create a draft message.\n"
         "3. send_message:<sender>,<to>,<subject>,<body> - Send a message.\n\n"
         "Separate the fields with commas. For the message body, if there are commas, "
         "they will be included as part of the body."
     )
-    _gmail_service: Any = PrivateAttr()
-    
-    def __init__(self, client_secrets_file: str, token_file: str = "token.json", **kwargs: Any):
-        super().__init__(**kwargs)
-        self._gmail_service = create_gmail_service_fixed(client_secrets_file, token_file)
-        try:
-            profile = self._gmail_service.users().getProfile(userId="me").execute()
-            print("Authenticated as:", profile.get("emailAddress"))
-        except Exception as e:
-            print("Failed to retrieve profile info:", e)
+
+    @property
+    def gmail_service(self) -> Any:
+        # credentials are shared with the other Google tools; the client belongs to the calling thread
+        return GoogleServices.service("gmail", "v1")
     
-    def search_messages(self, query: str) -> List[Dict[str, Any]]:
-        """Search for messages matching the given query."""
-        results = self._gmail_service.users().messages().list(userId="me", q=query).execute()
-        messages = results.get("messages", [])
-        return messages
+    def search_messages(
+        self, query: str, max_results: int = SEARCH_MAX_RESULTS, page_token: Optional[str] = None
+    ) -> tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Search for messages matching the given query, newest first. Returns their headers and snippets,
+        fetched with batch requests of up to SEARCH_BATCH_SIZE messages, and the token for the next page.
+        """
+        results = self.gmail_service.users().messages().list(
+            userId="me", q=query, maxResults=min(max_results, SEARCH_MAX_RESULTS_CAP), pageToken=page_token,
+            fields="nextPageToken, messages(id)",
+        ).execute()
+        ids = [message["id"] for message in results.get("messages", [])]
+
+        found: Dict[str, Dict[str, Any]] = {}
+        rate_limited: List[str] = []
+
+        def on_message(request_id: str, response: Dict[str, Any], exception: Optional[Exception]) -> None:
+            if exception is not None:
+                if getattr(getattr(exception, "resp", None), "status", None) == 429:
+                    rate_limited.append(request_id)
+                found[request_id] = {"id": request_id, "error": str(exception)}
+                return
+            headers = {header["name"]: header["value"] for header in response.get("payload", {}).get("headers", [])}
+            found[request_id] = {
+                "id": response["id"],
+                "threadId": response.get("threadId"),
+                **{name.lower(): headers.get(name, "") for name in SEARCH_HEADERS},
+                "snippet": response.get("snippet", ""),
+            }
+
+        def fetch(message_ids: List[str]) -> None:
+            for start in range(0, len(message_ids), SEARCH_BATCH_SIZE):
+                batch = self.gmail_service.new_batch_http_request(callback=on_message)
+                for message_id in message_ids[start:start + SEARCH_BATCH_SIZE]:
+                    batch.add(
+                        self.gmail_service.users().messages().get(
+                            userId="me", id=message_id, format="metadata", metadataHeaders=SEARCH_HEADERS,
+                            fields="id, threadId, snippet, payload/headers",
+                        ),
+                        request_id=message_id,
+                    )
+                batch.execute()
+
+        fetch(ids)
+        if rate_limited:
+            time.sleep(SEARCH_RETRY_SECONDS)
+            fetch(list(rate_limited))
+        return [found[message_id] for message_id in ids], results.get("nextPageToken")
     
     def create_draft(self, sender: str, to: str, subject: str, body: str) -> Dict[str, Any]:
         """Create a draft email message."""
         raw_message = create_message(sender, to, subject, body)
         draft_body = {"message": {"raw": raw_message}}
-        draft = self._gmail_service.users().drafts().create(userId="me", body=draft_body).execute()
+        draft = self.gmail_service.users().drafts().create(userId="me", body=draft_body).execute()
         return draft
     
     def send_message(self, sender: str, to: str, subject: str, body: str) -> Dict[str, Any]:
         """Send an email message."""
         raw_message = create_message(sender, to, subject, body)
-        message = self._gmail_service.users().messages().send(userId="me", body={"raw": raw_message}).execute()
+        message = self.gmail_service.users().messages().send(userId="me", body={"raw": raw_message}).execute()
         return message
     
     def _run(self, tool_input: str, **kwargs: Any) -> str:
         try:
             if tool_input.startswith("search_messages:"):
-                query = tool_input.split(":", 1)[1].strip()
-                messages = self.search_messages(query)
-                return f"Found {len(messages)} messages:\n" + json.dumps(messages, indent=2)
+                # search_messages:<query> | max_results=N | page_token=...
+                query, params = parse_options(tool_input)
+                messages, next_page_token = self.search_messages(
+                    query,
+                    max_results=int(params.get("max_results", SEARCH_MAX_RESULTS)),
+                    page_token=params.get("page_token"),
+                )
+                return format_messages(messages, next_page_token)
             
             elif tool_input.startswith("create_draft:"):
                 # expected format: create_draft:sender,to,subject,body
@@ -135,13 +177,12 @@ class GMailTool(BaseTool):
             return f"An error occurred: {str(e)}"
     
     async def _arun(self, tool_input: str, **kwargs: Any) -> str:
-        return self._run(tool_input, **kwargs)
+        # the Google client is blocking, so run it on the bounded I/O pool instead of the event loop
+        return await run_blocking(self._run, tool_input, **kwargs)
 
 
 if __name__ == "__main__":
-    CLIENT_SECRETS_FILE = os.getenv("GSUITE_CLIENT_SECRETS")
-    
-    gmail_tool = GMailTool(client_secrets_file=CLIENT_SECRETS_FILE)
+    gmail_tool = GMailTool()
     
     # Test search_messages operation.
     print("Testing search_messages operation...")
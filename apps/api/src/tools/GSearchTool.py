@@ -1,8 +1,24 @@
 import os
 from langchain_core.tools import Tool
-from langchain_google_community import GoogleSearchAPIWrapper
 
-search = GoogleSearchAPIWrapper()
+from src.utils.concurrency import run_blocking
+
+_search = None
+
+def get_search():
+    # created on first use: the wrapper validates credentials and builds an API client
+    global _search
+    if _search is None:
+        from langchain_google_community import GoogleSearchAPIWrapper
+        _search = GoogleSearchAPIWrapper()
+    return _search
+
+def search(query: str) -> str:
+    return get_search().run(query)
+
+async def asearch(query: str) -> str:
+    # the search wrapper is blocking, so run it on the bounded I/O pool instead of the event loop
+    return await run_blocking(search, query)
 
 # wraps the search function in a LangChain Tool.
 tool = Tool(
@@ -10,7 +26,8 @@ tool = Tool(
     description="A tool that interfaces with Google's Search API to fetch the latest" 
                 "web results based on user queries. Use this tool when you need to retrieve"
                 "up-to-date and relevant information from the web.",
-    func=search.run,
+    func=search,
+    coroutine=asearch,
 )
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+import os
+import json
+import pickle
+import threading
+import time
+import urllib.request
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from config import ProjectConf
+
+class GoogleServices:
+    '''
+    Shared Google OAuth credentials and the API clients built from them, for every Google tool.
+
+    Credentials are loaded (or authorized) once on first use and refreshed in place by a background
+    thread shortly before they expire, so tool calls never wait on a token refresh. Discovery documents
+    are parsed once per process and kept on disk, and each thread gets its own clients because the
+    underlying httplib2 transport is not thread-safe.
+    '''
+    _credentials: Any = None
+    _lock = threading.RLock()
+    _discovery_lock = threading.Lock()
+    _documents: dict[tuple[str, str], dict[str, Any]] = {}
+    _local = threading.local()
+    _refresher: Optional[threading.Thread] = None
+
+    @classmethod
+    def service(cls, api: str, version: str) -> Any:
+        '''Returns this thread's client for the API, e.g. service("drive", "v3")'''
+        clients = getattr(cls._local, "clients", None)
+        if clients is None:
+            clients = cls._local.clients = {}
+        if (api, version) not in clients:
+            from googleapiclient.discovery import build_from_document
+            clients[(api, version)] = build_from_document(
+                cls._discovery_document(api, version), credentials=cls.credentials()
+            )
+        return clients[(api, version)]
+
+    @classmethod
+    def credentials(cls) -> Any:
+        with cls._lock:
+            if cls._credentials is None:
+                cls._credentials = cls._load_credentials()
+                cls._start_refresher()
+            elif cls._expires_within(ProjectConf.google_token_refresh_margin_seconds):
+                # the background refresh failed or has not run yet
+                cls._refresh_locked()
+            return cls._credentials
+
+    @classmethod
+    def is_authorized(cls) -> bool:
+        return cls._credentials is not None
+
+    #### Credentials ####
+
+    @classmethod
+    def _load_credentials(cls) -> Any:
+        # the Google client libraries are slow to import; only pay for them once a tool is used
+        from google.auth.transport.requests import Request
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        scopes = ProjectConf.google_scopes
+        creds = None
+        if os.path.exists(ProjectConf.google_token_file):
+            with open(ProjectConf.google_token_file, "rb") as token:
+                creds = pickle.load(token)
+            # a token granted for fewer scopes would fail on the first call to the missing API
+            if creds is not None and not creds.has_scopes(scopes):
+                print(f"{ProjectConf.google_token_file} lacks some of the required scopes, authorizing again")
+                creds = None
+
+        if creds is not None and creds.valid:
+            return creds
+        if creds is not None and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(ProjectConf.google_client_secrets_file, scopes)
+            creds = flow.run_local_server(port=8080)  # Force port 8080 bc idk how to deal w dynamic uri's w/ google apis
+        cls._save(creds)
+        return creds
+
+    @classmethod
+    def _save(cls, creds: Any) -> None:
+        # write then rename, so a crash never leaves a half-written token
+        tmp_path = f"{ProjectConf.google_token_file}.tmp"
+        with open(tmp_path, "wb") as token:
+            pickle.dump(creds, token)
+        os.replace(tmp_path, ProjectConf.google_token_file)
+
+    @classmethod
+    def _seconds_to_expiry(cls) -> Optional[float]:
+        expiry = cls._credentials.expiry
+        if expiry is None:
+            return None
+        # google-auth keeps expiry as a naive UTC datetime
+        return (expiry - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds()
+
+    @classmethod
+    def _expires_within(cls, seconds: float) -> bool:
+        remaining = cls._seconds_to_expiry()
+        return remaining is not None and remaining < seconds
+
+    @classmethod
+    def _refresh_locked(cls) -> None:
+        from google.auth.transport.requests import Request
+        # refreshed in place, so every client built from these credentials picks up the new token
+        cls._credentials.refresh(Request())
+        cls._save(cls._credentials)
+
+    #### Background refresh ####
+
+    @classmethod
+    def _start_refresher(cls) -> None:
+        if cls._refresher is None and cls._credentials.refresh_token:
+            cls._refresher = threading.Thread(target=cls._refresh_loop, name="google-token-refresh", daemon=True)
+            cls._refresher.start()
+
+    @classmethod
+    def _refresh_loop(cls) -> None:
+        margin = ProjectConf.google_token_refresh_margin_seconds
+        while True:
+            with cls._lock:
+                remaining = cls._seconds_to_expiry()
+            if remaining is None:
+                return      # the token never expires
+            time.sleep(max(remaining - margin, 0))
+            try:
+                with cls._lock:
+                    if cls._expires_within(margin):
+                        cls._refresh_locked()
+            except Exception as e:
+                # calls keep using the current token until it expires, and refresh it themselves after that
+                print(f"Refreshing the Google token failed: {e}")
+                time.sleep(60)
+
+    #### Discovery ####
+
+    @classmethod
+    def _discovery_document(cls, api: str, version: str) -> dict[str, Any]:
+        if (api, version) not in cls._documents:
+            with cls._discovery_lock:
+                if (api, version) not in cls._documents:
+                    cls._documents[(api, version)] = json.loads(cls._read_discovery_document(api, version))
+        return cls._documents[(api, version)]
+
+    @classmethod
+    def _read_discovery_document(cls, api: str, version: str) -> str:
+        # the client library ships documents for the common APIs; others are fetched once and kept on disk
+        from googleapiclient.discovery_cache import get_static_doc
+        document = get_static_doc(api, version)
+        if document is not None:
+            return document
+
+        path = os.path.join(ProjectConf.google_discovery_cache_dir, f"{api}.{version}.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+
+        url = f"https://{api}.googleapis.com/$discovery/rest?version={version}"
+        with urllib.request.urlopen(url, timeout=30) as response:
+            document = response.read().decode("utf-8")
+        os.makedirs(ProjectConf.google_discovery_cache_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(document)
+        return document
@@ -0,0 +1,23 @@
+"""
+Helpers for running blocking client libraries from async code without stalling the event loop.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from config import ProjectConf
+
+T = TypeVar("T")
+
+# Shared, bounded pool for blocking I/O. Kept separate from Starlette's default threadpool so
+# slow Google API calls cannot starve request handling.
+_executor = ThreadPoolExecutor(
+    max_workers=ProjectConf.blocking_io_workers,
+    thread_name_prefix="blocking-io",
+)
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    '''Runs a blocking callable on the shared I/O executor and awaits its result'''
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,7 @@
+from typing import Dict
+
+def parse_options(tool_input: str) -> tuple[str, Dict[str, str]]:
+    '''Splits "<operation>:<argument> | key=value | ..." into the argument and the options'''
+    argument, *options = tool_input.split(":", 1)[1].split("|") if ":" in tool_input else ("",)
+    params = dict(option.split("=", 1) for option in options if "=" in option)
+    return argument.strip(), {key.strip(): value.strip() for key, value in params.items()}
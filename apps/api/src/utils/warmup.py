@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Callable
+
+from src.utils.concurrency import run_blocking
+
+class Warmup:
+    '''
+    Loads expensive resources (models, connections, the compiled graph) off the import path.
+    Each component loads on first use anyway; warming up just moves that cost ahead of the first
+    request, and the status tells a readiness probe when the process is fully warm.
+    '''
+    _components: dict[str, tuple[Callable[[], Any], Callable[[], bool]]] = {}
+    _errors: dict[str, str] = {}
+    _loading: set[str] = set()
+
+    @classmethod
+    def register(cls, name: str, load: Callable[[], Any], is_loaded: Callable[[], bool]) -> None:
+        cls._components[name] = (load, is_loaded)
+
+    @classmethod
+    async def run(cls) -> dict[str, str]:
+        '''Loads every component that is not loaded or loading yet, concurrently on the I/O pool'''
+        async def load(name: str, loader: Callable[[], Any]):
+            cls._loading.add(name)
+            cls._errors.pop(name, None)
+            try:
+                await run_blocking(loader)
+            except Exception as e:
+                print(f"Warm-up of {name} failed: {e}")
+                cls._errors[name] = str(e)
+            finally:
+                cls._loading.discard(name)
+
+        await asyncio.gather(*(
+            load(name, loader)
+            for name, (loader, is_loaded) in cls._components.items()
+            if not is_loaded() and name not in cls._loading
+        ))
+        return cls.status()
+
+    @classmethod
+    def status(cls) -> dict[str, str]:
+        status = {}
+        for name, (_, is_loaded) in cls._components.items():
+            if is_loaded():
+                status[name] = "ready"
+            elif name in cls._loading:
+                status[name] = "loading"
+            elif name in cls._errors:
+                status[name] = f"failed: {cls._errors[name]}"
+            else:
+                status[name] = "cold"
+        return status
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return all(is_loaded() for _, is_loaded in cls._components.values())
@@ -0,0 +1,111 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from config import ProjectConf
+from src.utils.concurrency import run_blocking
+from src.utils.prompts import SYNTHESIS_PROMPT
+from src.workflows.Graph import GraphBuilder
+from src.workflows.Workflow import REQUEST_PARAMETER, SUPERVISOR_NAME, StepState, Workflow, WorkflowStore
+
+class WorkflowExecutor:
+    '''
+    Compiles finished threads into stored workflows and replays them. A replay hands each step
+    straight to its agent's subgraph, skipping the supervisor LLM call that would otherwise decide
+    the routing before and after every agent. Steps whose dependencies are met run concurrently,
+    so a multi-source request takes about as long as its slowest branch.
+    '''
+    # process-wide per-agent limits, created lazily on the serving event loop
+    _agent_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def compile_thread(cls, thread_id: str, name: str) -> Workflow:
+        graph = GraphBuilder.get_graph()
+        state = graph.get_state(ProjectConf.thread_config(thread_id))
+        if state.next:
+            raise ValueError(f"Thread {thread_id} has not finished running.")
+        workflow = Workflow.compile(name, state.values.get("messages", []), source_thread_id=thread_id)
+        return WorkflowStore.save(workflow)
+
+    @classmethod
+    def _agent_semaphore(cls, agent: str) -> Optional[asyncio.Semaphore]:
+        limit = ProjectConf.plan_agent_concurrency.get(agent)
+        if limit is None:
+            return None
+        if agent not in cls._agent_semaphores:
+            cls._agent_semaphores[agent] = asyncio.Semaphore(limit)
+        return cls._agent_semaphores[agent]
+
+    @classmethod
+    async def _run_step(cls, workflow: Workflow, index: int, step: StepState, parameters: dict[str, str],
+                        request: str, finished: dict[int, AIMessage], run_limit: asyncio.Semaphore) -> AIMessage:
+        # the agent sees the request, the results its step builds on, and its own instruction
+        messages = [HumanMessage(content=request)]
+        messages += [finished[ancestor] for ancestor in workflow.ancestors(index)]
+        instruction = workflow.render(step, parameters)
+        if instruction != request:
+            messages.append(HumanMessage(content=instruction))
+
+        agent = await run_blocking(GraphBuilder.get_agent, step["agent"])
+        agent_limit = cls._agent_semaphore(step["agent"])
+        async with run_limit:
+            if agent_limit is None:
+                result = await agent.ainvoke({"messages": messages})
+            else:
+                async with agent_limit:
+                    result = await agent.ainvoke({"messages": messages})
+
+        final_message = result["messages"][-1]
+        if not final_message.name:
+            final_message.name = step["agent"]
+        return final_message
+
+    @classmethod
+    async def run(cls, workflow: Workflow, parameters: dict[str, str], synthesize: bool = False) -> AsyncIterator[str]:
+        '''
+        Executes a workflow's step DAG, streaming each step's result in the same format as /run as
+        soon as it finishes. With `synthesize`, the results are merged into one final answer.
+        '''
+        request = {**workflow.parameters, **parameters}[REQUEST_PARAMETER]
+        steps = [StepState(**step) for step in workflow.steps]
+        run_limit = asyncio.Semaphore(ProjectConf.plan_max_parallel_steps)
+
+        finished: dict[int, AIMessage] = {}
+        pending = set(range(len(steps)))
+        running: dict[asyncio.Task, int] = {}
+        try:
+            while pending or running:
+                # dispatch every step whose dependencies have all finished
+                for index in sorted(pending):
+                    if all(dependency in finished for dependency in workflow.dependencies(index)):
+                        pending.discard(index)
+                        task = asyncio.create_task(
+                            cls._run_step(workflow, index, steps[index], parameters, request, finished, run_limit)
+                        )
+                        running[task] = index
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = running.pop(task)
+                    step = steps[index]
+                    if task.exception() is not None:
+                        step["last_error"] = str(task.exception())
+                        yield f"{((), {step['agent']: {'error': step['last_error']}})}\n----\n"
+                        return
+                    finished[index] = task.result()
+                    step["result"] = str(finished[index].content)
+                    step["done"] = True
+                    yield f"{((), {step['agent']: {'messages': [finished[index]]}})}\n----\n"
+        finally:
+            for task in running:
+                task.cancel()
+
+        if synthesize and finished:
+            answer = await ProjectConf.agent_llm.ainvoke([
+                ("system", SYNTHESIS_PROMPT),
+                HumanMessage(content=request),
+                *(finished[index] for index in sorted(finished)),
+            ])
+            answer.name = SUPERVISOR_NAME
+            yield f"{((), {SUPERVISOR_NAME: {'messages': [answer]}})}\n----\n"
@@ -1,11 +1,13 @@
+import inspect
+import threading
+from typing import TYPE_CHECKING
+
 from pydantic import BaseModel
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph.state import CompiledStateGraph
-from langgraph_supervisor import create_supervisor
 
 from config import ProjectConf
 from src.agents.AgentRegistry import AgentRegistry
 from src.utils.prompts import SUPERVISOR_PROMPT
+from src.workflows.SQLiteCheckpointSaver import SQLiteCheckpointSaver
 
 # Necessary for registering classes with AgentRegistry at import time
 from src.agents import (
@@ -16,19 +18,105 @@ from src.agents import (
     RAGAgent
 ) # noqa: F401
 
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
+
 class GraphBuilder:
-    _graph: CompiledStateGraph = None
+    '''
+    Owns the process-wide compiled supervisor graph. The graph is built once (on first use or
+    at startup) and shared by every request; runs are isolated from each other by thread_id.
+    '''
+    _graph: "CompiledStateGraph" = None
+    _agents: dict[str, "CompiledStateGraph"] = {}   # compiled agent subgraphs by name
+    _agent_descriptions: dict[str, str] = {}        # agent docstrings by name, for planning
+    _fingerprint: tuple = None
+    _lock = threading.Lock()
+
+    # the checkpointer outlives individual builds so a rebuild does not throw history away; it is
+    # opened on first use, so importing the API does not create or migrate the database
+    _checkpointer: SQLiteCheckpointSaver = None
 
     @classmethod
-    def get_graph(cls) -> CompiledStateGraph:
-        return cls._graph
+    def get_checkpointer(cls) -> SQLiteCheckpointSaver:
+        checkpointer = cls._checkpointer
+        if checkpointer is not None:
+            return checkpointer
+        with cls._lock:
+            return cls._checkpointer_locked()
+
+    @classmethod
+    def _checkpointer_locked(cls) -> SQLiteCheckpointSaver:
+        if cls._checkpointer is None:
+            cls._checkpointer = SQLiteCheckpointSaver(
+                ProjectConf.checkpoint_db_path,
+                max_checkpoints_per_thread=ProjectConf.checkpoint_max_per_thread,
+                thread_ttl_seconds=ProjectConf.checkpoint_thread_ttl_seconds,
+                max_threads=ProjectConf.checkpoint_max_threads,
+                snapshot_every=ProjectConf.checkpoint_snapshot_every,
+            )
+        return cls._checkpointer
+
+    @classmethod
+    def _current_fingerprint(cls) -> tuple:
+        # everything the compiled graph depends on; a change here means the cached graph is stale
+        return (AgentRegistry.get_version(), id(ProjectConf.agent_llm), SUPERVISOR_PROMPT)
+
+    @classmethod
+    def get_graph(cls) -> "CompiledStateGraph":
+        '''Returns the shared graph, building it if it does not exist or is out of date'''
+        graph = cls._graph
+        if graph is not None and cls._fingerprint == cls._current_fingerprint():
+            return graph
+
+        with cls._lock:
+            # another request may have finished building while we waited on the lock
+            if cls._graph is None or cls._fingerprint != cls._current_fingerprint():
+                cls._build_locked()
+            return cls._graph
+
+    @classmethod
+    def is_built(cls) -> bool:
+        return cls._graph is not None
+
+    @classmethod
+    def get_agent(cls, name: str) -> "CompiledStateGraph":
+        '''Returns the compiled subgraph of a single agent, for running it without the supervisor'''
+        cls.get_graph()
+        if name not in cls._agents:
+            raise ValueError(f"Unknown agent {name}.")
+        return cls._agents[name]
+
+    @classmethod
+    def get_agent_descriptions(cls) -> dict[str, str]:
+        cls.get_graph()
+        return cls._agent_descriptions
+
+    @classmethod
+    def build(cls) -> "CompiledStateGraph":
+        '''Forces a rebuild of the shared graph, e.g. after the registry or config changes'''
+        with cls._lock:
+            return cls._build_locked()
+
+    @classmethod
+    def invalidate(cls) -> None:
+        '''Drops the cached graph so the next get_graph call rebuilds it'''
+        with cls._lock:
+            cls._graph = None
+            cls._fingerprint = None
 
     @classmethod
-    def build(cls) -> CompiledStateGraph:
+    def _build_locked(cls) -> "CompiledStateGraph":
+        from langgraph_supervisor import create_supervisor
+
+        fingerprint = cls._current_fingerprint()
+
         # construct all nodes in the graph
         compiled_agents = []
+        agent_descriptions = {}
         for agent_cls in AgentRegistry.get_agents():
-            compiled_agents.append(agent_cls().build())
+            compiled_agent = agent_cls().build()
+            compiled_agents.append(compiled_agent)
+            agent_descriptions[compiled_agent.name] = inspect.cleandoc(agent_cls.__doc__ or "")
 
         # build a supervisor workflow with all agents and supervisor prompt
         graph = create_supervisor(
@@ -37,9 +125,9 @@ class GraphBuilder:
             model=ProjectConf.agent_llm
         )
 
-        # deploy a checkpointer for rollback and branching features
-        checkpointer = MemorySaver()
-
-        # return a compiled graph with checkpointing
-        cls._graph = graph.compile(checkpointer=checkpointer)
+        # return a compiled graph with checkpointing for rollback and branching features
+        cls._graph = graph.compile(checkpointer=cls._checkpointer_locked())
+        cls._agents = {agent.name: agent for agent in compiled_agents}
+        cls._agent_descriptions = agent_descriptions
+        cls._fingerprint = fingerprint
         return cls._graph
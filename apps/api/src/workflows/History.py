@@ -1,29 +1,176 @@
-from typing import Any, Union
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, AsyncIterator, Optional
 
 from config import ProjectConf
+from src.runner import Runner
+from src.utils.concurrency import run_blocking
 from src.workflows.Graph import GraphBuilder
+from src.workflows.models import HistoryPage, HistoryRecord
+from langchain_core.messages import AnyMessage, HumanMessage, RemoveMessage
 from langgraph.types import StateSnapshot
 
+def _message_text(message: Any) -> str:
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        # multimodal content is a list of blocks; keep the text ones
+        content = " ".join(
+            block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+        )
+    return str(content)
+
+def snapshot_to_record(snapshot: StateSnapshot) -> HistoryRecord:
+    '''Extracts the fields the history views need from a state snapshot, without stringifying it'''
+    configurable = snapshot.config["configurable"]
+    parent_configurable = (snapshot.parent_config or {}).get("configurable", {})
+    metadata = snapshot.metadata or {}
+    messages = (snapshot.values or {}).get("messages", [])
+
+    most_recent_message, agent = None, None
+    for message in reversed(messages):
+        text = _message_text(message)
+        if text:
+            most_recent_message = text
+            agent = getattr(message, "name", None)
+            break
+
+    writes = metadata.get("writes") or {}
+    if writes:
+        agent = next(iter(writes))
+
+    return HistoryRecord(
+        checkpoint_id=configurable["checkpoint_id"],
+        parent_id=parent_configurable.get("checkpoint_id"),
+        thread_id=configurable["thread_id"],
+        step=metadata.get("step"),
+        next=list(snapshot.next),
+        agent=agent,
+        most_recent_message=most_recent_message,
+        created_at=snapshot.created_at,
+    )
+
 class WorkflowHistory:
-    _conf = ProjectConf.state_snapshot_config
+    _default_thread_id = ProjectConf.default_thread_id
+
+    # live history streams waiting on new checkpoints, keyed by thread_id
+    _subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = defaultdict(set)
+    _subscribers_lock = threading.Lock()
+    _listening = False
     
     @classmethod
-    def get_history(cls) -> str:
+    def get_history(cls, thread_id: str = _default_thread_id, limit: int = 50, before: Optional[str] = None,
+                    since: Optional[str] = None) -> HistoryPage:
+        '''
+        Returns one page of a thread's checkpoints, newest first. Only `limit` checkpoints are
+        read from the store, so the cost depends on the page size rather than the history length.
+        With `since`, only checkpoints newer than that checkpoint_id are returned; when there are
+        more than `limit` of them, the rest follow with `before` set to `next_before`.
+        '''
         graph = GraphBuilder.get_graph()
-        return str(list(graph.get_state_history(cls._conf)))
+        before_config = {"configurable": {"checkpoint_id": before}} if before else None
+        records = []
+        # one extra checkpoint tells whether there is another page
+        for snapshot in graph.get_state_history(
+            ProjectConf.thread_config(thread_id), before=before_config, limit=limit + 1
+        ):
+            # checkpoint ids are time ordered, so everything from here on is already known
+            if since and snapshot.config["configurable"]["checkpoint_id"] <= since:
+                break
+            records.append(snapshot_to_record(snapshot))
+        next_before = records[limit - 1].checkpoint_id if len(records) > limit else None
+        return HistoryPage(records=records[:limit], next_before=next_before)
 
     @classmethod
-    def update(cls, checkpoint_id: str, new_prompt: str) -> Union[dict[str, Any], Any]:
+    def get_since(cls, thread_id: str, since: Optional[str]) -> list[HistoryRecord]:
+        '''Returns checkpoints newer than `since`, newest first; stops reading once it reaches it'''
         graph = GraphBuilder.get_graph()
-        print("Updating history...")
-        print(new_prompt)
-        for state in graph.get_state_history(cls._conf):
-            print(state.config['configurable']['checkpoint_id'])
-            if state.config['configurable'] and state.config['configurable']['checkpoint_id'] == checkpoint_id:
-                state.values['messages'] = [new_prompt]
-                graph.update_state(state.config, {'messages': 'messages'})
-
-                return graph.stream({'messages': [new_prompt]}, state.config, stream_mode="values")
-
-        print("Invalid checkpoint_id, should not reach this point")
-        return None # Invalid checkpoint_id, should not reach this point
\ No newline at end of file
+        records = []
+        for snapshot in graph.get_state_history(ProjectConf.thread_config(thread_id)):
+            # checkpoint ids are time ordered, so everything from here on is already known
+            if since and snapshot.config["configurable"]["checkpoint_id"] <= since:
+                break
+            records.append(snapshot_to_record(snapshot))
+        return records
+
+    @classmethod
+    def _latest_checkpoint_id(cls, thread_id: str) -> Optional[str]:
+        checkpoint_tuple = GraphBuilder.get_checkpointer().get_tuple(ProjectConf.thread_config(thread_id))
+        return checkpoint_tuple.config["configurable"]["checkpoint_id"] if checkpoint_tuple else None
+
+    @classmethod
+    def _on_checkpoint(cls, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> None:
+        # only top-level checkpoints are part of the history; subgraph ones are skipped
+        if checkpoint_ns:
+            return
+        with cls._subscribers_lock:
+            waiters = list(cls._subscribers.get(thread_id, ()))
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass    # the subscriber's loop has closed
+
+    @classmethod
+    async def stream(cls, thread_id: str, since: Optional[str] = None) -> AsyncIterator[Optional[HistoryRecord]]:
+        '''
+        Yields each new checkpoint of a thread, oldest first, as it is written. Starts after
+        `since`, or after the latest checkpoint when no cursor is given. Yields None after every
+        idle poll interval so callers can send keep-alives.
+        '''
+        with cls._subscribers_lock:
+            if not cls._listening:
+                GraphBuilder.get_checkpointer().add_listener(cls._on_checkpoint)
+                cls._listening = True
+
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with cls._subscribers_lock:
+            cls._subscribers[thread_id].add(waiter)
+        try:
+            cursor = since or await run_blocking(cls._latest_checkpoint_id, thread_id)
+            while True:
+                # cleared before reading, so a checkpoint written during the read wakes the next wait
+                event.clear()
+                records = await run_blocking(cls.get_since, thread_id, cursor)
+                for record in reversed(records):
+                    yield record
+                if records:
+                    cursor = records[0].checkpoint_id
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=ProjectConf.history_stream_poll_seconds)
+                except asyncio.TimeoutError:
+                    # nothing written locally; re-check anyway for writes from other workers
+                    yield None
+        finally:
+            with cls._subscribers_lock:
+                cls._subscribers[thread_id].discard(waiter)
+                if not cls._subscribers[thread_id]:
+                    del cls._subscribers[thread_id]
+
+    @classmethod
+    def find_checkpoint(cls, checkpoint_id: str) -> Optional[dict[str, Any]]:
+        '''Resolves a checkpoint id to its config through the store's index, without a history scan'''
+        return GraphBuilder.get_checkpointer().find_checkpoint(checkpoint_id)
+
+    @classmethod
+    def fork_input(cls, messages: list[AnyMessage], new_prompt: str) -> dict[str, Any]:
+        '''
+        Builds the input that branches a checkpoint with an edited prompt: the latest user message
+        is replaced in place and everything after it is dropped, so the workflow re-runs from there.
+        '''
+        for index in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[index], HumanMessage):
+                edited = HumanMessage(content=new_prompt, id=messages[index].id)
+                removed = [RemoveMessage(id=message.id) for message in messages[index + 1:]]
+                return {"messages": [edited, *removed]}
+        return {"messages": [HumanMessage(content=new_prompt)]}
+
+    @classmethod
+    async def fork(cls, checkpoint_config: dict[str, Any], new_prompt: str) -> AsyncIterator[str]:
+        '''Branches from a checkpoint with an edited prompt and streams the re-execution like /run'''
+        runner = await run_blocking(Runner, thread_id=checkpoint_config["configurable"]["thread_id"])
+        state = await runner.graph.aget_state(checkpoint_config)
+        graph_input = cls.fork_input(state.values.get("messages", []), new_prompt)
+        async for output in runner.astream(graph_input, checkpoint_config):
+            yield output
@@ -0,0 +1,55 @@
+import uuid
+
+from pydantic import BaseModel, Field
+
+from config import ProjectConf
+from src.utils.concurrency import run_blocking
+from src.utils.prompts import PLANNER_PROMPT
+from src.workflows.Graph import GraphBuilder
+from src.workflows.Workflow import REQUEST_PARAMETER, StepState, Workflow
+
+class PlannedStep(BaseModel):
+    agent: str = Field(description="Exact name of the agent that carries out this step")
+    instruction: str = Field(description="Self-contained instruction for the agent")
+    depends_on: list[int] = Field(default=[], description="Zero-based positions of earlier steps whose results this step needs")
+
+class Plan(BaseModel):
+    steps: list[PlannedStep]
+
+class WorkflowPlanner:
+    '''
+    Asks the LLM for a dependency-aware plan up front, in one call, instead of letting the
+    supervisor pick one agent at a time. The resulting Workflow runs its independent steps in parallel.
+    '''
+    @classmethod
+    async def plan(cls, request: str, name: str = "plan") -> Workflow:
+        descriptions = await run_blocking(GraphBuilder.get_agent_descriptions)
+        agents = "\n\n".join(f"- {agent}: {description}" for agent, description in descriptions.items())
+
+        planner = ProjectConf.agent_llm.with_structured_output(Plan)
+        plan: Plan = await planner.ainvoke([
+            ("system", PLANNER_PROMPT.format(agents=agents)),
+            ("user", request),
+        ])
+
+        steps = []
+        for index, planned in enumerate(plan.steps):
+            if planned.agent not in descriptions:
+                raise ValueError(f"The plan uses unknown agent {planned.agent}.")
+            steps.append(StepState(
+                # the request reaches every agent separately, so instructions are used verbatim
+                user_query=planned.instruction.replace("{", "{{").replace("}", "}}"),
+                agent=planned.agent,
+                result="",
+                done=False,
+                last_error=None,
+                # drop anything that does not point backwards rather than failing the whole plan
+                depends_on=sorted({d for d in planned.depends_on if 0 <= d < index}),
+            ))
+
+        return Workflow(
+            workflow_id=str(uuid.uuid4()),
+            name=name,
+            parameters={REQUEST_PARAMETER: request},
+            steps=steps,
+        )
@@ -0,0 +1,618 @@
+"""
+Disk-backed LangGraph checkpointer with a bounded retention policy.
+
+Checkpoints live in a single SQLite file opened in WAL mode, so history survives restarts and
+is shared by every uvicorn worker pointed at the same file. Retention keeps the store from
+growing without bound:
+  - at most `max_checkpoints_per_thread` checkpoints are kept per thread/namespace,
+  - threads idle for longer than `thread_ttl_seconds` are dropped,
+  - beyond `max_threads`, the least recently used threads are evicted.
+
+The `messages` channel is delta encoded. The supervisor/ReAct loop takes a checkpoint on every
+hop, so storing the full message list each time makes a thread with N messages cost O(N^2).
+Instead each checkpoint stores only the messages appended (or changed) since its parent plus
+how much of the parent's list it keeps. A full snapshot is written every `snapshot_every`
+checkpoints, so rebuilding any checkpoint reads at most that many rows.
+"""
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+
+from src.utils.concurrency import run_blocking
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS threads_last_used ON threads (last_used_at);
+
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+-- checkpoint ids are globally unique, this resolves one to its thread without a history scan
+CREATE INDEX IF NOT EXISTS checkpoints_by_id ON checkpoints (checkpoint_id);
+
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+'''
+
+# columns added to `checkpoints` for delta encoding; applied to databases created before it
+_DELTA_COLUMNS = {
+    "messages_type": "TEXT",
+    "messages": "BLOB",
+    "delta_base": "TEXT",        # checkpoint the stored messages are relative to, NULL for a snapshot
+    "delta_keep": "INTEGER",     # number of leading messages kept from delta_base
+    "delta_depth": "INTEGER NOT NULL DEFAULT 0",    # deltas since the last full snapshot
+}
+
+# the channel whose value is delta encoded between a checkpoint and its parent
+DELTA_CHANNEL = "messages"
+
+def _common_prefix(old: Sequence[Any], new: Sequence[Any]) -> int:
+    '''Returns how many leading messages the two lists share'''
+    n = min(len(old), len(new))
+    i = 0
+    while i < n and (old[i] is new[i] or old[i] == new[i]):
+        i += 1
+    return i
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    def __init__(
+        self,
+        path: str,
+        max_checkpoints_per_thread: Optional[int] = None,
+        thread_ttl_seconds: Optional[float] = None,
+        max_threads: Optional[int] = None,
+        prune_every: int = 100,
+        snapshot_every: Optional[int] = 20,
+        cache_size: int = 256,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.thread_ttl_seconds = thread_ttl_seconds
+        self.max_threads = max_threads
+        self.prune_every = prune_every
+        # None disables delta encoding and stores every checkpoint as a full snapshot
+        self.snapshot_every = snapshot_every
+
+        # recently rebuilt message lists, so sequential writes do not re-read their parent
+        self._messages_cache: OrderedDict[tuple[str, str, str], tuple[Optional[list], int]] = OrderedDict()
+        self._cache_size = cache_size
+
+        # one connection per process; sqlite handles cross-process locking, the lock covers threads
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self._listeners: list[Callable[[str, str, str], None]] = []
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(checkpoints)")}
+        for column, definition in _DELTA_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE checkpoints ADD COLUMN {column} {definition}")
+        self.conn.commit()
+
+    ######################################################
+    # THREADS
+    ######################################################
+
+    def create_thread(self, thread_id: str) -> None:
+        '''Registers a thread so it is listed before its first checkpoint is written'''
+        with self._lock, self.conn:
+            self._touch_thread(thread_id)
+
+    def list_threads(self, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        '''Returns known threads, most recently used first'''
+        query = '''
+            SELECT t.thread_id, t.created_at, t.last_used_at,
+                   (SELECT COUNT(*) FROM checkpoints c WHERE c.thread_id = t.thread_id)
+            FROM threads t ORDER BY t.last_used_at DESC
+        '''
+        params: tuple = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [
+            {"thread_id": row[0], "created_at": row[1], "last_used_at": row[2], "checkpoints": row[3]}
+            for row in rows
+        ]
+
+    def thread_exists(self, thread_id: str) -> bool:
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM threads WHERE thread_id = ?", (thread_id,)).fetchone()
+        return row is not None
+
+    def delete_thread(self, thread_id: str) -> None:
+        '''Deletes a thread and every checkpoint and pending write that belongs to it'''
+        with self._lock, self.conn:
+            self._delete_threads_locked([thread_id])
+
+    def _touch_thread(self, thread_id: str) -> None:
+        now = time.time()
+        self.conn.execute(
+            '''INSERT INTO threads (thread_id, created_at, last_used_at) VALUES (?, ?, ?)
+               ON CONFLICT(thread_id) DO UPDATE SET last_used_at = excluded.last_used_at''',
+            (thread_id, now, now),
+        )
+
+    def _delete_threads_locked(self, thread_ids: Sequence[str]) -> None:
+        for table in ("writes", "checkpoints", "threads"):
+            self.conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(t,) for t in thread_ids])
+        deleted = set(thread_ids)
+        for key in [key for key in self._messages_cache if key[0] in deleted]:
+            del self._messages_cache[key]
+
+    def find_checkpoint(self, checkpoint_id: str, checkpoint_ns: str = "") -> Optional[RunnableConfig]:
+        '''Returns the config addressing a checkpoint given only its id, or None if it does not exist'''
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT thread_id FROM checkpoints WHERE checkpoint_id = ? AND checkpoint_ns = ?",
+                (checkpoint_id, checkpoint_ns),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "configurable": {
+                "thread_id": row[0],
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    ######################################################
+    # LISTENERS
+    ######################################################
+
+    def add_listener(self, listener: Callable[[str, str, str], None]) -> None:
+        '''
+        Registers a callback invoked as listener(thread_id, checkpoint_ns, checkpoint_id) after
+        every checkpoint this process writes. Callbacks run on the writing thread and must be quick.
+        '''
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, str, str], None]) -> None:
+        self._listeners.remove(listener)
+
+    ######################################################
+    # RETENTION
+    ######################################################
+
+    def prune(self) -> None:
+        '''Applies the TTL and LRU thread limits'''
+        with self._lock, self.conn:
+            self._prune_locked()
+
+    def _prune_locked(self) -> None:
+        expired: list[str] = []
+        if self.thread_ttl_seconds is not None:
+            cutoff = time.time() - self.thread_ttl_seconds
+            expired += [row[0] for row in self.conn.execute(
+                "SELECT thread_id FROM threads WHERE last_used_at < ?", (cutoff,)
+            )]
+        if self.max_threads is not None:
+            expired += [row[0] for row in self.conn.execute(
+                "SELECT thread_id FROM threads ORDER BY last_used_at DESC LIMIT -1 OFFSET ?",
+                (self.max_threads,),
+            )]
+        if expired:
+            self._delete_threads_locked(list(set(expired)))
+
+    def _trim_thread_locked(self, thread_id: str, checkpoint_ns: str) -> None:
+        if self.max_checkpoints_per_thread is None:
+            return
+        stale = [row[0] for row in self.conn.execute(
+            '''SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+               ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?''',
+            (thread_id, checkpoint_ns, self.max_checkpoints_per_thread),
+        )]
+        if not stale:
+            return
+
+        # surviving checkpoints encoded against a checkpoint we are about to drop become snapshots
+        placeholders = ",".join("?" * len(stale))
+        dependents = [row[0] for row in self.conn.execute(
+            f'''SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                AND delta_base IN ({placeholders}) AND checkpoint_id NOT IN ({placeholders})''',
+            (thread_id, checkpoint_ns, *stale, *stale),
+        )]
+        for checkpoint_id in dependents:
+            self._materialize_locked(thread_id, checkpoint_ns, checkpoint_id)
+
+        keys = [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id in stale]
+        for table in ("writes", "checkpoints"):
+            self.conn.executemany(
+                f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                keys,
+            )
+        for key in keys:
+            self._messages_cache.pop(key, None)
+
+    ######################################################
+    # DELTA ENCODING
+    ######################################################
+
+    def _cache_messages(self, key: tuple[str, str, str], value: tuple[Optional[list], int]) -> None:
+        self._messages_cache[key] = value
+        self._messages_cache.move_to_end(key)
+        while len(self._messages_cache) > self._cache_size:
+            self._messages_cache.popitem(last=False)
+
+    def _messages_locked(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Optional[tuple[Optional[list], int]]:
+        '''
+        Rebuilds the full message list of a checkpoint together with its delta depth.
+        Returns None when the checkpoint (or a link in its delta chain) does not exist.
+        '''
+        key = (thread_id, checkpoint_ns, checkpoint_id)
+        if key in self._messages_cache:
+            self._messages_cache.move_to_end(key)
+            return self._messages_cache[key]
+
+        # walk back to the nearest snapshot (or cached checkpoint), then replay forwards
+        chain = []
+        base: Optional[tuple[Optional[list], int]] = None
+        current_id = checkpoint_id
+        while current_id is not None:
+            cached = self._messages_cache.get((thread_id, checkpoint_ns, current_id))
+            if cached is not None:
+                base = cached
+                break
+            row = self.conn.execute(
+                '''SELECT messages_type, messages, delta_base, delta_keep, delta_depth FROM checkpoints
+                   WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?''',
+                (thread_id, checkpoint_ns, current_id),
+            ).fetchone()
+            if row is None:
+                return None
+            chain.append(row)
+            current_id = row[2]
+
+        messages = base[0] if base is not None else None
+        for messages_type, stored, delta_base, delta_keep, _ in reversed(chain):
+            stored_messages = self.serde.loads_typed((messages_type, stored)) if messages_type else None
+            if delta_base is None:
+                messages = stored_messages
+            else:
+                messages = list(messages[:delta_keep]) + list(stored_messages)
+
+        depth = chain[0][4] if chain else base[1]
+        result = (messages, depth)
+        self._cache_messages(key, result)
+        return result
+
+    def _encode_messages_locked(
+        self, thread_id: str, checkpoint_ns: str, parent_checkpoint_id: Optional[str], messages: Optional[list],
+    ) -> tuple[Optional[str], Optional[int], Optional[list], int]:
+        '''Returns (delta_base, delta_keep, messages to store, delta_depth) for a new checkpoint'''
+        if messages is None or self.snapshot_every is None or parent_checkpoint_id is None:
+            return None, None, messages, 0
+
+        # the cache may still hold a parent another worker has since trimmed or pruned; a delta
+        # against a row that is gone could never be decoded, so the base must exist in the store
+        key = (thread_id, checkpoint_ns, parent_checkpoint_id)
+        row = self.conn.execute(
+            "SELECT delta_depth FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            self._messages_cache.pop(key, None)
+            return None, None, messages, 0
+
+        parent = self._messages_locked(thread_id, checkpoint_ns, parent_checkpoint_id)
+        # the stored depth is authoritative: another worker may have rewritten the parent as a snapshot
+        depth = row[0]
+        if parent is None or parent[0] is None or depth + 1 >= self.snapshot_every:
+            return None, None, messages, 0
+
+        keep = _common_prefix(parent[0], messages)
+        return parent_checkpoint_id, keep, messages[keep:], depth + 1
+
+    def _materialize_locked(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> None:
+        '''Rewrites a delta-encoded checkpoint as a full snapshot'''
+        rebuilt = self._messages_locked(thread_id, checkpoint_ns, checkpoint_id)
+        if rebuilt is None:
+            return
+        messages_type, serialized_messages = self.serde.dumps_typed(rebuilt[0])
+        self.conn.execute(
+            '''UPDATE checkpoints SET messages_type = ?, messages = ?, delta_base = NULL,
+               delta_keep = NULL, delta_depth = 0
+               WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?''',
+            (messages_type, serialized_messages, thread_id, checkpoint_ns, checkpoint_id),
+        )
+        self._cache_messages((thread_id, checkpoint_ns, checkpoint_id), (rebuilt[0], 0))
+
+    ######################################################
+    # CHECKPOINTER INTERFACE
+    ######################################################
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        with self._lock:
+            if checkpoint_id:
+                row = self.conn.execute(
+                    '''SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata
+                       FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?''',
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    '''SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata
+                       FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                       ORDER BY checkpoint_id DESC LIMIT 1''',
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple_locked(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config is not None:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+
+        # only keys are read up front; rows are loaded and decoded as the caller iterates, so a
+        # consumer that stops early (e.g. once it reaches a known checkpoint) pays only for what it saw
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+        # metadata filters are applied after decoding, so only push the limit down without them
+        if limit is not None and not filter:
+            query += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            keys = self.conn.execute(query, params).fetchall()
+
+        yielded = 0
+        for thread_id, checkpoint_ns, checkpoint_id in keys:
+            with self._lock:
+                row = self.conn.execute(
+                    '''SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata
+                       FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?''',
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+                # the checkpoint may have been pruned since the keys were read
+                if row is None:
+                    continue
+                checkpoint_tuple = self._to_tuple_locked(thread_id, checkpoint_ns, row)
+            if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            yield checkpoint_tuple
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_checkpoint_id = config["configurable"].get("checkpoint_id")
+
+        # the delta-encoded channel is stored in its own columns, not in the checkpoint blob
+        channel_values = dict(checkpoint["channel_values"])
+        messages = channel_values.pop(DELTA_CHANNEL, None)
+        stored_checkpoint = {**checkpoint, "channel_values": channel_values}
+
+        type_, serialized_checkpoint = self.serde.dumps_typed(stored_checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(metadata)
+
+        with self._lock, self.conn:
+            # take the write lock before checking the delta base, so no other worker can delete it
+            # between the check and the insert
+            self.conn.execute("BEGIN IMMEDIATE")
+            delta_base, delta_keep, stored_messages, delta_depth = self._encode_messages_locked(
+                thread_id, checkpoint_ns, parent_checkpoint_id, messages
+            )
+            messages_type, serialized_messages = (
+                self.serde.dumps_typed(stored_messages) if stored_messages is not None else (None, None)
+            )
+            self.conn.execute(
+                '''INSERT OR REPLACE INTO checkpoints
+                   (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint,
+                    metadata_type, metadata, messages_type, messages, delta_base, delta_keep, delta_depth)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                (thread_id, checkpoint_ns, checkpoint["id"], parent_checkpoint_id,
+                 type_, serialized_checkpoint, metadata_type, serialized_metadata,
+                 messages_type, serialized_messages, delta_base, delta_keep, delta_depth),
+            )
+            if messages is not None:
+                self._cache_messages((thread_id, checkpoint_ns, checkpoint["id"]), (list(messages), delta_depth))
+            self._touch_thread(thread_id)
+            self._trim_thread_locked(thread_id, checkpoint_ns)
+
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= self.prune_every:
+                self._puts_since_prune = 0
+                self._prune_locked()
+
+        # notify after the commit so listeners can read the checkpoint they were told about
+        for listener in list(self._listeners):
+            try:
+                listener(thread_id, checkpoint_ns, checkpoint["id"])
+            except Exception as e:
+                print("Checkpoint listener failed:", e)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        # special channels (errors, interrupts) overwrite; regular writes are kept on first write
+        verb = "INSERT OR REPLACE" if all(w[0] in WRITES_IDX_MAP for w in writes) else "INSERT OR IGNORE"
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized_value = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id, task_path,
+                         WRITES_IDX_MAP.get(channel, idx), channel, type_, serialized_value))
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f'''{verb} INTO writes
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, idx, channel, type, value)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                rows,
+            )
+
+    def get_next_version(self, current: Optional[str], channel: Any) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def _to_tuple_locked(self, thread_id: str, checkpoint_ns: str, row: Sequence[Any]) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        writes = self.conn.execute(
+            '''SELECT task_id, channel, type, value FROM writes
+               WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+               ORDER BY task_id, idx''',
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        loaded_checkpoint = self.serde.loads_typed((type_, checkpoint))
+        rebuilt = self._messages_locked(thread_id, checkpoint_ns, checkpoint_id)
+        if rebuilt is not None and rebuilt[0] is not None:
+            # hand out a copy so callers cannot mutate the cached list
+            loaded_checkpoint["channel_values"][DELTA_CHANNEL] = list(rebuilt[0])
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=loaded_checkpoint,
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_checkpoint_id,
+                }
+            } if parent_checkpoint_id else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+        )
+
+    ######################################################
+    # ASYNC INTERFACE
+    ######################################################
+    # sqlite3 is blocking; the async variants run the sync ones on the shared I/O pool
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await run_blocking(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoint_tuples = await run_blocking(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await run_blocking(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await run_blocking(self.put_writes, config, writes, task_id, task_path)
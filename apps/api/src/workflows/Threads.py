@@ -0,0 +1,27 @@
+import uuid
+from typing import Any, Optional
+
+from src.workflows.Graph import GraphBuilder
+
+class WorkflowThreads:
+    '''
+    Session management on top of the checkpoint store. Each thread is an independent
+    conversation whose checkpoints are isolated from every other thread.
+    '''
+    @classmethod
+    def create(cls, thread_id: Optional[str] = None) -> dict[str, Any]:
+        thread_id = thread_id or str(uuid.uuid4())
+        GraphBuilder.get_checkpointer().create_thread(thread_id)
+        return {"thread_id": thread_id}
+
+    @classmethod
+    def list(cls, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        return GraphBuilder.get_checkpointer().list_threads(limit)
+
+    @classmethod
+    def delete(cls, thread_id: str) -> bool:
+        checkpointer = GraphBuilder.get_checkpointer()
+        if not checkpointer.thread_exists(thread_id):
+            return False
+        checkpointer.delete_thread(thread_id)
+        return True
@@ -1,13 +1,194 @@
-from typing import TypedDict
-# from langgraph.graph import MessagesState, END
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from typing_extensions import NotRequired, TypedDict
+from pydantic import BaseModel, field_validator
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
+
+from config import ProjectConf
+
+SUPERVISOR_NAME = "supervisor"      # the node name create_supervisor gives the supervisor
+REQUEST_PARAMETER = "request"       # slot holding the user's request in every compiled workflow
 
 class StepState(TypedDict):
-    user_query: str
+    user_query: str                 # Instruction for the agent, may contain {parameter} slots
     agent: str
     result: str                     # Collect outputs from each step
     done: bool                      # True if we've finished
     last_error: str | None          # For error handling, if any
+    depends_on: NotRequired[list[int]]  # Earlier steps whose results this one needs; absent means the previous step
+
+
+class Workflow(BaseModel):
+    '''
+    A replayable plan: the agents to run, each with its instruction and the earlier steps it
+    depends on. Replaying it sends every step straight to the named agent, so the supervisor does
+    not have to re-plan the routing on every hop, and steps without dependencies between them
+    run in parallel.
+    '''
+    workflow_id: str
+    name: str
+    source_thread_id: Optional[str] = None
+    parameters: dict[str, str] = {}     # parameter slots and their default values
+    steps: list[StepState] = []
+
+    @field_validator("steps")
+    @classmethod
+    def _dependencies_point_backwards(cls, steps: list[StepState]) -> list[StepState]:
+        # only allowing references to earlier steps keeps every plan acyclic
+        for index, step in enumerate(steps):
+            for dependency in step.get("depends_on", []):
+                if not 0 <= dependency < index:
+                    raise ValueError(f"Step {index} depends on step {dependency}, which does not precede it.")
+        return steps
+
+    @classmethod
+    def compile(cls, name: str, messages: list[AnyMessage], source_thread_id: Optional[str] = None) -> "Workflow":
+        '''Extracts the agent steps of the last turn of a finished run from its message history'''
+        # a thread holds every turn of the conversation; only the latest one, from its user request
+        # onwards, is the run being saved
+        starts = [index for index, message in enumerate(messages) if isinstance(message, HumanMessage)]
+        if not starts:
+            raise ValueError("The run has no user request to compile.")
+        turn = messages[starts[-1]:]
+        request = str(turn[0].content)
+
+        steps: list[StepState] = []
+        current: Optional[StepState] = None
+        for message in turn[1:]:
+            if not isinstance(message, AIMessage):
+                continue
+            elif message.name == SUPERVISOR_NAME:
+                # a handoff starts a new step
+                handoffs = [call for call in message.tool_calls if call["name"].startswith("transfer_to_")]
+                if handoffs:
+                    current = StepState(user_query=_handoff_instruction(handoffs[0]), agent="", result="",
+                                        done=False, last_error=None)
+                    steps.append(current)
+            elif message.name and not message.tool_calls and message.content and current is not None:
+                if not current["agent"] or current["agent"] == message.name:
+                    current["agent"] = message.name
+                    current["result"] = str(message.content)
+
+        compiled_steps = []
+        for step in steps:
+            if not step["agent"]:
+                continue
+            # the supervisor ran these one after another, so each step depends on the one before
+            compiled_steps.append(StepState(
+                user_query=_to_template(step["user_query"], request),
+                agent=step["agent"],
+                result="",
+                done=False,
+                last_error=None,
+                depends_on=[len(compiled_steps) - 1] if compiled_steps else [],
+            ))
+        if not compiled_steps:
+            raise ValueError("The run did not route to any agent.")
+
+        return cls(
+            workflow_id=str(uuid.uuid4()),
+            name=name,
+            source_thread_id=source_thread_id,
+            parameters={REQUEST_PARAMETER: request},
+            steps=compiled_steps,
+        )
+
+    def dependencies(self, index: int) -> list[int]:
+        '''Returns the steps a step directly depends on; older plans without the field run in order'''
+        step = self.steps[index]
+        return step.get("depends_on", [index - 1] if index > 0 else [])
+
+    def ancestors(self, index: int) -> list[int]:
+        '''Returns every step whose result feeds into a step, directly or transitively, in plan order'''
+        seen: set[int] = set()
+        stack = list(self.dependencies(index))
+        while stack:
+            dependency = stack.pop()
+            if dependency not in seen:
+                seen.add(dependency)
+                stack.extend(self.dependencies(dependency))
+        return sorted(seen)
+
+    def render(self, step: StepState, parameters: dict[str, str]) -> str:
+        '''Fills a step's instruction with the given parameters, falling back to the defaults'''
+        return step["user_query"].format_map({**self.parameters, **parameters})
+
+def _handoff_instruction(call: dict) -> str:
+    # handoff tools that take a task pass the instruction as an argument. The default ones take none
+    # and the agent works from the conversation, i.e. the request; the text next to the call is the
+    # supervisor talking, not an instruction
+    return next((value for value in call["args"].values() if isinstance(value, str) and value.strip()), "")
+
+def _to_template(instruction: str, request: str) -> str:
+    if not instruction.strip():
+        return "{" + REQUEST_PARAMETER + "}"
+    # escape literal braces, then turn the original request into a slot so replays can change it
+    template = instruction.replace("{", "{{").replace("}", "}}")
+    escaped_request = request.replace("{", "{{").replace("}", "}}")
+    return template.replace(escaped_request, "{" + REQUEST_PARAMETER + "}")
+
+
+class WorkflowStore:
+    '''Persists compiled workflows next to the checkpoints so every worker sees the same set'''
+    _conn: sqlite3.Connection = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _connection(cls) -> sqlite3.Connection:
+        if cls._conn is None:
+            cls._conn = sqlite3.connect(ProjectConf.checkpoint_db_path, check_same_thread=False, timeout=30)
+            cls._conn.execute("PRAGMA journal_mode=WAL")
+            cls._conn.execute(
+                '''CREATE TABLE IF NOT EXISTS workflows (
+                       workflow_id TEXT PRIMARY KEY,
+                       name TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       body TEXT NOT NULL
+                   )'''
+            )
+            cls._conn.commit()
+        return cls._conn
+
+    @classmethod
+    def save(cls, workflow: Workflow) -> Workflow:
+        with cls._lock:
+            conn = cls._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO workflows (workflow_id, name, created_at, body) VALUES (?, ?, ?, ?)",
+                    (workflow.workflow_id, workflow.name, time.time(), workflow.model_dump_json()),
+                )
+        return workflow
+
+    @classmethod
+    def get(cls, workflow_id: str) -> Optional[Workflow]:
+        with cls._lock:
+            row = cls._connection().execute(
+                "SELECT body FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+        return Workflow.model_validate_json(row[0]) if row else None
 
+    @classmethod
+    def list(cls) -> list[dict[str, Any]]:
+        with cls._lock:
+            rows = cls._connection().execute(
+                "SELECT workflow_id, name, created_at, body FROM workflows ORDER BY created_at DESC"
+            ).fetchall()
+        return [
+            {"workflow_id": row[0], "name": row[1], "created_at": row[2],
+             "agents": [step["agent"] for step in json.loads(row[3])["steps"]]}
+            for row in rows
+        ]
 
-class Workflow:
-    steps: list[StepState]
\ No newline at end of file
+    @classmethod
+    def delete(cls, workflow_id: str) -> bool:
+        with cls._lock:
+            conn = cls._connection()
+            with conn:
+                cursor = conn.execute("DELETE FROM workflows WHERE workflow_id = ?", (workflow_id,))
+        return cursor.rowcount > 0
@@ -0,0 +1,20 @@
+"""
+Defines the response models for workflow history.
+"""
+from typing import Optional
+
+from pydantic import BaseModel
+
+class HistoryRecord(BaseModel):
+    checkpoint_id: str
+    parent_id: Optional[str] = None
+    thread_id: str
+    step: Optional[int] = None
+    next: list[str] = []                        # nodes that run after this checkpoint
+    agent: Optional[str] = None                 # node (agent) whose writes produced this checkpoint
+    most_recent_message: Optional[str] = None   # text of the latest non-empty message at this point
+    created_at: Optional[str] = None
+
+class HistoryPage(BaseModel):
+    records: list[HistoryRecord]                # newest first
+    next_before: Optional[str] = None           # pass as `before` (with the same `since`) to fetch the next (older) page
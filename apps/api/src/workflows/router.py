@@ -1,31 +1,60 @@
 """
 Defines API routes for managing history, including rollbacks, branches, and re-runs.
 """
-from fastapi import APIRouter, Query
+from typing import Optional
 
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from config import ProjectConf
+from src.utils.concurrency import run_blocking
 from src.workflows.History import WorkflowHistory
-from langgraph.types import StateSnapshot
-from src.utils.extract_state_fields import parse_all_snapshots
-from fastapi.responses import JSONResponse
+from src.workflows.models import HistoryPage
 
 router = APIRouter()
 
-@router.get("/get")
-def get_history() -> str:
-    print("Getting history...")
-    history = WorkflowHistory.get_history()
-    state_history = parse_all_snapshots(history)
-    return JSONResponse(
-        content=state_history,
-        headers={
-            "Access-Control-Allow-Origin": "http://localhost:3000",
-            "Access-Control-Allow-Credentials": "true",
-        }
+@router.get("/get", response_model=HistoryPage)
+def get_history(thread_id: str = Query(ProjectConf.default_thread_id, description="The thread to read history from"),
+                limit: int = Query(50, ge=1, le=500, description="Maximum number of checkpoints to return"),
+                before: Optional[str] = Query(None, description="Only return checkpoints older than this checkpoint_id"),
+                since: Optional[str] = Query(None, description="Only return checkpoints newer than this checkpoint_id")):
+    return WorkflowHistory.get_history(thread_id, limit, before, since)
+
+@router.get("/stream")
+async def stream_history(request: Request,
+                         thread_id: str = Query(ProjectConf.default_thread_id, description="The thread to follow"),
+                         since: Optional[str] = Query(None, description="Start after this checkpoint_id (defaults to the latest)")):
+    # Server-sent events: one `checkpoint` event per new checkpoint instead of re-fetching the history.
+    # A reconnecting EventSource repeats its original URL, but sends the id of the last event it got
+    cursor = request.headers.get("last-event-id") or since
+
+    async def event_generator():
+        async for record in WorkflowHistory.stream(thread_id, cursor):
+            if await request.is_disconnected():
+                break
+            if record is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"id: {record.checkpoint_id}\nevent: checkpoint\ndata: {record.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
     
-@router.post("/update")
-def update(payload: dict):
-    print("Updating history...")
-    print(payload['checkpoint_id'])
-    print(payload['new_prompt'])
-    return WorkflowHistory.update(payload['checkpoint_id'], payload['new_prompt'])
+@router.post("/fork")
+async def fork(payload: dict):
+    # Branch from any checkpoint with an edited prompt and stream the re-execution like /run
+    checkpoint_config = await run_blocking(WorkflowHistory.find_checkpoint, payload['checkpoint_id'])
+    if checkpoint_config is None:
+        raise HTTPException(status_code=404, detail=f"Checkpoint {payload['checkpoint_id']} not found")
+
+    return StreamingResponse(
+        WorkflowHistory.fork(checkpoint_config, payload['new_prompt']),
+        media_type="text/plain",
+        headers={"X-Thread-Id": checkpoint_config["configurable"]["thread_id"]},
+    )
+
+# kept for existing clients; same behaviour as /fork
+router.add_api_route("/update", fork, methods=["POST"])
@@ -0,0 +1,46 @@
+"""
+Tests for the history routes. The checkpoint store is replaced by a fixed list of records, so the
+tests only exercise how the routes page and resume.
+"""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.workflows.History import WorkflowHistory
+from src.workflows.models import HistoryRecord
+from src.workflows.router import router
+
+CHECKPOINT_IDS = ["0001", "0002", "0003", "0004"]
+
+@pytest.fixture
+def client(monkeypatch):
+    async def stream(thread_id, since=None):
+        # a finished thread: every checkpoint after the cursor, oldest first, then the stream ends
+        for checkpoint_id in CHECKPOINT_IDS:
+            if since is None or checkpoint_id > since:
+                yield HistoryRecord(checkpoint_id=checkpoint_id, thread_id=thread_id)
+
+    monkeypatch.setattr(WorkflowHistory, "stream", stream)
+    app = FastAPI()
+    app.include_router(router, prefix="/history")
+    return TestClient(app)
+
+def _events(body: str) -> list[dict]:
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines() if line.startswith("data: ")
+    ]
+
+def test_stream_starts_after_since(client):
+    response = client.get("/history/stream", params={"thread_id": "t", "since": "0001"})
+    assert [event["checkpoint_id"] for event in _events(response.text)] == ["0002", "0003", "0004"]
+    assert "id: 0004" in response.text
+
+def test_reconnect_resumes_after_last_event_id(client):
+    # EventSource reconnects with its original URL; only the header says how far it got
+    response = client.get(
+        "/history/stream", params={"thread_id": "t", "since": "0001"}, headers={"Last-Event-ID": "0003"},
+    )
+    assert [event["checkpoint_id"] for event in _events(response.text)] == ["0004"]
@@ -0,0 +1,49 @@
+"""
+Tests for compiling a finished thread into a workflow. The message histories are written by hand in
+the shape create_supervisor leaves them.
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.workflows.Workflow import SUPERVISOR_NAME, Workflow
+
+def _handoff(agent: str, content: str = "", **args) -> list:
+    call_id = f"call-{agent}"
+    return [
+        AIMessage(content=content, name=SUPERVISOR_NAME,
+                  tool_calls=[{"name": f"transfer_to_{agent.lower()}", "args": args, "id": call_id}]),
+        ToolMessage(content=f"Successfully transferred to {agent}", tool_call_id=call_id),
+    ]
+
+def _turn(request: str, *agents: str) -> list:
+    messages = [HumanMessage(content=request)]
+    for agent in agents:
+        messages += _handoff(agent)
+        messages.append(AIMessage(content=f"{agent} result", name=agent))
+    messages.append(AIMessage(content="done", name=SUPERVISOR_NAME))
+    return messages
+
+def test_only_the_last_turn_is_compiled():
+    messages = _turn("find my flights", "GmailAgent") + _turn("what's on my calendar tomorrow?", "GCalendarAgent")
+    workflow = Workflow.compile("calendar", messages)
+    assert workflow.parameters == {"request": "what's on my calendar tomorrow?"}
+    assert [step["agent"] for step in workflow.steps] == ["GCalendarAgent"]
+    assert workflow.steps[0]["user_query"] == "{request}"
+
+def test_instruction_comes_from_the_handoff_arguments():
+    messages = [
+        HumanMessage(content="summarize the budget doc"),
+        *_handoff("GDriveAgent", content="Let me hand this off.", task_description="Find the {2026} budget doc"),
+        AIMessage(content="found it", name="GDriveAgent"),
+        *_handoff("RAGAgent", content="Now the summary."),
+        AIMessage(content="summary", name="RAGAgent"),
+    ]
+    workflow = Workflow.compile("budget", messages)
+    # the supervisor's own text is not an instruction; without arguments the agent works from the request
+    assert [step["user_query"] for step in workflow.steps] == ["Find the {{2026}} budget doc", "{request}"]
+    assert [step.get("depends_on") for step in workflow.steps] == [[], [0]]
+
+def test_a_turn_without_agents_is_rejected():
+    messages = _turn("find my flights", "GmailAgent") + [HumanMessage(content="thanks"), AIMessage(content="welcome")]
+    with pytest.raises(ValueError):
+        Workflow.compile("nothing", messages)
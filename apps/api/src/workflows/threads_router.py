@@ -0,0 +1,24 @@
+"""
+Defines API routes for managing workflow threads (sessions): creating, listing and deleting them.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from src.workflows.Threads import WorkflowThreads
+
+router = APIRouter()
+
+@router.post("")
+def create_thread(thread_id: Optional[str] = Query(None, description="Optional id for the new thread")):
+    return WorkflowThreads.create(thread_id)
+
+@router.get("")
+def list_threads(limit: Optional[int] = Query(None, description="Maximum number of threads to return")):
+    return WorkflowThreads.list(limit)
+
+@router.delete("/{thread_id}")
+def delete_thread(thread_id: str):
+    if not WorkflowThreads.delete(thread_id):
+        raise HTTPException(status_code=404, detail=f"Thread {thread_id} not found")
+    return {"deleted": thread_id}
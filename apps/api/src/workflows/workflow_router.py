@@ -0,0 +1,67 @@
+"""
+Defines API routes for compiling finished runs into repeatable workflows and replaying them.
+"""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from src.utils.concurrency import run_blocking
+from src.workflows.Executor import WorkflowExecutor
+from src.workflows.Planner import WorkflowPlanner
+from src.workflows.Workflow import Workflow, WorkflowStore
+
+router = APIRouter()
+
+@router.post("/compile", response_model=Workflow)
+async def compile_workflow(payload: dict):
+    try:
+        return await run_blocking(WorkflowExecutor.compile_thread, payload['thread_id'], payload.get('name', 'workflow'))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/plan")
+async def plan_and_run(payload: dict):
+    # Plan the request as a step DAG in one LLM call, run independent steps in parallel, then
+    # merge the results. Pass "save": true to keep the plan as a reusable workflow.
+    try:
+        workflow = await WorkflowPlanner.plan(payload['message'], payload.get('name', 'plan'))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if payload.get('save'):
+        await run_blocking(WorkflowStore.save, workflow)
+
+    async def event_generator():
+        yield f"{((), {'planner': {'workflow_id': workflow.workflow_id, 'steps': workflow.steps}})}\n----\n"
+        async for output in WorkflowExecutor.run(workflow, {}, synthesize=True):
+            yield output
+
+    return StreamingResponse(event_generator(), media_type="text/plain")
+
+@router.get("")
+def list_workflows():
+    return WorkflowStore.list()
+
+@router.get("/{workflow_id}", response_model=Workflow)
+def get_workflow(workflow_id: str):
+    workflow = WorkflowStore.get(workflow_id)
+    if workflow is None:
+        raise HTTPException(status_code=404, detail=f"Workflow {workflow_id} not found")
+    return workflow
+
+@router.delete("/{workflow_id}")
+def delete_workflow(workflow_id: str):
+    if not WorkflowStore.delete(workflow_id):
+        raise HTTPException(status_code=404, detail=f"Workflow {workflow_id} not found")
+    return {"deleted": workflow_id}
+
+@router.post("/{workflow_id}/run")
+async def run_workflow(workflow_id: str, payload: dict):
+    # Replay a stored workflow with new parameter values, e.g. {"parameters": {"request": "..."}};
+    # "synthesize": true merges the step results into one final answer
+    workflow = await run_blocking(WorkflowStore.get, workflow_id)
+    if workflow is None:
+        raise HTTPException(status_code=404, detail=f"Workflow {workflow_id} not found")
+
+    return StreamingResponse(
+        WorkflowExecutor.run(workflow, payload.get('parameters', {}), payload.get('synthesize', False)),
+        media_type="text/plain",
+    )
@@ -12,6 +12,8 @@ const ChatInterface = () => {
   ]);
   const [input, setInput] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  // The server starts a thread on the first run and returns its id; later runs continue it
+  const [threadId, setThreadId] = useState(null);
   const chatWindowRef = useRef(null);
 
   // Visualization and branching modals
@@ -417,8 +419,9 @@ const ChatInterface = () => {
       const response = await fetch("http://localhost:8000/run", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ message: input }),
+        body: JSON.stringify({ message: input, thread_id: threadId }),
       });
+      setThreadId(response.headers.get("X-Thread-Id") || threadId);
 
       // Clear the input field
       setInput("");
@@ -521,7 +524,7 @@ const ChatInterface = () => {
       {showVisualization && (
         <Modal onClose={() => setShowVisualization(false)}>
           <h2 style={{ color: 'white' }}>Agentic AI Workflow Visualization</h2>
-          <GraphComponent onNodeClick={onNodeClick} selectedCheckpoint={selectedCheckpoint} />
+          <GraphComponent onNodeClick={onNodeClick} selectedCheckpoint={selectedCheckpoint} threadId={threadId} />
         </Modal>
       )}
   
@@ -4,27 +4,53 @@ import ReactFlow, { ReactFlowProvider } from 'reactflow';
 import 'reactflow/dist/style.css';
 import { transformStateHistoryToNodes, transformStateHistoryToEdges } from '../utils/transformStateHistory';
 
-const GraphComponent = ({ onNodeClick , selectedCheckpoint}) => {
+const GraphComponent = ({ onNodeClick , selectedCheckpoint, threadId }) => {
   const [nodes, setNodes] = useState([]);
   const [edges, setEdges] = useState([]);
+  // Without a thread id the server falls back to its default thread
+  const threadParam = threadId ? `thread_id=${encodeURIComponent(threadId)}` : "";
+
+  const renderHistory = (history) => {
+    setNodes(transformStateHistoryToNodes(history, selectedCheckpoint));
+    setEdges(transformStateHistoryToEdges(history));
+  };
 
   const fetchStateHistory = async () => {
     try {
-      const response = await fetch("http://localhost:8000/history/get");
+      const response = await fetch(`http://localhost:8000/history/get?${threadParam}`);
       const data = await response.json();
       console.log("Fetched state history:", data);
-      setNodes(transformStateHistoryToNodes(data, selectedCheckpoint));
-      setEdges(transformStateHistoryToEdges(data));
+      // records arrive newest first; the graph is laid out oldest to newest
+      const history = [...data.records].reverse();
+      renderHistory(history);
+      return history;
     } catch (error) {
       console.error("Error fetching state history:", error);
+      return [];
     }
   };
 
-  // what does this do, timer?
+  // Fetch the history once, then let the server push each new checkpoint as it is written
   useEffect(() => {
-    fetchStateHistory();
+    let source = null;
+    let cancelled = false;
     console.log("Fetching state history...");
-  }, []);
+
+    fetchStateHistory().then((history) => {
+      if (cancelled) return;
+      const latest = history.length ? history[history.length - 1].checkpoint_id : "";
+      source = new EventSource(`http://localhost:8000/history/stream?${threadParam}&since=${latest}`);
+      source.addEventListener("checkpoint", (event) => {
+        history = [...history, JSON.parse(event.data)];
+        renderHistory(history);
+      });
+    });
+
+    return () => {
+      cancelled = true;
+      if (source) source.close();
+    };
+  }, [threadId]);
 
   return (
     <ReactFlowProvider>
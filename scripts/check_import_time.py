@@ -0,0 +1,62 @@
+"""
+This script profiles the import of the API. It imports `src.main` in a fresh interpreter, reports
+how long that took, which of the heavy modules got loaded and the slowest imports. The pass/fail
+check is the test apps/api/src/test_import_time.py; use this script to find out why it failed.
+
+usage:
+------------
+PYTHONPATH=apps/api python scripts/check_import_time.py [--module src.main] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# must only load on first use, see apps/api/src/test_import_time.py
+FORBIDDEN_MODULES = ["torch", "sentence_transformers", "transformers", "langgraph.graph", "langgraph.prebuilt"]
+
+def main():
+    parser = argparse.ArgumentParser(description="List what importing the API loads and how long it takes.")
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to list")
+    args = parser.parse_args()
+
+    # warm-up on startup would not run at import anyway, but make sure nothing triggers it
+    env = {**os.environ, "HONEYCOMB_WARMUP": "0"}
+    probe = (
+        "import json, sys, time; start = time.perf_counter(); "
+        f"import {args.module}; elapsed = time.perf_counter() - start; "
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {FORBIDDEN_MODULES!r} if m in sys.modules]}}))"
+    )
+
+    # first run fills the bytecode and OS file caches so the measurement is not of a cold disk
+    subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True)
+    result = subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"Importing {args.module} failed")
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    elapsed, loaded = measured["elapsed"], measured["loaded"]
+
+    # a second run only to find the slowest imports; -X importtime itself slows imports down
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], env=env, capture_output=True, text=True)
+
+    # -X importtime lines: "import time: <self us> | <cumulative us> | <indented module>"
+    timings = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            timings.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+    print("Slowest imports (cumulative):")
+    for cumulative, _, module in sorted(timings, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1e6:7.3f}s  {module}")
+
+    print(f"\nImporting {args.module} took {elapsed:.2f}s")
+    if loaded:
+        print(f"Loaded at import time: {', '.join(loaded)}")
+
+if __name__ == "__main__":
+    main()
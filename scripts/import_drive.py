@@ -0,0 +1,39 @@
+"""
+This script imports the text documents of a Google Drive into the memory index, so the RAG agent
+can answer questions about them with one vector search.
+
+Documents are downloaded concurrently, chunked, embedded in batches and bulk-indexed with their file
+id and revision. The indexed revisions are kept in drive_import_state.json; re-running the command
+only downloads files that changed since, and replaces their old chunks.
+
+usage:
+------------
+PYTHONPATH=apps/api python scripts/import_drive.py [--query "trashed = false"] [--folder FOLDER_ID] [--modified-after 2024-01-01] [--workers 8] [--prune]
+"""
+
+import argparse
+
+from src.memory.drive_importer import (DRIVE_IMPORT_BATCH_CHUNKS, DRIVE_IMPORT_QUERY, DRIVE_IMPORT_STATE, DRIVE_IMPORT_WORKERS,
+                                       import_drive)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import Google Drive documents into the memory index.")
+    parser.add_argument("--query", default=DRIVE_IMPORT_QUERY, help="Drive query selecting the files to import")
+    parser.add_argument("--folder", help="only import files directly inside this folder")
+    parser.add_argument("--modified-after", help="only import files modified after this date (YYYY-MM-DD)")
+    parser.add_argument("--state", default=DRIVE_IMPORT_STATE, help="file recording the revision indexed for each file")
+    parser.add_argument("--workers", type=int, default=DRIVE_IMPORT_WORKERS, help="concurrent downloads")
+    parser.add_argument("--batch-chunks", type=int, default=DRIVE_IMPORT_BATCH_CHUNKS, help="chunks embedded and written per batch")
+    parser.add_argument("--limit", type=int, help="stop after listing this many files")
+    parser.add_argument("--prune", action="store_true", help="remove files indexed before that are no longer in Drive (full listing only)")
+    args = parser.parse_args()
+
+    stats = import_drive(
+        query=args.query, folder_id=args.folder, modified_after=args.modified_after, state_path=args.state,
+        workers=args.workers, batch_chunks=args.batch_chunks, limit=args.limit, prune=args.prune,
+    )
+    print(f"Done: {stats['files']} files read ({stats['unchanged']} unchanged, {stats['skipped']} not text), "
+          f"{stats['indexed']} chunks indexed, {stats['removed']} files removed, {stats['errors']} errors")
+
+if __name__ == "__main__":
+    main()
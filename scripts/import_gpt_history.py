@@ -0,0 +1,29 @@
+"""
+This script imports an exported ChatGPT [conversations.json] into the memory index, so its
+conversations are searchable by the RAG agent and /memory/knn.
+
+The export is streamed one conversation at a time and progress is saved after every batch to
+<export>.progress.json; re-running the same command after a crash resumes where it stopped.
+
+usage:
+------------
+PYTHONPATH=apps/api python scripts/import_gpt_history.py conversations.json [--batch-chunks 512] [--limit N]
+"""
+
+import argparse
+
+from src.memory.importer import IMPORT_BATCH_CHUNKS, import_export
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a ChatGPT export into the memory index.")
+    parser.add_argument("export", help="path to conversations.json")
+    parser.add_argument("--checkpoint", help="progress file (default: <export>.progress.json)")
+    parser.add_argument("--batch-chunks", type=int, default=IMPORT_BATCH_CHUNKS, help="chunks embedded and written per batch")
+    parser.add_argument("--limit", type=int, help="stop after this many conversations")
+    args = parser.parse_args()
+
+    progress = import_export(args.export, args.checkpoint, batch_chunks=args.batch_chunks, limit=args.limit)
+    print(f"Done: {progress['conversations']} conversations, {progress['indexed']} chunks indexed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+This script rebuilds the memory index in a (quantized) vector layout and moves the `vector_index`
+alias onto it, e.g. to migrate the original float32 `vector_index_v0` to int8_hnsw.
+
+Before swapping it measures recall@k of the new layout, with and without exact rescoring, against
+a brute-force search over the same vectors, and prints the estimated vector RAM of both layouts.
+The source index is write-blocked (`index.blocks.write`) from the start of the reindex until the
+swap, so nothing written or deleted during the migration can be missed by the copy. Memory writes
+and deletes fail with a cluster block error in that window; run it when nothing is ingesting.
+
+usage:
+------------
+PYTHONPATH=apps/api python scripts/migrate_vector_index.py [--quantization int8] [--queries 200] [--k 10] [--no-swap] [--delete-old]
+"""
+
+import argparse
+import statistics
+import time
+
+from src.memory.db import (
+    QUANTIZATION_TYPES,
+    RESCORE_OVERSAMPLE,
+    es,
+    index_mapping,
+    index_name,
+    index_quantization,
+    vector_search_body,
+)
+from src.memory.embeddings import N_DIMENSIONS
+
+# bytes per vector the HNSW search needs resident; bbq keeps one bit per dimension plus corrections
+BYTES_PER_VECTOR = {
+    "none": 4 * N_DIMENSIONS,
+    "int8": N_DIMENSIONS + 4,
+    "int4": N_DIMENSIONS // 2 + 4,
+    "bbq": N_DIMENSIONS // 8 + 14,
+}
+
+######################################################
+# RECALL
+######################################################
+
+def sample_queries(index: str, n: int) -> list[list[float]]:
+    '''Uses stored vectors of random documents as queries'''
+    response = es.search(index=index, body={
+        "size": n,
+        "query": {"function_score": {"query": {"match_all": {}}, "random_score": {"seed": 42, "field": "_seq_no"}}},
+        "_source": ["embedding"],
+    })
+    return [hit["_source"]["embedding"] for hit in response["hits"]["hits"]]
+
+def exact_neighbours(index: str, query: list[float], k: int) -> list[str]:
+    response = es.search(index=index, body={
+        "size": k,
+        "query": {"script_score": {
+            "query": {"match_all": {}},
+            "script": {"source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0", "params": {"query_vector": query}},
+        }},
+        "_source": False,
+    })
+    return [hit["_id"] for hit in response["hits"]["hits"]]
+
+def measure(index: str, queries: list[list[float]], truth: list[list[str]], k: int, quantized: bool, oversample: float) -> tuple[float, float]:
+    '''Returns mean recall@k and median latency in milliseconds'''
+    recalls, latencies = [], []
+    for query, expected in zip(queries, truth):
+        body = vector_search_body(query, k, quantized=quantized, oversample=oversample)
+        body["_source"] = False
+        response = es.search(index=index, body=body)
+        found = {hit["_id"] for hit in response["hits"]["hits"]}
+        recalls.append(len(found & set(expected)) / max(len(expected), 1))
+        latencies.append(response["took"])
+    return statistics.mean(recalls), statistics.median(latencies)
+
+######################################################
+# MIGRATION
+######################################################
+
+def main():
+    parser = argparse.ArgumentParser(description="Reindex the memory index into a new vector layout behind the alias.")
+    parser.add_argument("--quantization", choices=list(QUANTIZATION_TYPES), default="int8")
+    parser.add_argument("--target", help="name of the new index (default: vector_index_<quantization>_<timestamp>)")
+    parser.add_argument("--queries", type=int, default=200, help="number of sampled queries for the recall measurement")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--no-swap", action="store_true", help="only build and measure the new index")
+    parser.add_argument("--delete-old", action="store_true", help="delete the old index after the swap")
+    args = parser.parse_args()
+
+    sources = list(es.indices.get_alias(name=index_name))
+    if len(sources) != 1:
+        raise SystemExit(f"Expected {index_name} to point at exactly one index, found {sources}.")
+    source = sources[0]
+    target = args.target or f"{index_name}_{args.quantization}_{int(time.time())}"
+
+    print(f"Reindexing {source} ({index_quantization(source)}) into {target} ({args.quantization})")
+    # a catch-up pass after the swap could copy late writes but not late deletes, so block both instead
+    es.indices.put_settings(index=source, settings={"index.blocks.write": True})
+    try:
+        es.indices.create(index=target, body=index_mapping(args.quantization))
+        es.options(request_timeout=3600).reindex(
+            source={"index": source}, dest={"index": target}, wait_for_completion=True, refresh=True
+        )
+        n_docs = es.count(index=target)["count"]
+        print(f"Copied {n_docs} documents")
+
+        queries = sample_queries(target, args.queries)
+        truth = [exact_neighbours(target, query, args.k) for query in queries]
+
+        print(f"\n{'index':<45} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'vector RAM':>12}")
+        rows = [
+            (f"{source} (current)", source, index_quantization(source) != "none", 1.0, index_quantization(source)),
+            (f"{target} without rescoring", target, True, 1.0, args.quantization),
+            (f"{target} oversample x{RESCORE_OVERSAMPLE:g} + rescore", target, True, RESCORE_OVERSAMPLE, args.quantization),
+        ]
+        for label, index, quantized, oversample, quantization in rows:
+            recall, latency = measure(index, queries, truth, args.k, quantized and quantization != "none", oversample)
+            ram_mib = n_docs * BYTES_PER_VECTOR[quantization] / 2**20
+            print(f"{label:<45} {recall:>10.3f} {latency:>8.1f} {ram_mib:>9.1f} MiB")
+
+        if args.no_swap:
+            print(f"\nLeft {index_name} on {source}; {target} was kept for inspection")
+            return
+
+        es.indices.update_aliases(actions=[
+            {"remove": {"index": source, "alias": index_name}},
+            {"add": {"index": target, "alias": index_name}},
+        ])
+        print(f"\n{index_name} now points at {target}")
+    finally:
+        # the old index is writable again, whether it is still behind the alias or kept to roll back to
+        es.indices.put_settings(index=source, settings={"index.blocks.write": None})
+
+    if args.delete_old:
+        es.indices.delete(index=source)
+        print(f"Deleted {source}")
+
+if __name__ == "__main__":
+    main()
@@ -1,90 +1,151 @@
 """
-This script parses an exported ChatGPT [conversations.json], generates embeddings from it,
-and generates the required files to visualize it with Wizmap.
+This script generates the files to visualize the memory index with Wizmap, optionally importing an
+exported ChatGPT [conversations.json] into it first.
+
+It reuses the embeddings already stored in the memory index instead of re-encoding the history.
+UMAP is fitted on a random sample and the rest is projected in batches; the fitted reducer and the
+2-D coordinates are cached, so a refresh only projects documents added since the last run.
 
 requirements:
 ------------
 wizmap
-numpy<2.0
 umap-learn
-sentence-transformers
+
+usage:
+------------
+PYTHONPATH=apps/api python scripts/parse_gpt_history.py [--export conversations.json] [--cache-dir wizmap_cache] [--refit]
 """
 
-import json
-import wizmap
+import argparse
+import os
+import pickle
 
-from pathlib import Path
-from sentence_transformers import SentenceTransformer
+import numpy as np
+import wizmap
 from umap import UMAP
 
+from src.memory.embeddings import N_DIMENSIONS
+from src.memory.store import get_store
+
 ######################################################
 # CONSTANTS
 ######################################################
 
-file = "conversations.json"
-N_DIMENSIONS = 384
+PAGE_SIZE = 2000            # documents fetched from the store per request
+SAMPLE_SIZE = 20_000        # vectors UMAP is fitted on
+TRANSFORM_BATCH = 10_000    # vectors projected per UMAP transform call
 
 ######################################################
-# DATA INGESTION
+# PROJECTION CACHE
 ######################################################
 
-data = json.loads(Path(file).open().read())
+def load_cache(cache_dir: str) -> tuple[UMAP, dict[str, np.ndarray]]:
+    reducer_path = os.path.join(cache_dir, "reducer.pkl")
+    projection_path = os.path.join(cache_dir, "projection.npz")
+    if not os.path.exists(reducer_path):
+        return None, {}
+    with open(reducer_path, "rb") as f:
+        reducer = pickle.load(f)
+    projection = {}
+    if os.path.exists(projection_path):
+        cached = np.load(projection_path)
+        projection = dict(zip(cached["ids"].tolist(), cached["xy"]))
+    return reducer, projection
+
+def save_cache(cache_dir: str, reducer: UMAP, ids: list[str], xy: np.ndarray) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, "reducer.pkl"), "wb") as f:
+        pickle.dump(reducer, f)
+    np.savez(os.path.join(cache_dir, "projection.npz"), ids=np.array(ids), xy=xy)
 
 ######################################################
-# EMBEDDING MODEL
+# DIMENSIONALITY REDUCTION
 ######################################################
 
-model = SentenceTransformer("all-MiniLM-L6-v2", truncate_dim=N_DIMENSIONS)
-
-def embedding_of_text(text: str):
-    return model.encode(text).tolist()
+def fit_reducer(store, sample_size: int, seed: int = 42) -> UMAP:
+    '''Fits UMAP on a uniform reservoir sample of the stored vectors, in one pass over the store'''
+    rng = np.random.default_rng(seed)
+    sample = np.empty((sample_size, N_DIMENSIONS), dtype=np.float32)
+    seen = 0
+    for _, _, vectors in store.scan(PAGE_SIZE):
+        for vector in vectors:
+            if seen < sample_size:
+                sample[seen] = vector
+            else:
+                slot = rng.integers(0, seen + 1)
+                if slot < sample_size:
+                    sample[slot] = vector
+            seen += 1
+    if seen < 2:
+        raise SystemExit("The memory index needs at least two documents to build a map.")
+
+    print(f"Fitting UMAP on {min(seen, sample_size)} of {seen} vectors")
+    reducer = UMAP(metric="cosine", random_state=seed)
+    reducer.fit(sample[:min(seen, sample_size)])
+    return reducer
+
+def project(store, reducer: UMAP, cached: dict[str, np.ndarray]) -> tuple[list[str], list[str], np.ndarray]:
+    '''Returns the ids, texts and 2-D coordinates of every stored document, projecting only uncached ones'''
+    ids, texts, xy = [], [], []
+    pending_rows, pending_vectors = [], []
+
+    def transform_pending():
+        if pending_vectors:
+            projected = reducer.transform(np.concatenate(pending_vectors))
+            for row, point in zip(pending_rows, projected):
+                xy[row] = point
+            pending_rows.clear()
+            pending_vectors.clear()
+
+    for page_ids, page_texts, vectors in store.scan(PAGE_SIZE):
+        new = []
+        for i, doc_id in enumerate(page_ids):
+            xy.append(cached.get(doc_id))
+            if xy[-1] is None:
+                new.append(i)
+                pending_rows.append(len(xy) - 1)
+        ids.extend(page_ids)
+        texts.extend(page_texts)
+        if new:
+            pending_vectors.append(vectors[new])
+        if sum(len(batch) for batch in pending_vectors) >= TRANSFORM_BATCH:
+            transform_pending()
+    transform_pending()
+
+    print(f"Projected {len(ids) - sum(doc_id in cached for doc_id in ids)} new of {len(ids)} documents")
+    return ids, texts, np.asarray(xy, dtype=np.float32).reshape(-1, 2)
 
 ######################################################
-# PARSE GPT HISTORY AND PRODUCE EMBEDDINGS
+# PRODUCE WIZMAP OUTPUT
 ######################################################
 
-texts = []
-embeddings = []
+def main():
+    parser = argparse.ArgumentParser(description="Generate Wizmap files from the memory index.")
+    parser.add_argument("--export", help="import this conversations.json into the memory index first")
+    parser.add_argument("--cache-dir", default="wizmap_cache", help="where the fitted reducer and projection are kept")
+    parser.add_argument("--sample", type=int, default=SAMPLE_SIZE, help="number of vectors to fit UMAP on")
+    parser.add_argument("--refit", action="store_true", help="discard the cached reducer and projection")
+    parser.add_argument("--output-dir", default="./")
+    args = parser.parse_args()
 
-for conversation in data[:1250]:
-    print(conversation["title"])
-    for message in conversation["mapping"].values():
-        if (
-            message["message"] is None
-            or message["message"]["content"]["content_type"] != "text"
-        ):
-            continue
-        if not message["message"]["content"]["parts"]:
-            continue
+    if args.export:
+        from src.memory.importer import import_export
+        import_export(args.export)
 
-        for part in message["message"]["content"]["parts"]:
-            if not part:
-                continue
-            texts.append(part)
+    store = get_store()
+    reducer, cached = (None, {}) if args.refit else load_cache(args.cache_dir)
+    if reducer is None:
+        reducer, cached = fit_reducer(store, args.sample), {}
 
+    ids, texts, embeddings_2d = project(store, reducer, cached)
+    save_cache(args.cache_dir, reducer, ids, embeddings_2d)
 
-print(len(texts))
-for text in texts:
-    embeddings.append(embedding_of_text(text))
+    xs = embeddings_2d[:, 0].astype(float).tolist()
+    ys = embeddings_2d[:, 1].astype(float).tolist()
+    data_list = wizmap.generate_data_list(xs, ys, texts)
+    grid_dict = wizmap.generate_grid_dict(xs, ys, texts, "Chat History")
 
-######################################################
-# DIMENSIONALITY REDUCTION
-######################################################
-
-reducer = UMAP(metric="cosine")
-embeddings_2d = reducer.fit_transform(embeddings)
-
-######################################################
-# PRODUCE WIZMAP OUTPUT
-######################################################
-
-xs = embeddings_2d[:, 0].astype(float).tolist()
-ys = embeddings_2d[:, 1].astype(float).tolist()
-data_list = wizmap.generate_data_list(xs, ys, texts)
-grid_dict = wizmap.generate_grid_dict(xs, ys, texts, "Chat History")
-
-######################################################
-# EXPORT DATA
-######################################################
+    wizmap.save_json_files(data_list, grid_dict, output_dir=args.output_dir)
 
-wizmap.save_json_files(data_list, grid_dict, output_dir="./")
+if __name__ == "__main__":
+    main()